@@ -0,0 +1,109 @@
+"""Benchmark: bytes on the wire and server CPU per request for the chart endpoints.
+
+Run from ``backend/``::
+
+    python -m benchmarks.compression
+
+Prices are a synthetic 12-year daily random walk, so no market data is
+downloaded.  The first table compresses each endpoint's body with every
+available encoding at a few levels and reports size and CPU per request.
+The second measures whole requests through the app on response-cache hits,
+where the stored compressed variant is sent as is.
+"""
+import gzip
+import time
+
+import numpy as np
+import pandas as pd
+from fastapi.testclient import TestClient
+
+from main import app
+from stock_analysis.chart_payload import PACKED_MEDIA_TYPE
+from stock_analysis.compression import ENCODERS, brotli, zstandard
+from stock_analysis.stock_analyser import StockAnalyser
+
+SYMBOL = "BENCH"
+REPEAT = 5
+ENDPOINTS = (
+    ("chart rows", f"/api/chart_data_daily/{SYMBOL}", {}),
+    ("chart columns", f"/api/chart_data_daily/{SYMBOL}?shape=columns", {}),
+    ("chart packed", f"/api/chart_data_daily/{SYMBOL}", {"Accept": PACKED_MEDIA_TYPE}),
+    ("overlays rows", f"/overlay_data/{SYMBOL}?timeframe=daily", {}),
+    ("overlays columns", f"/overlay_data/{SYMBOL}?timeframe=daily&shape=columns", {}),
+    ("signal lines", f"/signal_lines/{SYMBOL}?timeframe=daily", {}),
+)
+
+# (label, compressor) pairs; the middleware's defaults are marked with *.
+CODECS = [
+    ("gzip 1 *", ENCODERS["gzip"]),
+    ("gzip 5", lambda body: gzip.compress(body, 5, mtime=0)),
+    ("gzip 9", lambda body: gzip.compress(body, 9, mtime=0)),
+]
+if brotli is not None:
+    CODECS += [
+        ("br 4 *", ENCODERS["br"]),
+        ("br 11", lambda body: brotli.compress(body, quality=11)),
+    ]
+if zstandard is not None:
+    CODECS += [
+        ("zstd 3 *", ENCODERS["zstd"]),
+        ("zstd 19", lambda body: zstandard.ZstdCompressor(level=19).compress(body)),
+    ]
+
+
+def _synthetic_history(symbol: str) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    index = pd.bdate_range(end="2025-12-31", periods=252 * 12)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, len(index))))
+    spread = close * rng.uniform(0.002, 0.02, len(index))
+    return pd.DataFrame(
+        {
+            "Open": close - spread * rng.uniform(-1, 1, len(index)),
+            "High": close + spread,
+            "Low": close - spread,
+            "Close": close,
+            "Adj Close": close,
+            "Volume": rng.integers(1_000_000, 50_000_000, len(index)).astype(float),
+        },
+        index=index,
+    )
+
+
+def _cpu_ms(fn, repeat: int = REPEAT) -> float:
+    start = time.process_time()
+    for _ in range(repeat):
+        fn()
+    return (time.process_time() - start) / repeat * 1000
+
+
+def main():
+    StockAnalyser._download_price_history = staticmethod(_synthetic_history)
+    client = TestClient(app)
+
+    bodies = {}
+    for name, url, headers in ENDPOINTS:
+        response = client.get(url, headers={**headers, "Accept-Encoding": "identity"})
+        response.raise_for_status()
+        bodies[name] = (url, headers, response.content)
+
+    print(f"{'endpoint':<18} {'codec':<9} {'bytes':>10} {'ratio':>6} {'cpu ms':>8}")
+    for name, (_, _, body) in bodies.items():
+        print(f"{name:<18} {'identity':<9} {len(body):>10}")
+        for label, compress in CODECS:
+            size = len(compress(body))
+            print(f"{'':<18} {label:<9} {size:>10} {len(body) / size:>6.1f} {_cpu_ms(lambda: compress(body)):>8.2f}")
+
+    print()
+    print("Whole request on a response-cache hit (client and server share the process)")
+    print(f"{'endpoint':<18} {'encoding':<9} {'wire bytes':>10} {'cpu ms':>8}")
+    for name, (url, headers, _) in bodies.items():
+        for encoding in ("identity", *ENCODERS):
+            request_headers = {**headers, "Accept-Encoding": encoding}
+            client.get(url, headers=request_headers)  # stores the variant
+            wire = client.get(url, headers=request_headers).headers["content-length"]
+            cpu = _cpu_ms(lambda: client.get(url, headers=request_headers))
+            print(f"{name:<18} {encoding:<9} {wire:>10} {cpu:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
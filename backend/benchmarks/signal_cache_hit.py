@@ -0,0 +1,68 @@
+"""Micro-benchmark: signal cache hit latency, deepcopy entries vs frozen markers.
+
+Run from ``backend/``::
+
+    python -m benchmarks.signal_cache_hit
+
+The "before" path reproduces the previous behaviour (deepcopy on read plus a
+second deepcopy on return); the "after" path goes through a method decorated
+with ``cached_analysis`` and JSON serialization.
+"""
+import copy
+import timeit
+
+from stock_analysis.analysis_cache import cached_analysis
+from stock_analysis.stock_analyser import SignalMarker, serialize_markers
+
+# Roughly a 20-year daily history with a trade every couple of weeks.
+N_MARKERS = 500
+REPEAT = 2000
+
+
+def _legacy_markers() -> list[dict]:
+    return [
+        {
+            "time": 946684800 + i * 86400 * 10,
+            "price": 100.0 + i * 0.25,
+            "side": "buy" if i % 2 == 0 else "sell",
+            "label": "ENTRY" if i % 2 == 0 else "EXIT",
+        }
+        for i in range(N_MARKERS)
+    ]
+
+
+class _BenchAnalyser:
+    symbol = "BENCH"
+    data_version = 1
+
+    @cached_analysis
+    def get_bench_signals(self, timeframe: str = "daily"):
+        return [SignalMarker(**m) for m in _legacy_markers()]
+
+
+def main():
+    legacy_cache = {"daily": copy.deepcopy(_legacy_markers())}
+
+    def legacy_hit():
+        return copy.deepcopy(copy.deepcopy(legacy_cache["daily"]))
+
+    analyser = _BenchAnalyser()
+    analyser.get_bench_signals("daily")
+
+    def frozen_hit():
+        return analyser.get_bench_signals("daily")
+
+    def frozen_hit_serialized():
+        return serialize_markers(analyser.get_bench_signals("daily"))
+
+    for name, fn in (
+        ("before: deepcopy x2", legacy_hit),
+        ("after: shared tuple", frozen_hit),
+        ("after: tuple + serialize", frozen_hit_serialized),
+    ):
+        elapsed = min(timeit.repeat(fn, number=REPEAT, repeat=3)) / REPEAT
+        print(f"{name:<26} {elapsed * 1e6:10.2f} us per hit ({N_MARKERS} markers)")
+
+
+if __name__ == "__main__":
+    main()
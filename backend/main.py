@@ -1,11 +1,19 @@
 import csv
 from datetime import datetime
 import io
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 import requests
 from stock_analysis.pricetarget import find_downtrend_lines
-from stock_analysis.stock_analyser import StockAnalyser
+from stock_analysis.stock_analyser import (
+    MANSFIELD_BENCHMARK,
+    OVERLAY_SERIES,
+    StockAnalyser,
+    get_analyser,
+    overlay_registry,
+    serialize_markers,
+)
+from stock_analysis.analysis_cache import cache_stats
 from stock_analysis.portfolio_analyser import PortfolioAnalyser
 from stock_analysis.models import StockRequest, StockAnalysisResponse, ElliottWaveScenariosResponse, FinancialMetrics
 from stock_analysis.elliott_wave import calculate_elliott_wave
@@ -14,10 +22,37 @@ from stock_analysis.twelve_data_fundamentals import TwelveDataFundamentals
 from stock_analysis.utils import (
     compute_sortino_ratio_cached as compute_sortino_ratio,
     convert_numpy_types,
-    compute_wilder_rsi,
-    compute_supertrend_lines,
     safe_value,
 )
+from stock_analysis.chart_payload import (
+    PACKED_MEDIA_TYPE,
+    HistoryShape,
+    accepts_packed,
+    compact_series,
+    epoch_seconds,
+    history_json,
+    packed_history,
+    packed_series,
+    window_frame,
+    window_series,
+)
+from stock_analysis.downsample import downsample_bars, downsample_lines
+from stock_analysis.indicator_state import SuperTrend, WilderRSI
+from stock_analysis.snapshot import snapshot_key, snapshot_value
+from stock_analysis.execution import execution_stats, monitor_loop_lag, run_blocking
+from stock_analysis.live_feed import SessionBar, live_bar, live_hub
+from stock_analysis.minute_store import INTRADAY_TIMEFRAMES, minute_bars
+from stock_analysis.response_cache import ResponseCacheMiddleware, response_cache
+from stock_analysis.compression import CompressionMiddleware
+from stock_analysis.single_flight import single_flight, single_flight_stats
+from nightly_snapshot import start_scheduler
+from stock_analysis.panel import (
+    load_panels,
+    mace_scores,
+    price_vs_20dma,
+    sma_distances,
+    weekly_trend_status,
+)
 from stock_analysis.sector_momentum import (
     _peer_returns,
     _sanitize_peers,
@@ -27,9 +62,9 @@ from stock_analysis.sector_momentum import (
     sector_relative_momentum_zscore,
      _z_score,
 )
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
 from time import time
 import math
 from aliases import SYMBOL_ALIASES
@@ -41,11 +76,55 @@ import boto3
 import os
 import pandas as pd
 import re
+import threading
 from fastapi import Query
 from pydantic import BaseModel
 
+# GET routes whose responses depend only on their parameters and the symbol's prices.
+CACHED_ROUTES = (
+    "/api/chart_data_{timeframe}/{symbol}",
+    "/overlay_data/{symbol}",
+    "/signal_lines/{symbol}",
+    "/api/signals_{timeframe}/{symbol}",
+    "/price_targets/{symbol}",
+    "/engulfing/{symbol}",
+    "/stage/{symbol}",
+    "/api/projection_arrows/{symbol}",
+)
+
+
+def _reads_benchmark(route: str, params: dict[str, str]) -> bool:
+    """Whether a ``CACHED_ROUTES`` response also depends on the Mansfield benchmark's prices."""
+    if route == "/api/signals_{timeframe}/{symbol}":
+        return params.get("strategy") == "mansfield"
+    if route == "/overlay_data/{symbol}":
+        series = params.get("series")
+        return series is None or "mansfield_rs" in (name.strip() for name in series.split(","))
+    return False
+
+
+def _cached_response_version(route: str, params: dict[str, str]):
+    """Data version a ``CACHED_ROUTES`` response depends on; ``None`` disables caching."""
+    if params.get("timeframe") in INTRADAY_TIMEFRAMES:
+        # Intraday bars move with every quote; the daily version does not cover them.
+        return None
+    raw_symbol = params["symbol"].upper().strip()
+    version = StockAnalyser.get_price_data_version(SYMBOL_ALIASES.get(raw_symbol, raw_symbol))
+    if _reads_benchmark(route, params):
+        return version, StockAnalyser.get_price_data_version(MANSFIELD_BENCHMARK)
+    if route == "/stage/{symbol}":
+        # Portfolio symbols answer from the nightly snapshot's stage.
+        store = Path("portfolio_store.json")
+        return version, store.stat().st_mtime_ns if store.exists() else None
+    return version
+
+
 app = FastAPI()
 
+# Innermost first, so CORS stays outermost and also covers cached responses.
+# Cached responses arrive at the compression layer already encoded.
+app.add_middleware(ResponseCacheMiddleware, routes=CACHED_ROUTES, version=_cached_response_version)
+app.add_middleware(CompressionMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:5173"],
@@ -57,9 +136,8 @@ app.add_middleware(
 # Symbol → (Fundamentals, timestamp)
 _fundamentals_cache: dict[tuple[str, str], tuple[FinancialMetrics, float]] = {}
 _FUNDAMENTALS_TTL_SECONDS = 60 * 60  # 60 minutes
-PORTFOLIO_RETURNS_CACHE: dict[int, dict[str, float]] = {}
-PORTFOLIO_RETURNS_LAST_UPDATED: dict[int, float] = {}
-PORTFOLIO_RETURNS_TTL_SECONDS = 60 * 60  # 60 minutes cache
+# period_days → (((ticker, data_version), ...), returns); valid while every version matches
+PORTFOLIO_RETURNS_CACHE: dict[int, tuple[tuple[tuple[str, int | None], ...], dict[str, float]]] = {}
 
 
 class CustomMomentumRequest(BaseModel):
@@ -96,18 +174,6 @@ def _sma_distance_pct(price: float | None, sma: float | None) -> float | None:
     return (price - sma) / sma * 100
 
 
-def _distance_at_index(
-    close: pd.Series, index: int, window: int
-) -> float | None:
-    if len(close) <= abs(index):
-        return None
-    price = close.iloc[index]
-    sma = close.rolling(window=window).mean().iloc[index]
-    if pd.isna(price) or pd.isna(sma):
-        return None
-    return _sma_distance_pct(float(price), float(sma))
-
-
 def _compute_sma_distances(
     symbols: list[str],
     timeframe: Literal["daily", "weekly"] = "daily",
@@ -119,51 +185,20 @@ def _compute_sma_distances(
         "distance_36d_prev": {},
     }
 
-    def _fetch(symbol: str):
-        analyser = StockAnalyser(symbol)
-        df = analyser.weekly_df if timeframe == "weekly" else analyser.df
-        if df.empty:
-            return {
-                "symbol": symbol,
-                "distance_12d": None,
-                "distance_36d": None,
-                "distance_12d_prev": None,
-                "distance_36d_prev": None,
-            }
-        close = df["Close"]
-        if isinstance(close, pd.DataFrame):
-            close = close.iloc[:, 0]
-        offset = 1 if timeframe == "weekly" else 5
-        prev_index = -1 - offset
-        distance_12d = _distance_at_index(close, -1, 12)
-        distance_36d = _distance_at_index(close, -1, 36)
-        distance_12d_prev = _distance_at_index(close, prev_index, 12)
-        distance_36d_prev = _distance_at_index(close, prev_index, 36)
-        return {
-            "symbol": symbol,
-            "distance_12d": distance_12d,
-            "distance_36d": distance_36d,
-            "distance_12d_prev": distance_12d_prev,
-            "distance_36d_prev": distance_36d_prev,
-        }
-
-    with ThreadPoolExecutor(max_workers=8) as executor:
-        futures = {executor.submit(_fetch, symbol): symbol for symbol in symbols}
-        for future in as_completed(futures):
-            result = future.result()
-            symbol = result["symbol"]
-            if isinstance(result["distance_12d"], (int, float)):
-                results["distance_12d"][symbol] = float(result["distance_12d"])
-            if isinstance(result["distance_36d"], (int, float)):
-                results["distance_36d"][symbol] = float(result["distance_36d"])
-            if isinstance(result["distance_12d_prev"], (int, float)):
-                results["distance_12d_prev"][symbol] = float(
-                    result["distance_12d_prev"]
-                )
-            if isinstance(result["distance_36d_prev"], (int, float)):
-                results["distance_36d_prev"][symbol] = float(
-                    result["distance_36d_prev"]
-                )
+    panels, errors = load_panels(symbols, (timeframe,))
+    for symbol in symbols:
+        if symbol in errors:
+            raise errors[symbol]
+
+    offset = 1 if timeframe == "weekly" else 5
+    distances = sma_distances(panels[timeframe], offset)
+    for symbol in symbols:
+        for window, label in ((12, "now"), (36, "now"), (12, "prev"), (36, "prev")):
+            pair = distances[symbol][(window, label)]
+            value = _sma_distance_pct(*pair) if pair is not None else None
+            if isinstance(value, (int, float)):
+                key = f"distance_{window}d" if label == "now" else f"distance_{window}d_prev"
+                results[key][symbol] = float(value)
 
     return results
 
@@ -264,52 +299,58 @@ def _scores_against_baseline(
     return _scores_against_values(returns, benchmark_returns)
 
 
-def _portfolio_returns(period_days: int) -> dict[str, float]:
-    global PORTFOLIO_RETURNS_CACHE, PORTFOLIO_RETURNS_LAST_UPDATED
-
-    now = time()
-    cached = PORTFOLIO_RETURNS_CACHE.get(period_days)
-    last_updated = PORTFOLIO_RETURNS_LAST_UPDATED.get(period_days, 0.0)
-    if cached and now - last_updated < PORTFOLIO_RETURNS_TTL_SECONDS:
-        return cached
+def _price_versions_key(versions: dict[str, int | None]) -> tuple[tuple[str, int | None], ...]:
+    return tuple(sorted(versions.items()))
 
-    equities = _get_portfolio_equities()
-    symbols = [item["ticker"] for item in equities if isinstance(item.get("ticker"), str)]
-    if not symbols:
-        PORTFOLIO_RETURNS_CACHE[period_days] = {}
-        PORTFOLIO_RETURNS_LAST_UPDATED[period_days] = now
-        return PORTFOLIO_RETURNS_CACHE[period_days]
 
-    price_data_map: dict[str, pd.DataFrame] = {}
+def _price_versions(symbols) -> dict[str, int | None]:
+    """Current price-data version per symbol, fetched in parallel; failures are skipped."""
+    versions: dict[str, int | None] = {}
     with ThreadPoolExecutor(max_workers=8) as executor:
-        fetch_futures = {
-            executor.submit(StockAnalyser.get_price_data, symbol): symbol for symbol in symbols
+        version_futures = {
+            executor.submit(StockAnalyser.get_price_data_version, symbol): symbol
+            for symbol in symbols
         }
-        for future in as_completed(fetch_futures):
-            symbol = fetch_futures[future]
+        for future in as_completed(version_futures):
+            symbol = version_futures[future]
             try:
-                price_data_map[symbol] = future.result()
+                versions[symbol] = future.result()
             except Exception:
                 continue
+    return versions
+
+
+def _portfolio_returns(period_days: int) -> dict[str, float]:
+    equities = _get_portfolio_equities()
+    symbols = [item["ticker"] for item in equities if isinstance(item.get("ticker"), str)]
+    if not symbols:
+        return {}
+
+    versions = _price_versions(symbols)
+    versions_key = _price_versions_key(versions)
+    cached = PORTFOLIO_RETURNS_CACHE.get(period_days)
+    if cached and cached[0] == versions_key:
+        return cached[1]
 
     returns: dict[str, float] = {}
-    for symbol, df in price_data_map.items():
+    for symbol in versions:
+        try:
+            df = StockAnalyser.get_price_data(symbol)
+        except Exception:
+            continue
         _, value = _return_for_symbol(symbol, period_days, price_data=df)
         if value is not None:
             returns[symbol] = value
 
-    PORTFOLIO_RETURNS_CACHE[period_days] = returns
-    PORTFOLIO_RETURNS_LAST_UPDATED[period_days] = now
-    return PORTFOLIO_RETURNS_CACHE[period_days]
+    PORTFOLIO_RETURNS_CACHE[period_days] = (versions_key, returns)
+    return returns
 
-def _update_portfolio_returns_cache(returns: dict[str, float], period_days: int):
+def _update_portfolio_returns_cache(
+    returns: dict[str, float], period_days: int, versions: dict[str, int | None]
+):
     """Persist precomputed portfolio returns to avoid redundant downloads."""
 
-    global PORTFOLIO_RETURNS_CACHE, PORTFOLIO_RETURNS_LAST_UPDATED
-
-    now = time()
-    PORTFOLIO_RETURNS_CACHE[period_days] = returns
-    PORTFOLIO_RETURNS_LAST_UPDATED[period_days] = now
+    PORTFOLIO_RETURNS_CACHE[period_days] = (_price_versions_key(versions), returns)
 
 
 @app.post("/custom_momentum")
@@ -369,6 +410,10 @@ def sma_momentum(
     list_type: str = Query("portfolio", enum=["portfolio", "watchlist"]),
     timeframe: Literal["daily", "weekly"] = Query("daily"),
 ):
+    stored = snapshot_value(snapshot_key("/sma_momentum", list_type=list_type, timeframe=timeframe))
+    if stored is not None:
+        return stored
+
     if list_type == "portfolio":
         equities = _get_portfolio_equities()
         symbols = [item["ticker"] for item in equities if "ticker" in item]
@@ -410,8 +455,9 @@ def custom_sma_momentum(payload: CustomSmaMomentumRequest):
 
 
 @app.post("/analyse", response_model=StockAnalysisResponse)
+@single_flight
 def analyse(stock_request: StockRequest):
-    analyser = StockAnalyser(stock_request.symbol)
+    analyser = get_analyser(stock_request.symbol)
     change_amt, change_pct = analyser.get_daily_change()
     closes = analyser.df.get("Close")
     if closes is not None and isinstance(closes, pd.DataFrame):
@@ -506,7 +552,7 @@ def analyse(stock_request: StockRequest):
 
 @app.post("/elliott", response_model=ElliottWaveScenariosResponse)
 def elliott(stock_request: StockRequest):
-    analyser = StockAnalyser(stock_request.symbol)
+    analyser = get_analyser(stock_request.symbol)
     df = analyser.df
 
     elliott_result = calculate_elliott_wave(df)
@@ -550,379 +596,445 @@ def get_portfolio_tickers():
     ]
 
 
-def _status_for_holdings(
-    holdings,
-    price_direction: str,
-    *,
-    momentum_only: bool = False,
-    baseline: Literal["portfolio", "spx", "dji", "iwm", "nasdaq"] = "portfolio",
-):
+_STATUS_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="holding-status")
+
+
+def _empty_status_results(price_direction: str, momentum_only: bool) -> dict:
     price_key_20 = "below_20dma" if price_direction == "below" else "above_20dma"
     price_key_200 = "below_200dma" if price_direction == "below" else "above_200dma"
     ma_prefix = "below" if price_direction == "below" else "above"
-    ma40_key = f"{ma_prefix}_40wma"
-    ma70_key = f"{ma_prefix}_70wma"
-    ma3y_key = f"{ma_prefix}_3yma"
 
-    results = (
-        {
-            "momentum_weekly": {},
-            "momentum_monthly": {},
-            "portfolio_momentum_weekly": {},
-            "portfolio_momentum_monthly": {},
-            "portfolio_values": {},
-        }
-        if momentum_only
-        else {
-            price_key_20: [],
-            price_key_200: [],
-            ma40_key: [],
-            ma70_key: [],
-            ma3y_key: [],
-            "candle_signals": {},
-            "extended_vol": {},
-            "super_trend_daily": {},
-            "mansfield_daily": {},
-            "mace": {},
-            "stage": {},
-            "short_term_trend": {},
-            "long_term_trend": {},
-            "breach_hit": {},
-            "ma_crossovers": {},
+    if momentum_only:
+        return {
             "momentum_weekly": {},
             "momentum_monthly": {},
             "portfolio_momentum_weekly": {},
             "portfolio_momentum_monthly": {},
             "portfolio_values": {},
-            "divergence": {},
         }
-    )
+    return {
+        price_key_20: [],
+        price_key_200: [],
+        f"{ma_prefix}_40wma": [],
+        f"{ma_prefix}_70wma": [],
+        f"{ma_prefix}_3yma": [],
+        "candle_signals": {},
+        "extended_vol": {},
+        "super_trend_daily": {},
+        "mansfield_daily": {},
+        "mace": {},
+        "stage": {},
+        "short_term_trend": {},
+        "long_term_trend": {},
+        "breach_hit": {},
+        "ma_crossovers": {},
+        "momentum_weekly": {},
+        "momentum_monthly": {},
+        "portfolio_momentum_weekly": {},
+        "portfolio_momentum_monthly": {},
+        "portfolio_values": {},
+        "divergence": {},
+    }
 
-    weekly_portfolio_returns: dict[str, float] = {}
-    monthly_portfolio_returns: dict[str, float] = {}
 
-    for holding in holdings:
-        ticker = holding.get("ticker")
-        if not ticker:
-            continue
-        try:
-            analyser = StockAnalyser(ticker)
-            flagged = False
+def _holding_status(holding, price_direction: str, *, momentum_only: bool = False):
+    """Status results for a single holding, shaped like ``_status_for_holdings``'.
+
+    Returns ``(results, returns)``; ``returns`` carries the holding's weekly
+    and monthly returns and its price-data version for the portfolio
+    baseline.  Whatever was computed before an error is kept.
+    """
+    ticker = holding.get("ticker")
+    price_key_20 = "below_20dma" if price_direction == "below" else "above_20dma"
+    price_key_200 = "below_200dma" if price_direction == "below" else "above_200dma"
+    ma_prefix = "below" if price_direction == "below" else "above"
+    ma40_key = f"{ma_prefix}_40wma"
+    ma70_key = f"{ma_prefix}_70wma"
+    ma3y_key = f"{ma_prefix}_3yma"
 
-            closes = analyser.df["Close"]
-            if isinstance(closes, pd.DataFrame):
-                closes = closes.iloc[:, 0]
+    results = _empty_status_results(price_direction, momentum_only)
+    returns: dict[str, float | int | None] = {}
+    try:
+        analyser = get_analyser(ticker)
+        returns["version"] = analyser.data_version
+        flagged = False
+
+        closes = analyser.df["Close"]
+        if isinstance(closes, pd.DataFrame):
+            closes = closes.iloc[:, 0]
+
+        weekly_return = period_return(closes, 5)
+        monthly_return = period_return(closes, 21)
+        last_close = safe_value(closes, -1)
+
+        shares = holding.get("shares")
+        if isinstance(shares, (int, float)) and isinstance(
+            last_close, (int, float)
+        ):
+            results["portfolio_values"][ticker] = float(shares) * float(
+                last_close
+            )
 
-            weekly_return = period_return(closes, 5)
-            monthly_return = period_return(closes, 21)
+        if not momentum_only:
+            price = analyser.get_current_price()
             last_close = safe_value(closes, -1)
+            prev_close = safe_value(closes, -2)
 
-            shares = holding.get("shares")
-            if isinstance(shares, (int, float)) and isinstance(
-                last_close, (int, float)
+            def _latest_weekly_ma(period: int):
+                try:
+                    weekly_close = analyser.weekly_df["Close"]
+                except Exception:
+                    return None, None
+                if isinstance(weekly_close, pd.DataFrame):
+                    weekly_close = weekly_close.iloc[:, 0]
+                ma_series = weekly_close.rolling(window=period).mean()
+                return safe_value(ma_series, -1), safe_value(ma_series, -2)
+
+            ma_40, ma_40_prev = _latest_weekly_ma(40)
+            ma_70, ma_70_prev = _latest_weekly_ma(70)
+            ma_3y, ma_3y_prev = _latest_weekly_ma(156)
+
+            ma20_series = closes.rolling(window=20).mean()
+            ma200_series = closes.rolling(window=200).mean()
+            twenty = safe_value(ma20_series, -1)
+            ma20_prev = safe_value(ma20_series, -2)
+            two_hundred = safe_value(ma200_series, -1)
+            ma200_prev = safe_value(ma200_series, -2)
+
+            short_trend = analyser.short_term_trend_score()
+            short_total = short_trend.get("total") if isinstance(short_trend, dict) else None
+            results["short_term_trend"][ticker] = (
+                short_total if isinstance(short_total, (int, float)) else None
+            )
+
+            long_trend = analyser.long_term_trend_score()
+            long_total = long_trend.get("total") if isinstance(long_trend, dict) else None
+            results["long_term_trend"][ticker] = (
+                long_total if isinstance(long_total, (int, float)) else None
+            )
+
+        if not momentum_only:
+            peers_for_analysis = get_fmp_peers(ticker)
+            peer_returns_map = _peer_returns(peers_for_analysis, (5, 21))
+
+            weekly_momentum_score = sector_relative_momentum_zscore(
+                ticker,
+                closes,
+                5,
+                peers_override=peers_for_analysis,
+                peer_returns=peer_returns_map.get(5),
+                base_return=weekly_return,
+            )
+            if isinstance(weekly_momentum_score, (int, float)):
+                results["momentum_weekly"][ticker] = weekly_momentum_score
+
+            monthly_momentum_score = sector_relative_momentum_zscore(
+                ticker,
+                closes,
+                21,
+                peers_override=peers_for_analysis,
+                peer_returns=peer_returns_map.get(21),
+                base_return=monthly_return,
+            )
+            if isinstance(monthly_momentum_score, (int, float)):
+                results["momentum_monthly"][ticker] = monthly_momentum_score
+
+        if isinstance(weekly_return, (int, float)):
+            returns["weekly"] = weekly_return
+
+        if isinstance(monthly_return, (int, float)):
+            returns["monthly"] = monthly_return
+
+        if momentum_only:
+            return results, returns
+
+        if isinstance(price, (int, float)) and isinstance(twenty, (int, float)):
+            if price_direction == "below" and price < twenty:
+                results[price_key_20].append(ticker)
+                flagged = True
+            if price_direction == "above" and price >= twenty:
+                results[price_key_20].append(ticker)
+                flagged = True
+
+        if isinstance(price, (int, float)) and isinstance(two_hundred, (int, float)):
+            if price_direction == "below" and price < two_hundred:
+                results[price_key_200].append(ticker)
+                flagged = True
+            if price_direction == "above" and price >= two_hundred:
+                results[price_key_200].append(ticker)
+                flagged = True
+        
+        def _detect_cross(ma_current, ma_previous=None):
+            if not (
+                isinstance(last_close, (int, float))
+                and isinstance(prev_close, (int, float))
+                and isinstance(ma_current, (int, float))
             ):
-                results["portfolio_values"][ticker] = float(shares) * float(
-                    last_close
-                )
+                return None
+            prev_ma_val = ma_previous if isinstance(ma_previous, (int, float)) else ma_current
+            prev_diff = prev_close - prev_ma_val
+            curr_diff = last_close - ma_current
+            if prev_diff < 0 <= curr_diff:
+                return "above"
+            if prev_diff >= 0 > curr_diff:
+                return "below"
+            return None
+
+        def _compare_price(ma_value, key):
+            nonlocal flagged
+            if not (
+                isinstance(price, (int, float)) and isinstance(ma_value, (int, float))
+            ):
+                return
+            if price_direction == "below" and price < ma_value:
+                results[key].append(ticker)
+                flagged = True
+            if price_direction == "above" and price >= ma_value:
+                results[key].append(ticker)
+                flagged = True
 
-            if not momentum_only:
-                price = analyser.get_current_price()
-                last_close = safe_value(closes, -1)
-                prev_close = safe_value(closes, -2)
-
-                def _latest_weekly_ma(period: int):
-                    try:
-                        weekly_close = analyser.weekly_df["Close"]
-                    except Exception:
-                        return None, None
-                    if isinstance(weekly_close, pd.DataFrame):
-                        weekly_close = weekly_close.iloc[:, 0]
-                    ma_series = weekly_close.rolling(window=period).mean()
-                    return safe_value(ma_series, -1), safe_value(ma_series, -2)
-
-                ma_40, ma_40_prev = _latest_weekly_ma(40)
-                ma_70, ma_70_prev = _latest_weekly_ma(70)
-                ma_3y, ma_3y_prev = _latest_weekly_ma(156)
-
-                ma20_series = closes.rolling(window=20).mean()
-                ma200_series = closes.rolling(window=200).mean()
-                twenty = safe_value(ma20_series, -1)
-                ma20_prev = safe_value(ma20_series, -2)
-                two_hundred = safe_value(ma200_series, -1)
-                ma200_prev = safe_value(ma200_series, -2)
-
-                short_trend = analyser.short_term_trend_score()
-                short_total = short_trend.get("total") if isinstance(short_trend, dict) else None
-                results["short_term_trend"][ticker] = (
-                    short_total if isinstance(short_total, (int, float)) else None
-                )
+        _compare_price(ma_40, ma40_key)
+        _compare_price(ma_70, ma70_key)
+        _compare_price(ma_3y, ma3y_key)
+
+        ma_cross = {}
+        for cross_key, current, previous in (
+            ("20dma", twenty, ma20_prev),
+            ("200dma", two_hundred, ma200_prev),
+            ("40wma", ma_40, ma_40_prev),
+            ("70wma", ma_70, ma_70_prev),
+            ("3yma", ma_3y, ma_3y_prev),
+        ):
+            direction = _detect_cross(current, previous)
+            if direction:
+                ma_cross[cross_key] = direction
 
-                long_trend = analyser.long_term_trend_score()
-                long_total = long_trend.get("total") if isinstance(long_trend, dict) else None
-                results["long_term_trend"][ticker] = (
-                    long_total if isinstance(long_total, (int, float)) else None
-                )
+        if ma_cross:
+            results["ma_crossovers"][ticker] = ma_cross
+
+        divergence = {
+            "daily": analyser.simple_divergence_daily(),
+            "weekly": analyser.simple_divergence_weekly(),
+            "monthly": analyser.simple_divergence_monthly(),
+        }
+        if any(
+            isinstance(val, str) and val != "No Divergence"
+            for val in divergence.values()
+        ):
+            results["divergence"][ticker] = divergence
+            flagged = True    
 
-            if not momentum_only:
-                peers_for_analysis = get_fmp_peers(ticker)
-                peer_returns_map = _peer_returns(peers_for_analysis, (5, 21))
-
-                weekly_momentum_score = sector_relative_momentum_zscore(
-                    ticker,
-                    closes,
-                    5,
-                    peers_override=peers_for_analysis,
-                    peer_returns=peer_returns_map.get(5),
-                    base_return=weekly_return,
+        timeframe_order = {"daily": 0, "weekly": 1, "monthly": 2}
+
+        def _collect_patterns(
+            name: str, patterns: dict | None, store: dict[tuple[str, str], set[str]]
+        ):
+            if not isinstance(patterns, dict):
+                return
+            for timeframe, pattern in patterns.items():
+                if not isinstance(pattern, str):
+                    continue
+                lower = pattern.lower()
+                pattern_type = None
+                if "bullish" in lower:
+                    pattern_type = "bullish"
+                elif "bearish" in lower:
+                    pattern_type = "bearish"
+                if not pattern_type:
+                    continue
+                key = (name, pattern_type)
+                store.setdefault(key, set()).add(timeframe)
+
+        candle_patterns: dict[tuple[str, str], set[str]] = {}
+        _collect_patterns("engulfing", analyser.detect_engulfing(), candle_patterns)
+        _collect_patterns("harami", analyser.detect_harami(), candle_patterns)
+
+        if candle_patterns:
+            summary = []
+            for (pattern_name, pattern_type), frames in candle_patterns.items():
+                if not frames:
+                    continue
+                ordered_frames = sorted(
+                    frames, key=lambda tf: timeframe_order.get(tf, 99)
                 )
-                if isinstance(weekly_momentum_score, (int, float)):
-                    results["momentum_weekly"][ticker] = weekly_momentum_score
-
-                monthly_momentum_score = sector_relative_momentum_zscore(
-                    ticker,
-                    closes,
-                    21,
-                    peers_override=peers_for_analysis,
-                    peer_returns=peer_returns_map.get(21),
-                    base_return=monthly_return,
+                summary.append(
+                    {
+                        "pattern": pattern_name,
+                        "type": pattern_type,
+                        "timeframes": ordered_frames,
+                    }
                 )
-                if isinstance(monthly_momentum_score, (int, float)):
-                    results["momentum_monthly"][ticker] = monthly_momentum_score
+            if summary:
+                results["candle_signals"][ticker] = summary
+                flagged = True
 
-            if isinstance(weekly_return, (int, float)):
-                weekly_portfolio_returns[ticker] = weekly_return
+        rsi_now = analyser.latest_indicator(WilderRSI(14))
+        rsi_val = round(rsi_now, 2) if not math.isnan(rsi_now) else None
+        if isinstance(rsi_val, (int, float)):
+            if rsi_val >= 70:
+                results["extended_vol"][ticker] = "overbought"
+                flagged = True
+            elif rsi_val <= 30:
+                results["extended_vol"][ticker] = "oversold"
+                flagged = True
 
-            if isinstance(monthly_return, (int, float)):
-                monthly_portfolio_returns[ticker] = monthly_return
+        try:
+            trend, _ = analyser.latest_indicator(SuperTrend())
+            signal = "Buy" if trend == 1 else "Sell"
+            if isinstance(signal, str) and signal:
+                results["super_trend_daily"][ticker] = {"signal": signal}
+                flagged = True
+        except Exception:
+            pass
 
-            if momentum_only:
-                continue
+        mansfield_status = analyser.get_mansfield_status()
+        if isinstance(mansfield_status, dict):
+            results["mansfield_daily"][ticker] = mansfield_status
+            if mansfield_status.get("status"):
+                flagged = True
 
-            if isinstance(price, (int, float)) and isinstance(twenty, (int, float)):
-                if price_direction == "below" and price < twenty:
-                    results[price_key_20].append(ticker)
-                    flagged = True
-                if price_direction == "above" and price >= twenty:
-                    results[price_key_20].append(ticker)
-                    flagged = True
-
-            if isinstance(price, (int, float)) and isinstance(two_hundred, (int, float)):
-                if price_direction == "below" and price < two_hundred:
-                    results[price_key_200].append(ticker)
-                    flagged = True
-                if price_direction == "above" and price >= two_hundred:
-                    results[price_key_200].append(ticker)
-                    flagged = True
-            
-            def _detect_cross(ma_current, ma_previous=None):
-                if not (
-                    isinstance(last_close, (int, float))
-                    and isinstance(prev_close, (int, float))
-                    and isinstance(ma_current, (int, float))
-                ):
-                    return None
-                prev_ma_val = ma_previous if isinstance(ma_previous, (int, float)) else ma_current
-                prev_diff = prev_close - prev_ma_val
-                curr_diff = last_close - ma_current
-                if prev_diff < 0 <= curr_diff:
-                    return "above"
-                if prev_diff >= 0 > curr_diff:
-                    return "below"
-                return None
+        mace_signal = analyser.mace().current
+        if isinstance(mace_signal, str) and mace_signal not in {"", "in progress"}:
+            forty_week = analyser.forty_week_status().current
+            trend_suffix: str | None = None
+            if isinstance(forty_week, str):
+                parts = forty_week.strip().split()
+                if parts:
+                    last = parts[-1]
+                    if set(last).issubset({"+", "-"}) and len(last) == 2:
+                        trend_suffix = last
+            results["mace"][ticker] = {
+                "label": mace_signal,
+                "trend": trend_suffix,
+            }
+            flagged = True
+        
+        def _sanitize_level(value):
+            return value if isinstance(value, (int, float)) and value > 0 else None
 
-            def _compare_price(ma_value, key):
-                nonlocal flagged
-                if not (
-                    isinstance(price, (int, float)) and isinstance(ma_value, (int, float))
-                ):
-                    return
-                if price_direction == "below" and price < ma_value:
-                    results[key].append(ticker)
-                    flagged = True
-                if price_direction == "above" and price >= ma_value:
-                    results[key].append(ticker)
-                    flagged = True
-
-            _compare_price(ma_40, ma40_key)
-            _compare_price(ma_70, ma70_key)
-            _compare_price(ma_3y, ma3y_key)
-
-            ma_cross = {}
-            for cross_key, current, previous in (
-                ("20dma", twenty, ma20_prev),
-                ("200dma", two_hundred, ma200_prev),
-                ("40wma", ma_40, ma_40_prev),
-                ("70wma", ma_70, ma_70_prev),
-                ("3yma", ma_3y, ma_3y_prev),
-            ):
-                direction = _detect_cross(current, previous)
-                if direction:
-                    ma_cross[cross_key] = direction
+        def _breach_status(current_price, levels):
+            status = None
+            category = "neutral"
 
-            if ma_cross:
-                results["ma_crossovers"][ticker] = ma_cross
+            if not isinstance(current_price, (int, float)):
+                return status, category
 
-            divergence = {
-                "daily": analyser.simple_divergence_daily(),
-                "weekly": analyser.simple_divergence_weekly(),
-                "monthly": analyser.simple_divergence_monthly(),
-            }
-            if any(
-                isinstance(val, str) and val != "No Divergence"
-                for val in divergence.values()
+            if levels.get("target") is not None and current_price >= levels["target"]:
+                return "Hit Target", "target"
+            if levels.get("target_3") is not None and current_price >= levels["target_3"]:
+                return "Hit Target 3", "target"
+            if levels.get("target_2") is not None and current_price >= levels["target_2"]:
+                return "Hit Target 2", "target"
+            if levels.get("target_1") is not None and current_price >= levels["target_1"]:
+                return "Hit Target 1", "target"
+            if (
+                levels.get("invalidation_3") is not None
+                and current_price <= levels["invalidation_3"]
             ):
-                results["divergence"][ticker] = divergence
-                flagged = True    
-
-            timeframe_order = {"daily": 0, "weekly": 1, "monthly": 2}
-
-            def _collect_patterns(
-                name: str, patterns: dict | None, store: dict[tuple[str, str], set[str]]
+                return "Breached Level 3", "invalidation"
+            if (
+                levels.get("invalidation_2") is not None
+                and current_price <= levels["invalidation_2"]
             ):
-                if not isinstance(patterns, dict):
-                    return
-                for timeframe, pattern in patterns.items():
-                    if not isinstance(pattern, str):
-                        continue
-                    lower = pattern.lower()
-                    pattern_type = None
-                    if "bullish" in lower:
-                        pattern_type = "bullish"
-                    elif "bearish" in lower:
-                        pattern_type = "bearish"
-                    if not pattern_type:
-                        continue
-                    key = (name, pattern_type)
-                    store.setdefault(key, set()).add(timeframe)
-
-            candle_patterns: dict[tuple[str, str], set[str]] = {}
-            _collect_patterns("engulfing", analyser.detect_engulfing(), candle_patterns)
-            _collect_patterns("harami", analyser.detect_harami(), candle_patterns)
-
-            if candle_patterns:
-                summary = []
-                for (pattern_name, pattern_type), frames in candle_patterns.items():
-                    if not frames:
-                        continue
-                    ordered_frames = sorted(
-                        frames, key=lambda tf: timeframe_order.get(tf, 99)
-                    )
-                    summary.append(
-                        {
-                            "pattern": pattern_name,
-                            "type": pattern_type,
-                            "timeframes": ordered_frames,
-                        }
-                    )
-                if summary:
-                    results["candle_signals"][ticker] = summary
-                    flagged = True
-
-            rsi_series = compute_wilder_rsi(analyser.df["Close"])
-            rsi_val = safe_value(rsi_series, -1)
-            if isinstance(rsi_val, (int, float)):
-                if rsi_val >= 70:
-                    results["extended_vol"][ticker] = "overbought"
-                    flagged = True
-                elif rsi_val <= 30:
-                    results["extended_vol"][ticker] = "oversold"
-                    flagged = True
+                return "Breached Level 2", "invalidation"
+            if (
+                levels.get("invalidation_1") is not None
+                and current_price <= levels["invalidation_1"]
+            ):
+                return "Breached Level 1", "invalidation"
+
+            return status, category
+
+        levels = {
+            "target": _sanitize_level(holding.get("target")),
+            "target_3": _sanitize_level(holding.get("target_3")),
+            "target_2": _sanitize_level(holding.get("target_2")),
+            "target_1": _sanitize_level(holding.get("target_1")),
+            "invalidation_1": _sanitize_level(holding.get("invalidation_1")),
+            "invalidation_2": _sanitize_level(holding.get("invalidation_2")),
+            "invalidation_3": _sanitize_level(holding.get("invalidation_3")),
+        }
 
-            try:
-                daily_super_trend = compute_supertrend_lines(analyser.df)
-                signal = safe_value(daily_super_trend.get("Signal"), -1)
-                if isinstance(signal, str) and signal:
-                    results["super_trend_daily"][ticker] = {"signal": signal}
-                    flagged = True
-            except Exception:
-                pass
-
-            mansfield_status = analyser.get_mansfield_status()
-            if isinstance(mansfield_status, dict):
-                results["mansfield_daily"][ticker] = mansfield_status
-                if mansfield_status.get("status"):
-                    flagged = True
-
-            mace_signal = analyser.mace().current
-            if isinstance(mace_signal, str) and mace_signal not in {"", "in progress"}:
-                forty_week = analyser.forty_week_status().current
-                trend_suffix: str | None = None
-                if isinstance(forty_week, str):
-                    parts = forty_week.strip().split()
-                    if parts:
-                        last = parts[-1]
-                        if set(last).issubset({"+", "-"}) and len(last) == 2:
-                            trend_suffix = last
-                results["mace"][ticker] = {
-                    "label": mace_signal,
-                    "trend": trend_suffix,
+        status, category = _breach_status(price, levels)
+        results["breach_hit"][ticker] = {
+            "status": status,
+            "category": category,
+        }
+
+        if flagged:
+            stage_val, weeks = analyser.stage_analysis()
+            if stage_val is not None:
+                results["stage"][ticker] = {
+                    "stage": stage_val,
+                    "weeks": weeks,
                 }
-                flagged = True
-            
-            def _sanitize_level(value):
-                return value if isinstance(value, (int, float)) and value > 0 else None
-
-            def _breach_status(current_price, levels):
-                status = None
-                category = "neutral"
-
-                if not isinstance(current_price, (int, float)):
-                    return status, category
-
-                if levels.get("target") is not None and current_price >= levels["target"]:
-                    return "Hit Target", "target"
-                if levels.get("target_3") is not None and current_price >= levels["target_3"]:
-                    return "Hit Target 3", "target"
-                if levels.get("target_2") is not None and current_price >= levels["target_2"]:
-                    return "Hit Target 2", "target"
-                if levels.get("target_1") is not None and current_price >= levels["target_1"]:
-                    return "Hit Target 1", "target"
-                if (
-                    levels.get("invalidation_3") is not None
-                    and current_price <= levels["invalidation_3"]
-                ):
-                    return "Breached Level 3", "invalidation"
-                if (
-                    levels.get("invalidation_2") is not None
-                    and current_price <= levels["invalidation_2"]
-                ):
-                    return "Breached Level 2", "invalidation"
-                if (
-                    levels.get("invalidation_1") is not None
-                    and current_price <= levels["invalidation_1"]
-                ):
-                    return "Breached Level 1", "invalidation"
+    except Exception:
+        pass
+    return results, returns
 
-                return status, category
 
-            levels = {
-                "target": _sanitize_level(holding.get("target")),
-                "target_3": _sanitize_level(holding.get("target_3")),
-                "target_2": _sanitize_level(holding.get("target_2")),
-                "target_1": _sanitize_level(holding.get("target_1")),
-                "invalidation_1": _sanitize_level(holding.get("invalidation_1")),
-                "invalidation_2": _sanitize_level(holding.get("invalidation_2")),
-                "invalidation_3": _sanitize_level(holding.get("invalidation_3")),
-            }
+def _merge_status_results(results: dict, partial: dict) -> None:
+    for key, value in partial.items():
+        if isinstance(value, list):
+            results[key].extend(value)
+        else:
+            results[key].update(value)
 
-            status, category = _breach_status(price, levels)
-            results["breach_hit"][ticker] = {
-                "status": status,
-                "category": category,
-            }
 
-            if flagged:
-                stage_val, weeks = analyser.stage_analysis()
-                if stage_val is not None:
-                    results["stage"][ticker] = {
-                        "stage": stage_val,
-                        "weeks": weeks,
-                    }
-        except Exception:
-            continue
+def _status_for_holdings(
+    holdings,
+    price_direction: str,
+    *,
+    momentum_only: bool = False,
+    baseline: Literal["portfolio", "spx", "dji", "iwm", "nasdaq"] = "portfolio",
+    time_budget: float | None = None,
+):
+    """Status tables for ``holdings``, computed per holding on a bounded pool.
+
+    Results are merged in holding order, so the output does not depend on
+    which holding finishes first.  With ``time_budget`` (seconds) the
+    response carries whatever finished in time and lists the remaining
+    tickers under ``pending``.  Holdings already running finish in the
+    background and warm the analysis caches; queued ones are cancelled so an
+    abandoned request does not leave work behind.
+    """
+    results = _empty_status_results(price_direction, momentum_only)
+
+    tasks = [
+        (
+            holding["ticker"],
+            _STATUS_EXECUTOR.submit(
+                _holding_status, holding, price_direction, momentum_only=momentum_only
+            ),
+        )
+        for holding in holdings
+        if holding.get("ticker")
+    ]
+    finished, _ = wait([future for _, future in tasks], timeout=time_budget)
+
+    weekly_portfolio_returns: dict[str, float] = {}
+    monthly_portfolio_returns: dict[str, float] = {}
+    price_versions: dict[str, int | None] = {}
+    pending: list[str] = []
 
-    _update_portfolio_returns_cache(weekly_portfolio_returns, 5)
-    _update_portfolio_returns_cache(monthly_portfolio_returns, 21)
+    for ticker, future in tasks:
+        if future not in finished:
+            future.cancel()
+            pending.append(ticker)
+            continue
+        partial, returns = future.result()
+        _merge_status_results(results, partial)
+        if "version" in returns:
+            price_versions[ticker] = returns["version"]
+        if "weekly" in returns:
+            weekly_portfolio_returns[ticker] = returns["weekly"]
+        if "monthly" in returns:
+            monthly_portfolio_returns[ticker] = returns["monthly"]
+
+    # A partial run would cache returns for only part of the portfolio.
+    if not pending:
+        _update_portfolio_returns_cache(weekly_portfolio_returns, 5, price_versions)
+        _update_portfolio_returns_cache(monthly_portfolio_returns, 21, price_versions)
 
     results["portfolio_momentum_weekly"] = _scores_against_baseline(
         weekly_portfolio_returns, baseline, 5
@@ -930,15 +1042,27 @@ def _status_for_holdings(
     results["portfolio_momentum_monthly"] = _scores_against_baseline(
         monthly_portfolio_returns, baseline, 21
     )
+    results["pending"] = pending
 
     return results
 
+
 @app.get("/portfolio_status")
+@single_flight
 def get_portfolio_status(
     direction: Literal["above", "below"] = Query("below"),
     scope: Literal["full", "momentum"] = Query("full"),
     baseline: Literal["portfolio", "spx", "dji", "iwm", "nasdaq"] = Query("portfolio"),
+    time_budget: float | None = Query(None, gt=0),
 ):
+    # A current snapshot entry is complete and costs no analysis, so it meets
+    # any time budget; superseded entries fall through to the budgeted run.
+    stored = snapshot_value(
+        snapshot_key("/portfolio_status", direction=direction, scope=scope, baseline=baseline)
+    )
+    if stored is not None:
+        return stored
+
     json_path = Path("portfolio_store.json")
     price_key_20 = "below_20dma" if direction == "below" else "above_20dma"
     price_key_200 = "below_200dma" if direction == "below" else "above_200dma"
@@ -992,6 +1116,7 @@ def get_portfolio_status(
         direction,
         momentum_only=scope == "momentum",
         baseline=baseline,
+        time_budget=time_budget,
     )
 
 
@@ -1005,35 +1130,38 @@ def get_mace_scores(request: MaceScoresRequest):
             "recent_weighted_change": {},
         }
 
-    def _fetch_score(symbol: str):
-        analyser = StockAnalyser(symbol)
-        metric = analyser.mace_score()
-        recent_change = analyser.mace_score_recent_change()
+    stored = snapshot_value(snapshot_key("/mace_scores"))
+    if stored is not None and all(symbol in stored for symbol in symbols):
         return {
-            "symbol": symbol,
-            "current": metric.current,
-            "twentyone_days_ago": metric.twentyone_days_ago,
-            "recent_weighted_change": recent_change,
+            field: {symbol: stored[symbol][field] for symbol in symbols}
+            for field in ("current", "twentyone_days_ago", "recent_weighted_change")
         }
 
+    panels, errors = load_panels(symbols, ("weekly",))
+    computed = mace_scores(panels["weekly"])
+
     scores = {"current": {}, "twentyone_days_ago": {}, "recent_weighted_change": {}}
-    with ThreadPoolExecutor(max_workers=8) as executor:
-        futures = {executor.submit(_fetch_score, symbol): symbol for symbol in symbols}
-        for future in as_completed(futures):
-            symbol = futures[future]
-            try:
-                result = future.result()
-                scores["current"][symbol] = result["current"]
-                scores["twentyone_days_ago"][symbol] = result["twentyone_days_ago"]
-                scores["recent_weighted_change"][symbol] = result[
-                    "recent_weighted_change"
-                ]
-            except Exception as exc:
-                print(f"MACE score error for {symbol}: {exc}")
+    for symbol in symbols:
+        if symbol in errors:
+            print(f"MACE score error for {symbol}: {errors[symbol]}")
+            continue
+        result = computed[symbol]
+        scores["current"][symbol] = result["current"]
+        scores["twentyone_days_ago"][symbol] = result["twentyone_days_ago"]
+        scores["recent_weighted_change"][symbol] = result["recent_weighted_change"]
 
     return convert_numpy_types(scores)
 
 
+def _fmp_metrics(symbol: str):
+    """FMP metrics and the date of the latest quarterly income statement they use."""
+    fundamentals = FMPFundamentals(symbol)
+    metrics = fundamentals.get_financial_metrics()
+    # Grab the latest quarterly income statement date (or use another source if you prefer)
+    as_of_date = fundamentals.income_data[0].get("date") if fundamentals.income_data else None
+    return metrics, as_of_date
+
+
 @app.get("/fmp_financials/{symbol}", response_model=FinancialMetrics)
 async def get_fmp_financials(symbol: str):
     try:
@@ -1046,10 +1174,7 @@ async def get_fmp_financials(symbol: str):
                 metrics_dict = metrics.model_dump() if hasattr(metrics, "model_dump") else metrics.dict()
                 return JSONResponse(metrics_dict)
             
-        fundamentals = FMPFundamentals(symbol)
-        metrics = fundamentals.get_financial_metrics()
-        # Grab the latest quarterly income statement date (or use another source if you prefer)
-        as_of_date = fundamentals.income_data[0].get("date") if fundamentals.income_data else None
+        metrics, as_of_date = await run_blocking("fundamentals", _fmp_metrics, symbol)
         # Convert metrics to dict
         metrics_dict = metrics.model_dump() if hasattr(metrics, "model_dump") else metrics.dict()
         # Add the as_of_date field
@@ -1133,6 +1258,25 @@ def preload_price_history():
 
     print("[warmup] Price data warmup complete")
 
+
+@app.on_event("startup")
+def start_snapshot_scheduler():
+    """Materialize list-level analytics nightly; see nightly_snapshot.py."""
+    start_scheduler()
+
+
+_loop_lag_task: asyncio.Task | None = None
+
+# Live quotes also extend the rolling minute bars behind the intraday timeframes.
+live_hub.add_quote_sink(minute_bars.add_quote)
+
+
+@app.on_event("startup")
+async def start_loop_lag_monitor():
+    """Report event loop stalls; see stock_analysis/execution.py."""
+    global _loop_lag_task
+    _loop_lag_task = asyncio.create_task(monitor_loop_lag())
+
 @app.get("/12data_financials/{symbol}", response_model=FinancialMetrics)
 async def get_financials(symbol: str):
     try:
@@ -1144,66 +1288,121 @@ async def get_financials(symbol: str):
             if now - ts < _FUNDAMENTALS_TTL_SECONDS:
                 return metrics
             
-        fundamentals = TwelveDataFundamentals(symbol)
-        metrics = fundamentals.get_financial_metrics()
+        metrics = await run_blocking(
+            "fundamentals", lambda: TwelveDataFundamentals(symbol).get_financial_metrics()
+        )
         _fundamentals_cache[cache_key] = (metrics, now)
         return metrics
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _chart_bars(analyser: StockAnalyser, timeframe: str) -> pd.DataFrame | None:
+    """OHLCV bars the chart draws for ``timeframe``, or None if it is not a chart timeframe."""
+    if timeframe == "daily":
+        return analyser.df
+    if timeframe in ("weekly", "monthly"):
+        return analyser.bars.ohlcv(timeframe)
+    if timeframe in INTRADAY_TIMEFRAMES:
+        return analyser.intraday_df(timeframe)
+    return None
+
+
+def _line_axes(analyser: StockAnalyser, timeframe: str) -> dict:
+    """Bar times of the daily and longer chart timeframes, sparsest first, plus
+    the requested intraday timeframe, as axes for compact line series."""
+    timeframes = ["monthly", "weekly", "daily"]
+    if timeframe in INTRADAY_TIMEFRAMES:
+        timeframes.append(timeframe)
+    return {name: epoch_seconds(_chart_bars(analyser, name).index) for name in timeframes}
+
+
+def _chart_lines(lines: dict, analyser: StockAnalyser, timeframe: str, window: dict, max_points: int | None):
+    """Line series cut to the request window and downsampled in step with the chart bars."""
+    lines = window_series(lines, **window)
+    if max_points is None:
+        return lines
+    bars = _chart_bars(analyser, timeframe)
+    axis_times = kept_times = None
+    if bars is not None:
+        bars = window_frame(bars, **window)
+        axis_times = epoch_seconds(bars.index)
+        kept_times = epoch_seconds(downsample_bars(bars, max_points).index)
+    return downsample_lines(lines, max_points, axis_times, kept_times)
+
+
+def _chart_history(symbol: str, timeframe: str, window: dict, max_points: int | None):
+    """Chart bars cut to the request window and downsampled.
+
+    Returns ``(bars, None)``, or ``(None, (status code, message))`` on error.
+    """
+    analyser = get_analyser(symbol)
+    hist_df = _chart_bars(analyser, timeframe)
+    if hist_df is None:
+        return None, (400, f"Invalid timeframe: {timeframe}")
+    if hist_df.empty:
+        return None, (404, f"No data found for symbol {symbol}")
+    hist_df = window_frame(hist_df, **window)
+    return downsample_bars(hist_df, max_points), None
+
+
+def _live_chart_bar(symbol: str, timeframe: str, session: SessionBar) -> dict | None:
+    if timeframe in INTRADAY_TIMEFRAMES:
+        return minute_bars.latest_bar(symbol, timeframe)
+    return live_bar(StockAnalyser.get_bar_store(symbol).daily, session, timeframe)
+
+
+async def _stream_live_bars(websocket: WebSocket, symbol: str, timeframe: str):
+    """Send ``{"live": bar}`` for each update of the in-progress bar until the client leaves."""
+    queue = live_hub.subscribe(symbol)
+    receiver = asyncio.ensure_future(websocket.receive())
+    try:
+        while True:
+            getter = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait({getter, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            if receiver in done:
+                getter.cancel()
+                if receiver.result()["type"] == "websocket.disconnect":
+                    return
+                # Clients have nothing to say on this socket; ignore what they send.
+                receiver = asyncio.ensure_future(websocket.receive())
+                continue
+            bar = await run_blocking("chart", _live_chart_bar, symbol, timeframe, getter.result())
+            if bar is not None:
+                await websocket.send_json({"live": bar})
+    finally:
+        receiver.cancel()
+        live_hub.unsubscribe(symbol, queue)
+
+
 @app.websocket("/ws/chart_data_{timeframe}/{symbol}")
-async def websocket_chart_data(websocket: WebSocket, timeframe: str, symbol: str):
+async def websocket_chart_data(
+    websocket: WebSocket,
+    timeframe: str,
+    symbol: str,
+    shape: HistoryShape = "rows",
+    since: int | None = None,
+    until: int | None = None,
+    limit: int | None = Query(None, gt=0),
+    after: int | None = None,
+    max_points: int | None = Query(None, ge=3),
+    live: bool = True,
+):
     await websocket.accept()
     try:
         raw_symbol = symbol.upper()
         symbol = SYMBOL_ALIASES.get(raw_symbol, raw_symbol)
 
-        analyser = StockAnalyser(symbol)
-        df = analyser.get_price_data(symbol)
-
-        if timeframe == "daily":
-            hist_df = df
-        elif timeframe == "weekly":
-            hist_df = df.resample("W-FRI").agg({
-                "Open": "first",
-                "High": "max",
-                "Low": "min",
-                "Close": "last",
-                "Volume": "sum"
-            }).dropna()
-        elif timeframe == "monthly":
-            hist_df = df.resample("M").agg({
-                "Open": "first",
-                "High": "max",
-                "Low": "min",
-                "Close": "last",
-                "Volume": "sum"
-            }).dropna()
-        else:
-            await websocket.send_json({"error": f"Invalid timeframe: {timeframe}"})
-            await websocket.close()
-            return
-
-        if hist_df.empty:
-            await websocket.send_json({"error": f"No data found for symbol {symbol}"})
+        window = dict(since=since, until=until, after=after, limit=limit)
+        hist_df, error = await run_blocking("chart", _chart_history, symbol, timeframe, window, max_points)
+        if error:
+            await websocket.send_json({"error": error[1]})
             await websocket.close()
             return
 
-        history = [
-            {
-                "time": int(ts.timestamp()),
-                "open": round(float(row["Open"]), 2),
-                "high": round(float(row["High"]), 2),
-                "low": round(float(row["Low"]), 2),
-                "close": round(float(row["Close"]), 2),
-                "volume": round(float(row["Volume"]), 2)
-            }
-            for ts, row in hist_df.iterrows()
-        ]
-
-        await websocket.send_json({"history": history})
+        await websocket.send_text(await run_blocking("chart", history_json, hist_df, shape))
 
-        last_ts = hist_df.index[-1]
+        if live:
+            await _stream_live_bars(websocket, symbol, timeframe)
 
     except WebSocketDisconnect:
         print(f"Client disconnected for {symbol}")
@@ -1211,58 +1410,280 @@ async def websocket_chart_data(websocket: WebSocket, timeframe: str, symbol: str
         print(f"WebSocket error for {symbol}: {e}")
         await websocket.close()
 
+STREAM_TICK_SECONDS = float(os.getenv("STREAM_TICK_MS", "250")) / 1000
+STREAM_CHANNELS = ("candles", "overlays", "signals")
+CHART_TIMEFRAMES = ("daily", "weekly", "monthly", *INTRADAY_TIMEFRAMES)
+
+
+def _resolve_symbol(symbol: str) -> str:
+    raw_symbol = symbol.upper().strip()
+    return SYMBOL_ALIASES.get(raw_symbol, raw_symbol)
+
+
+def _stream_snapshot(symbol: str, timeframe: str, channel: str, options: dict):
+    """Full data for one ``/ws/stream`` subscription: ``(history version, JSON text)``."""
+    version = StockAnalyser.get_history_version(_resolve_symbol(symbol))
+    analyser = get_analyser(symbol)
+    window = dict(limit=options.get("limit"))
+    max_points = options.get("max_points")
+    if channel == "candles":
+        hist_df, error = _chart_history(symbol, timeframe, window, max_points)
+        if error:
+            raise ValueError(error[1])
+        return version, history_json(hist_df, "columns")
+    if channel == "overlays":
+        names = options.get("series")
+        unknown = [name for name in names or () if name not in OVERLAY_SERIES]
+        if unknown:
+            raise ValueError(f"Unknown overlay series: {', '.join(unknown)}")
+        lines = _chart_lines(
+            analyser.get_overlay_lines(timeframe=timeframe, series=names),
+            analyser,
+            timeframe,
+            window,
+            max_points,
+        )
+        return version, json.dumps(compact_series(lines, _line_axes(analyser, timeframe)))
+    strategies = options.get("strategies") or ["trendinvestorpro"]
+    unknown = [strategy for strategy in strategies if strategy not in SIGNAL_STRATEGIES]
+    if unknown:
+        raise ValueError(f"Unknown strategy: {', '.join(unknown)}")
+    markers = {
+        strategy: {"markers": serialize_markers(SIGNAL_STRATEGIES[strategy](analyser, timeframe))}
+        for strategy in strategies
+    }
+    return version, json.dumps(convert_numpy_types(markers))
+
+
+class _StreamConnection:
+    """Subscriptions of one ``/ws/stream`` socket and the updates due in its next frame.
+
+    Subscriptions are keyed by ``(symbol, timeframe, channel)``.  Snapshots
+    are computed on the blocking pool.  Updates queue in ``pending`` and go
+    out together once per tick, a newer update replacing an unsent one of
+    the same kind.  Each symbol follows the shared live feed: candles get the
+    in-progress bar, and every channel is re-sent in full once the symbol's
+    downloaded history changes.
+    """
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.subscriptions: dict[tuple[str, str, str], dict] = {}
+        self.pending: dict[tuple, tuple[dict, str]] = {}
+        self.ready = asyncio.Event()
+        self.versions: dict[tuple[str, str, str], int | None] = {}
+        self.feeds: dict[str, tuple[asyncio.Queue, asyncio.Task]] = {}
+        self.tasks: set[asyncio.Task] = set()
+
+    def push(self, key: tuple[str, str, str], kind: str, data: str):
+        symbol, timeframe, channel = key
+        header = {"symbol": symbol, "timeframe": timeframe, "channel": channel, "kind": kind}
+        self.pending.pop((key, kind), None)
+        self.pending[(key, kind)] = (header, data)
+        if kind == "snapshot":
+            # A live bar queued earlier must still land after the history it extends.
+            live = self.pending.pop((key, "live"), None)
+            if live is not None:
+                self.pending[(key, "live")] = live
+        self.ready.set()
+
+    def error(self, key: tuple[str, str, str], message: str):
+        self.push(key, "error", json.dumps(message))
+
+    async def flush_loop(self):
+        while True:
+            await self.ready.wait()
+            await asyncio.sleep(STREAM_TICK_SECONDS)
+            self.ready.clear()
+            pending, self.pending = self.pending, {}
+            updates = [f'{json.dumps(header)[:-1]},"data":{data}}}' for header, data in pending.values()]
+            await self.websocket.send_text(f'{{"updates":[{",".join(updates)}]}}')
+
+    def _spawn(self, coroutine):
+        task = asyncio.ensure_future(coroutine)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def _snapshot(self, key: tuple[str, str, str], options: dict):
+        try:
+            version, data = await run_blocking("chart", _stream_snapshot, *key, options)
+        except Exception as e:
+            if self.subscriptions.get(key) is options:
+                self.error(key, str(e))
+            return
+        # Dropped if unsubscribed or resubscribed with other options meanwhile.
+        if self.subscriptions.get(key) is options:
+            self.versions[key] = version
+            self.push(key, "snapshot", data)
+
+    async def _follow(self, symbol: str, queue: asyncio.Queue):
+        while True:
+            session = await queue.get()
+            version = await run_blocking("chart", StockAnalyser.get_history_version, symbol)
+            for key, options in list(self.subscriptions.items()):
+                if _resolve_symbol(key[0]) != symbol:
+                    continue
+                if self.versions.get(key, version) != version:
+                    self._spawn(self._snapshot(key, options))
+                elif key[2] == "candles":
+                    bar = await run_blocking("chart", _live_chart_bar, symbol, key[1], session)
+                    if bar is not None:
+                        self.push(key, "live", json.dumps(bar))
+
+    def subscribe(self, message: dict):
+        symbol = str(message.get("symbol", "")).upper().strip()
+        key = (symbol, str(message.get("timeframe", "daily")), str(message.get("channel", "candles")))
+        if not symbol:
+            return self.error(key, "Missing symbol")
+        if key[2] not in STREAM_CHANNELS:
+            return self.error(key, f"Unknown channel: {key[2]}")
+        if key[1] not in CHART_TIMEFRAMES:
+            return self.error(key, f"Invalid timeframe: {key[1]}")
+        options = {
+            name: message[name]
+            for name in ("series", "strategies", "limit", "max_points")
+            if message.get(name) is not None
+        }
+        self.subscriptions[key] = options
+        self._spawn(self._snapshot(key, options))
+        resolved = _resolve_symbol(symbol)
+        if resolved not in self.feeds:
+            queue = live_hub.subscribe(resolved)
+            follower = asyncio.ensure_future(self._follow(resolved, queue))
+            self.feeds[resolved] = (queue, follower)
+
+    def unsubscribe(self, message: dict):
+        symbol = str(message.get("symbol", "")).upper().strip()
+        key = (symbol, str(message.get("timeframe", "daily")), str(message.get("channel", "candles")))
+        if self.subscriptions.pop(key, None) is None:
+            return
+        self.versions.pop(key, None)
+        for kind in ("snapshot", "live", "error"):
+            self.pending.pop((key, kind), None)
+        resolved = _resolve_symbol(symbol)
+        if not any(_resolve_symbol(other[0]) == resolved for other in self.subscriptions):
+            self._drop_feed(resolved)
+
+    def _drop_feed(self, symbol: str):
+        queue, follower = self.feeds.pop(symbol)
+        follower.cancel()
+        live_hub.unsubscribe(symbol, queue)
+
+    def close(self):
+        for symbol in list(self.feeds):
+            self._drop_feed(symbol)
+        for task in list(self.tasks):
+            task.cancel()
+
+
+@app.websocket("/ws/stream")
+async def websocket_stream(websocket: WebSocket):
+    """Many chart subscriptions over one socket.
+
+    Clients send ``{"op": "subscribe" | "unsubscribe", "symbol", "timeframe",
+    "channel"}`` with ``channel`` one of ``candles``, ``overlays`` (optional
+    ``series`` list) or ``signals`` (optional ``strategies`` list); ``limit``
+    and ``max_points`` work as on the HTTP endpoints.  The server answers with
+    frames ``{"updates": [{"symbol", "timeframe", "channel", "kind", "data"},
+    ...]}``, at most one per ``STREAM_TICK_MS``, where ``kind`` is
+    ``snapshot`` (the channel's full data in the HTTP endpoints' columnar
+    shapes), ``live`` (the in-progress candle) or ``error``.
+    """
+    await websocket.accept()
+    connection = _StreamConnection(websocket)
+    flusher = asyncio.ensure_future(connection.flush_loop())
+    try:
+        while True:
+            text = await websocket.receive_text()
+            try:
+                message = json.loads(text)
+            except ValueError:
+                message = None
+            if not isinstance(message, dict):
+                connection.error(("", "", ""), "Messages must be JSON objects")
+            elif message.get("op") == "subscribe":
+                connection.subscribe(message)
+            elif message.get("op") == "unsubscribe":
+                connection.unsubscribe(message)
+            else:
+                connection.error(("", "", ""), f"Unknown op: {message.get('op')}")
+    except WebSocketDisconnect:
+        pass
+    finally:
+        flusher.cancel()
+        connection.close()
+
+
 @app.get("/api/chart_data_{timeframe}/{symbol}")
-async def get_chart_data(timeframe: str, symbol: str):
+async def get_chart_data(
+    request: Request,
+    timeframe: str,
+    symbol: str,
+    shape: HistoryShape = Query("rows"),
+    since: int | None = Query(None),
+    until: int | None = Query(None),
+    limit: int | None = Query(None, gt=0),
+    after: int | None = Query(None),
+    max_points: int | None = Query(None, ge=3),
+):
     raw_symbol = symbol.upper()
     symbol = SYMBOL_ALIASES.get(raw_symbol, raw_symbol)
 
-    analyser = StockAnalyser(symbol)
-    df = analyser.get_price_data(symbol)
-
-    if timeframe == "daily":
-        hist_df = df
-    elif timeframe == "weekly":
-        hist_df = df.resample("W-FRI").agg({
-            "Open": "first",
-            "High": "max",
-            "Low": "min",
-            "Close": "last",
-            "Volume": "sum"
-        }).dropna()
-    elif timeframe == "monthly":
-        hist_df = df.resample("M").agg({
-            "Open": "first",
-            "High": "max",
-            "Low": "min",
-            "Close": "last",
-            "Volume": "sum"
-        }).dropna()
-    else:
-        return {"error": f"Invalid timeframe: {timeframe}"}
+    window = dict(since=since, until=until, after=after, limit=limit)
+    hist_df, error = await run_blocking("chart", _chart_history, symbol, timeframe, window, max_points)
+    if error:
+        status_code, message = error
+        return JSONResponse(status_code=status_code, content={"error": message})
 
-    if hist_df.empty:
-        return {"error": f"No data found for symbol {symbol}"}
+    if accepts_packed(request.headers.get("accept")):
+        content = await run_blocking("chart", packed_history, hist_df)
+        return Response(content=content, media_type=PACKED_MEDIA_TYPE)
+    content = await run_blocking("chart", history_json, hist_df, shape)
+    return Response(content=content, media_type="application/json")
 
-    history = [
-        {
-            "time": int(ts.timestamp()),
-            "open": round(float(row["Open"]), 2),
-            "high": round(float(row["High"]), 2),
-            "low": round(float(row["Low"]), 2),
-            "close": round(float(row["Close"]), 2),
-            "volume": round(float(row["Volume"]), 2)
-        }
-        for ts, row in hist_df.iterrows()
-    ]
 
-    return {"history": history}
+@app.get("/overlay_registry")
+def get_overlay_registry():
+    """Overlay series ``/overlay_data`` can return, with the pane each is drawn in."""
+    return {"series": overlay_registry()}
 
 
 @app.get("/overlay_data/{symbol}")
-def get_overlay_data(symbol: str, timeframe: str = "weekly"):
+@single_flight
+def get_overlay_data(
+    request: Request,
+    symbol: str,
+    timeframe: str = "weekly",
+    series: str | None = Query(None, description="Comma-separated overlay names; all when omitted"),
+    shape: HistoryShape = "rows",
+    since: int | None = Query(None),
+    until: int | None = Query(None),
+    limit: int | None = Query(None, gt=0),
+    after: int | None = Query(None),
+    max_points: int | None = Query(None, ge=3),
+):
+    names = None
+    if series is not None:
+        names = [name.strip() for name in series.split(",") if name.strip()]
+        unknown = [name for name in names if name not in OVERLAY_SERIES]
+        if unknown:
+            return JSONResponse(
+                status_code=400, content={"error": f"Unknown overlay series: {', '.join(unknown)}"}
+            )
     try:
-        analyser = StockAnalyser(symbol)
-        overlays = analyser.get_overlay_lines(timeframe=timeframe)
+        analyser = get_analyser(symbol)
+        window = dict(since=since, until=until, after=after, limit=limit)
+        overlays = _chart_lines(
+            analyser.get_overlay_lines(timeframe=timeframe, series=names),
+            analyser,
+            timeframe,
+            window,
+            max_points,
+        )
+        if accepts_packed(request.headers.get("accept")):
+            return Response(content=packed_series(overlays), media_type=PACKED_MEDIA_TYPE)
+        if shape == "columns":
+            return JSONResponse(content=compact_series(overlays, _line_axes(analyser, timeframe)))
         return JSONResponse(content=overlays)
     except Exception as e:
         return JSONResponse(status_code=500, content={"error": str(e)})
@@ -1270,7 +1691,7 @@ def get_overlay_data(symbol: str, timeframe: str = "weekly"):
 @app.get("/price_targets/{symbol}")
 def get_price_targets(symbol: str):
     try:
-        analyser = StockAnalyser(symbol)
+        analyser = get_analyser(symbol)
         return analyser.price_targets()  
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1279,7 +1700,7 @@ def get_price_targets(symbol: str):
 def get_engulfing(symbol: str):
     """Return bullish or bearish engulfing status for multiple timeframes."""
     try:
-        analyser = StockAnalyser(symbol)
+        analyser = get_analyser(symbol)
         return analyser.detect_engulfing()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1371,8 +1792,14 @@ def get_buylist():
 
 
 @app.get("/buylist_status")
-def get_buylist_status():
+def get_buylist_status(time_budget: float | None = Query(None, gt=0)):
     """Return technical status for tickers stored in the buylist."""
+    # A current snapshot entry is complete and costs no analysis, so it meets
+    # any time budget; superseded entries fall through to the budgeted run.
+    stored = snapshot_value(snapshot_key("/buylist_status"))
+    if stored is not None:
+        return stored
+
     data = load_data()
     holdings = []
     for entry in data.get("buylist", []):
@@ -1407,7 +1834,7 @@ def get_buylist_status():
             "divergence": {},
         }
 
-    return _status_for_holdings(holdings, "above")
+    return _status_for_holdings(holdings, "above", time_budget=time_budget)
 
 @app.delete("/watchlist/{symbol}")
 def remove_from_watchlist(symbol: str):
@@ -1496,7 +1923,7 @@ def get_stage(symbol: str):
         stage, weeks = cached
         return {"stage": stage, "weeks": weeks}
     
-    analyser = StockAnalyser(symbol)
+    analyser = get_analyser(symbol)
     stage, weeks = analyser.stage_analysis()
     return {"stage": stage, "weeks": weeks}
 
@@ -1521,6 +1948,16 @@ def batch_signals(
     timeframe: str = Query("weekly"),
     strategies: List[str] = Query(...)
 ):
+    stored = snapshot_value(snapshot_key("/api/batch_signals", timeframe=timeframe))
+    if stored is not None and all(symbol in stored for symbol in tickers):
+        return {
+            symbol: {
+                **{strat: stored[symbol][strat] for strat in strategies if strat in stored[symbol]},
+                "_generic": stored[symbol]["_generic"],
+            }
+            for symbol in tickers
+        }
+
     results = {}
     with ThreadPoolExecutor(max_workers=8) as executor:
         futures = {}
@@ -1538,55 +1975,66 @@ def batch_signals(
 
 
 def _get_signals_for_symbol(symbol: str, timeframe: str, strategies: List[str]):
-    analyser = StockAnalyser(symbol)
+    analyser = get_analyser(symbol)
     result = {}
     for strat in strategies:
         if strat == "trendinvestorpro":
-            result[strat] = {"markers": analyser.get_trendinvestorpro_signals(timeframe)}
+            result[strat] = {"markers": serialize_markers(analyser.get_trendinvestorpro_signals(timeframe))}
         elif strat == "northstar":
-            result[strat] = {"markers": analyser.get_northstar_signals(timeframe)}
+            result[strat] = {"markers": serialize_markers(analyser.get_northstar_signals(timeframe))}
         elif strat == "stclair":
-            result[strat] = {"markers": analyser.get_stclair_signals(timeframe)}
+            result[strat] = {"markers": serialize_markers(analyser.get_stclair_signals(timeframe))}
         elif strat == "stclairlongterm":
-            result[strat] = {"markers": analyser.get_stclairlongterm_signals(timeframe)}
+            result[strat] = {"markers": serialize_markers(analyser.get_stclairlongterm_signals(timeframe))}
         elif strat == "mace_40w":
-            result[strat] = {"markers": analyser.get_mace_40w_signals()}
+            result[strat] = {"markers": serialize_markers(analyser.get_mace_40w_signals())}
         elif strat == "mansfield":
-            result[strat] = {"markers": analyser.get_mansfield_signals()}
+            result[strat] = {"markers": serialize_markers(analyser.get_mansfield_signals())}
         elif strat == "ndr":
-            result[strat] = {"markers": analyser.get_ndr_signal(timeframe)}
+            result[strat] = {"markers": serialize_markers(analyser.get_ndr_signal(timeframe))}
     result["_generic"] = analyser.get_generic_strength_status(timeframe)
     return result
 
 
-@app.get("/quadrant_data")
-def get_quadrant_data(list_type: str = Query("portfolio", enum=["portfolio", "watchlist"])):
-    """Return MACE x 40-week status table for portfolio or watchlist."""
+LIST_TABLES_CACHE: dict[str, tuple[tuple, dict]] = {}
+_list_tables_locks = {"portfolio": threading.Lock(), "watchlist": threading.Lock()}
+
+
+def _list_entries(list_type: str):
+    """Tickers of a list plus the per-ticker fields the quadrant tables use.
+
+    Returns ``(tickers, targets, technigrades, stage_hints)``; targets and
+    stage hints only exist for the portfolio.
+    """
+    tickers: list[str] = []
     targets: dict[str, list[float]] = {}
     technigrades: dict[str, list] = {}
+    stage_hints: dict[str, int] = {}
     if list_type == "portfolio":
         json_path = Path("portfolio_store.json")
         if not json_path.exists():
-            tickers = []
-        else:
-            with open(json_path, "r") as f:
-                data = json.load(f)
-            tickers = []
-            for item in data.get("equities", []):
-                if "ticker" in item:
-                    tickers.append(item["ticker"])
-                    levels: list[float] = []
-                    for key in ("target_1", "target_2", "target_3"):
-                        t_val = item.get(key)
-                        if isinstance(t_val, (int, float)) and t_val > 0:
-                            levels.append(float(t_val))
-                    if levels:
-                        targets[item["ticker"]] = levels
-                    if isinstance(item.get("technigrade"), list):
-                        technigrades[item["ticker"]] = item["technigrade"]
+            return tickers, targets, technigrades, stage_hints
+        with open(json_path, "r") as f:
+            data = json.load(f)
+        for item in data.get("equities", []):
+            ticker = item.get("ticker")
+            if not ticker:
+                continue
+            tickers.append(ticker)
+            levels: list[float] = []
+            for key in ("target_1", "target_2", "target_3"):
+                t_val = item.get(key)
+                if isinstance(t_val, (int, float)) and t_val > 0:
+                    levels.append(float(t_val))
+            if levels:
+                targets[ticker] = levels
+            if isinstance(item.get("technigrade"), list):
+                technigrades[ticker] = item["technigrade"]
+            st = item.get("stage")
+            if isinstance(st, list) and len(st) == 2 and isinstance(st[0], (int, float)):
+                stage_hints[ticker.upper()] = int(st[0])
     else:
         data = load_data()
-        tickers = []
         for item in data.get("watchlist", []):
             if isinstance(item, dict):
                 ticker = item.get("ticker")
@@ -1596,15 +2044,28 @@ def get_quadrant_data(list_type: str = Query("portfolio", enum=["portfolio", "wa
                         technigrades[ticker] = item["technigrade"]
             else:
                 tickers.append(item)
+    return tickers, targets, technigrades, stage_hints
+
+
+def _near_target(price_now, target_levels) -> bool:
+    if not target_levels or price_now is None:
+        return False
+    selected = target_levels[0]
+    for idx, level in enumerate(target_levels):
+        if idx == len(target_levels) - 1:
+            break
+        if price_now >= level:
+            selected = target_levels[idx + 1]
+        else:
+            break
+    if selected:
+        within_range = abs(price_now - selected) / selected <= 0.05
+        return price_now >= selected or within_range
+    return False
 
-    status_keys = ["U1", "U2", "U3", "D1", "D2", "D3"]
-    forty_keys = ["++", "+-", "-+", "--"]
-
-    # initialise table with ticker info objects
-    table = {
-        fw: {m: {"tickers": []} for m in status_keys} for fw in forty_keys
-    }
 
+def _quadrant_entry(symbol, price_now, dma20, mace_status, forty_week, list_type, targets, technigrades):
+    status_keys = ["U1", "U2", "U3", "D1", "D2", "D3"]
     mace_rank = {"U3": 6, "U2": 5, "U1": 4, "D1": 3, "D2": 2, "D3": 1}
 
     def is_above(status: str | None) -> bool:
@@ -1613,194 +2074,195 @@ def get_quadrant_data(list_type: str = Query("portfolio", enum=["portfolio", "wa
     def is_below(status: str | None) -> bool:
         return isinstance(status, str) and status.startswith("Below")
 
-    for symbol in tickers:
-        try:
-            analyser = StockAnalyser(symbol)
-            mace_metric = analyser.mace()
-            fw_metric = analyser.forty_week_status()
-            dma20 = analyser.calculate_20dma().current
-            price_now = analyser.get_current_price()
-
-            mace_now = mace_metric.current
-            mace_prev = mace_metric.seven_days_ago
-            fw_now = fw_metric.current
-            fw_prev = fw_metric.seven_days_ago
-
-            mace_key = mace_now if mace_now in status_keys else None
-            fw_key = None
-            if isinstance(fw_now, str):
-                if "++" in fw_now:
-                    fw_key = "++"
-                elif "+-" in fw_now:
-                    fw_key = "+-"
-                elif "-+" in fw_now:
-                    fw_key = "-+"
-                elif "--" in fw_now:
-                    fw_key = "--"
-            arrow = None
-            if is_above(fw_now) and is_below(fw_prev):
-                arrow = "up"
-            elif is_below(fw_now) and is_above(fw_prev):
-                arrow = "down"
-            elif (
-                isinstance(mace_now, str)
-                and isinstance(mace_prev, str)
-                and mace_now in mace_rank
-                and mace_prev in mace_rank
-            ):
-                if mace_rank[mace_now] > mace_rank[mace_prev]:
-                    arrow = "right"
-                elif mace_rank[mace_now] < mace_rank[mace_prev]:
-                    arrow = "left"
-
-            if mace_key and fw_key:
-                near_target = False
-                if list_type == "portfolio":
-                    target_levels = targets.get(symbol)
-                    if (
-                        target_levels
-                        and price_now is not None
-                    ):
-                        selected = target_levels[0]
-                        for idx, level in enumerate(target_levels):
-                            if idx == len(target_levels) - 1:
-                                break
-                            if price_now >= level:
-                                selected = target_levels[idx + 1]
-                            else:
-                                break
-                        if selected:
-                            within_range = abs(price_now - selected) / selected <= 0.05
-                            if price_now >= selected or within_range:
-                                near_target = True
-
-                table[fw_key][mace_key]["tickers"].append(
-                    {
-                        "symbol": symbol,
-                        "arrow": arrow,
-                        "below20dma": (
-                            price_now is not None
-                            and dma20 is not None
-                            and price_now < dma20
-                        ),
-                        "nearTarget": near_target,
-                        "technigrade": technigrades.get(symbol, []),
-                    }
-                )
-        except Exception as e:
-            print(f"Quadrant analysis error for {symbol}: {e}")
+    mace_now, mace_prev = mace_status
+    fw_now, fw_prev = forty_week
+
+    mace_key = mace_now if mace_now in status_keys else None
+    fw_key = None
+    if isinstance(fw_now, str):
+        if "++" in fw_now:
+            fw_key = "++"
+        elif "+-" in fw_now:
+            fw_key = "+-"
+        elif "-+" in fw_now:
+            fw_key = "-+"
+        elif "--" in fw_now:
+            fw_key = "--"
+    if not (mace_key and fw_key):
+        return None
 
-    return table
+    arrow = None
+    if is_above(fw_now) and is_below(fw_prev):
+        arrow = "up"
+    elif is_below(fw_now) and is_above(fw_prev):
+        arrow = "down"
+    elif (
+        isinstance(mace_now, str)
+        and isinstance(mace_prev, str)
+        and mace_now in mace_rank
+        and mace_prev in mace_rank
+    ):
+        if mace_rank[mace_now] > mace_rank[mace_prev]:
+            arrow = "right"
+        elif mace_rank[mace_now] < mace_rank[mace_prev]:
+            arrow = "left"
+
+    near_target = list_type == "portfolio" and _near_target(price_now, targets.get(symbol))
+    return fw_key, mace_key, {
+        "symbol": symbol,
+        "arrow": arrow,
+        "below20dma": (
+            price_now is not None
+            and dma20 is not None
+            and price_now < dma20
+        ),
+        "nearTarget": near_target,
+        "technigrade": technigrades.get(symbol, []),
+    }
 
-@app.get("/stage_table")
-def get_stage_table(list_type: str = Query("portfolio", enum=["portfolio", "watchlist"])):
-    """Return Stage quadrant table with 20DMA status."""
-    stage_cache: dict[str, int] = {}
-    if list_type == "portfolio":
-        json_path = Path("portfolio_store.json")
-        if not json_path.exists():
-            tickers: list[str] = []
-        else:
-            with open(json_path, "r") as f:
-                data = json.load(f)
-            tickers = []
-            for item in data.get("equities", []):
-                t = item.get("ticker")
-                if t:
-                    tickers.append(t)
-                    st = item.get("stage")
-                    if (
-                        isinstance(st, list)
-                        and len(st) == 2
-                        and isinstance(st[0], (int, float))
-                    ):
-                        stage_cache[t.upper()] = int(st[0])
-    else:
-        data = load_data()
-        tickers = []
-        for item in data.get("watchlist", []):
-            if isinstance(item, dict):
-                ticker = item.get("ticker")
-                if ticker:
-                    tickers.append(ticker)
-            else:
-                tickers.append(item)
-        stage_cache = {}
 
-    table = {stage: {"tickers": []} for stage in [1, 2, 3, 4]}
+def _stage_and_mansfield(symbol: str, stage_hint: int | None):
+    """Per-symbol analyser work for the stage and Mansfield tables.
 
-    for symbol in tickers:
+    Each half is returned as ``(value, error)`` so a failure in one table does
+    not drop the symbol from the other.
+    """
+    try:
+        analyser = get_analyser(symbol)
+    except Exception as e:
+        return (stage_hint, None if stage_hint is not None else e), (None, e)
+    if stage_hint is not None:
+        stage = (stage_hint, None)
+    else:
         try:
-            analyser = StockAnalyser(symbol)
-            stage = stage_cache.get(symbol.upper())
-            if stage is None:
-                stage, _ = analyser.stage_analysis()
-            dma20 = analyser.calculate_20dma().current
-            price_now = analyser.get_current_price()
-            if stage in [1, 2, 3, 4]:
-                table[stage]["tickers"].append(
-                    {
-                        "symbol": symbol,
-                        "below20dma": (
-                            price_now is not None
-                            and dma20 is not None
-                            and price_now < dma20
-                        ),
-                    }
-                )
+            stage = (analyser.stage_analysis()[0], None)
         except Exception as e:
-            print(f"Stage table error for {symbol}: {e}")
+            stage = (None, e)
+    try:
+        mansfield = (analyser.get_mansfield_status(), None)
+    except Exception as e:
+        mansfield = (None, e)
+    return stage, mansfield
 
-    return table
 
-@app.get("/mansfield_table")
-def get_mansfield_table(list_type: str = Query("portfolio", enum=["portfolio", "watchlist"])):
-    """Return Mansfield quadrant table with 20DMA status and new buy flag."""
-    if list_type == "portfolio":
-        json_path = Path("portfolio_store.json")
-        if not json_path.exists():
-            tickers: list[str] = []
-        else:
-            with open(json_path, "r") as f:
-                data = json.load(f)
-            tickers = [item["ticker"] for item in data.get("equities", []) if "ticker" in item]
-    else:
-        data = load_data()
-        tickers = []
-        for item in data.get("watchlist", []):
-            if isinstance(item, dict):
-                t = item.get("ticker")
-                if t:
-                    tickers.append(t)
-            else:
-                tickers.append(item)
+def _compute_list_tables(list_type: str, entries) -> dict:
+    tickers, targets, technigrades, stage_hints = entries
+
+    quadrant = {
+        fw: {m: {"tickers": []} for m in ["U1", "U2", "U3", "D1", "D2", "D3"]}
+        for fw in ["++", "+-", "-+", "--"]
+    }
+    stage_table = {stage: {"tickers": []} for stage in [1, 2, 3, 4]}
+    mansfield_table = {s: {"tickers": []} for s in ["BUY", "NEUTRAL", "SELL"]}
+
+    panels, errors = load_panels(tickers)
+    price_and_dma = price_vs_20dma(panels["daily"])
+    weekly_status = weekly_trend_status(panels["weekly"])
 
-    table = {s: {"tickers": []} for s in ["BUY", "NEUTRAL", "SELL"]}
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        analyser_futures = {
+            symbol: executor.submit(_stage_and_mansfield, symbol, stage_hints.get(symbol.upper()))
+            for symbol in dict.fromkeys(tickers)
+            if symbol not in errors
+        }
+        per_symbol = {symbol: future.result() for symbol, future in analyser_futures.items()}
 
     for symbol in tickers:
+        if symbol in errors:
+            print(f"Quadrant analysis error for {symbol}: {errors[symbol]}")
+            print(f"Stage table error for {symbol}: {errors[symbol]}")
+            print(f"Mansfield table error for {symbol}: {errors[symbol]}")
+            continue
+        price_now, dma20 = price_and_dma[symbol]
+        # Short histories report "in progress" rather than a 20DMA.
+        below20 = (
+            isinstance(price_now, (int, float))
+            and isinstance(dma20, (int, float))
+            and price_now < dma20
+        )
+
         try:
-            analyser = StockAnalyser(symbol)
-            mansfield = analyser.get_mansfield_status()
+            entry = _quadrant_entry(
+                symbol,
+                price_now,
+                dma20,
+                weekly_status[symbol]["mace"],
+                weekly_status[symbol]["forty_week"],
+                list_type,
+                targets,
+                technigrades,
+            )
+            if entry is not None:
+                fw_key, mace_key, item = entry
+                quadrant[fw_key][mace_key]["tickers"].append(item)
+        except Exception as e:
+            print(f"Quadrant analysis error for {symbol}: {e}")
+
+        (stage, stage_error), (mansfield, mansfield_error) = per_symbol[symbol]
+        if stage_error is not None:
+            print(f"Stage table error for {symbol}: {stage_error}")
+        elif stage in [1, 2, 3, 4]:
+            stage_table[stage]["tickers"].append({"symbol": symbol, "below20dma": below20})
+
+        try:
+            if mansfield_error is not None:
+                raise mansfield_error
             status = mansfield.get("status")
-            new_buy = mansfield.get("new_buy", False)
-            dma20 = analyser.calculate_20dma().current
-            price_now = analyser.get_current_price()
             if status in ["BUY", "SELL", "NEUTRAL"]:
-                table[status]["tickers"].append(
+                mansfield_table[status]["tickers"].append(
                     {
                         "symbol": symbol,
-                        "below20dma": (
-                            price_now is not None
-                            and dma20 is not None
-                            and price_now < dma20
-                        ),
-                        "newBuy": new_buy,
+                        "below20dma": below20,
+                        "newBuy": mansfield.get("new_buy", False),
                     }
                 )
         except Exception as e:
             print(f"Mansfield table error for {symbol}: {e}")
 
-    return table
+    return {"quadrant": quadrant, "stage": stage_table, "mansfield": mansfield_table}
+
+
+def _list_tables(list_type: str) -> dict:
+    """Quadrant, stage and Mansfield tables for a list, computed in one pass.
+
+    The result is kept per list until the list entries or any member's price
+    data version change, so the three table endpoints share one computation.
+    """
+    stored = snapshot_value(snapshot_key("/list_tables", list_type=list_type))
+    if stored is not None:
+        return stored
+
+    entries = _list_entries(list_type)
+    with _list_tables_locks[list_type]:
+        key = (repr(entries), _price_versions_key(_price_versions(entries[0])))
+        cached = LIST_TABLES_CACHE.get(list_type)
+        if cached and cached[0] == key:
+            return cached[1]
+        tables = _compute_list_tables(list_type, entries)
+        LIST_TABLES_CACHE[list_type] = (key, tables)
+        return tables
+
+
+@app.get("/list_tables")
+def get_list_tables(list_type: str = Query("portfolio", enum=["portfolio", "watchlist"])):
+    """Return the MACE x 40-week, Stage and Mansfield tables for a list."""
+    return _list_tables(list_type)
+
+
+@app.get("/quadrant_data")
+def get_quadrant_data(list_type: str = Query("portfolio", enum=["portfolio", "watchlist"])):
+    """Return MACE x 40-week status table for portfolio or watchlist."""
+    return _list_tables(list_type)["quadrant"]
+
+@app.get("/stage_table")
+def get_stage_table(list_type: str = Query("portfolio", enum=["portfolio", "watchlist"])):
+    """Return Stage quadrant table with 20DMA status."""
+    return _list_tables(list_type)["stage"]
+
+@app.get("/mansfield_table")
+def get_mansfield_table(list_type: str = Query("portfolio", enum=["portfolio", "watchlist"])):
+    """Return Mansfield quadrant table with 20DMA status and new buy flag."""
+    return _list_tables(list_type)["mansfield"]
 
 @app.get("/s3-images")
 def list_s3_images(prefix: str = "natgas/"):
@@ -1833,7 +2295,7 @@ def compare_ratio(
     timeframe: str = "weekly",
 ):
     try:
-        analyser1 = StockAnalyser(symbol1)
+        analyser1 = get_analyser(symbol1)
         return analyser1.compare_ratio_with(
             other_symbol=symbol2, 
             timeframe=timeframe, 
@@ -1842,38 +2304,49 @@ def compare_ratio(
         return {"error": str(e)}
 
 
+# Strategy name -> its markers for ``(analyser, timeframe)``.
+SIGNAL_STRATEGIES = {
+    "trendinvestorpro": lambda analyser, timeframe: analyser.get_trendinvestorpro_signals(timeframe),
+    "stclair": lambda analyser, timeframe: analyser.get_stclair_signals(timeframe),
+    "northstar": lambda analyser, timeframe: analyser.get_northstar_signals(timeframe),
+    "stclairlongterm": lambda analyser, timeframe: analyser.get_stclairlongterm_signals(timeframe),
+    "mace_40w": lambda analyser, timeframe: analyser.get_mace_40w_signals(),
+    "mansfield": lambda analyser, timeframe: analyser.get_mansfield_signals(),
+    "ndr": lambda analyser, timeframe: analyser.get_ndr_signal(timeframe),
+    "demarker": lambda analyser, timeframe: analyser.get_demarker_signals(timeframe),
+}
+
+
 @app.get("/api/signals_{timeframe}/{symbol}")
 def get_signals(timeframe: str, symbol: str, strategy: str = Query("trendinvestorpro")):
-    analyser = StockAnalyser(symbol)
-    if strategy == "trendinvestorpro":
-        return {"markers": analyser.get_trendinvestorpro_signals(timeframe)}
-    elif strategy == "stclair":
-        return {"markers": analyser.get_stclair_signals(timeframe)}
-    elif strategy == "northstar":
-        return {"markers": analyser.get_northstar_signals(timeframe)}
-    elif strategy == "stclairlongterm":
-        return {"markers": analyser.get_stclairlongterm_signals(timeframe)}
-    elif strategy == "mace_40w":
-        return {"markers": analyser.get_mace_40w_signals()}
-    elif strategy == "mansfield":
-        return {"markers": analyser.get_mansfield_signals()}
-    elif strategy == "ndr":
-        return {"markers": analyser.get_ndr_signal(timeframe)}
-    elif strategy == "demarker":
-        return {"markers": analyser.get_demarker_signals(timeframe)}
-
-    else:
-        return {"error": f"Unknown strategy: {strategy}"}
+    signals = SIGNAL_STRATEGIES.get(strategy)
+    if signals is None:
+        return JSONResponse(status_code=400, content={"error": f"Unknown strategy: {strategy}"})
+    return {"markers": serialize_markers(signals(get_analyser(symbol), timeframe))}
     
 
 @app.get("/signal_lines/{symbol}")
 def get_signal_lines(
+    request: Request,
     symbol: str,
-    timeframe: str = "daily"
+    timeframe: str = "daily",
+    shape: HistoryShape = "rows",
+    since: int | None = Query(None),
+    until: int | None = Query(None),
+    limit: int | None = Query(None, gt=0),
+    after: int | None = Query(None),
+    max_points: int | None = Query(None, ge=3),
 ):
     try:
-        analyser = StockAnalyser(symbol)
-        lines = analyser.get_signal_lines(timeframe=timeframe)
+        analyser = get_analyser(symbol)
+        window = dict(since=since, until=until, after=after, limit=limit)
+        lines = _chart_lines(
+            analyser.get_signal_lines(timeframe=timeframe), analyser, timeframe, window, max_points
+        )
+        if accepts_packed(request.headers.get("accept")):
+            return Response(content=packed_series(lines), media_type=PACKED_MEDIA_TYPE)
+        if shape == "columns":
+            return compact_series(lines, _line_axes(analyser, timeframe))
         return lines
     except Exception as e:
         return JSONResponse(status_code=500, content={"error": str(e)})
@@ -1967,7 +2440,7 @@ def fetch_peers_from_csv_online(target: str):
 
 @app.get("/api/projection_arrows/{symbol}")
 def get_projection_arrows(symbol: str, timeframe: str = Query("weekly")):
-    analyser = StockAnalyser(symbol)
+    analyser = get_analyser(symbol)
     if timeframe == "daily":
         df = analyser.df
     elif timeframe == "weekly":
@@ -1975,7 +2448,7 @@ def get_projection_arrows(symbol: str, timeframe: str = Query("weekly")):
     elif timeframe == "monthly":
         df = analyser.monthly_df
     else:
-        return {"error": f"Invalid timeframe: {timeframe}"}
+        return JSONResponse(status_code=400, content={"error": f"Invalid timeframe: {timeframe}"})
 
     result = find_downtrend_lines(df)
     return result
@@ -1994,7 +2467,7 @@ def backtest_signals(
     start_dt = parse_date(start)
     end_dt = parse_date(end)
 
-    analyser = StockAnalyser(symbol)
+    analyser = get_analyser(symbol)
 
     # No dataframe filtering by date here!
 
@@ -2022,7 +2495,7 @@ def backtest_signals(
     start_ts = int(start_dt.timestamp())
     end_ts = int(end_dt.timestamp())
     filtered_markers = [
-        m for m in markers if start_ts <= m["time"] <= end_ts
+        m for m in markers if start_ts <= m.time <= end_ts
     ]
 
     print("Filtered markers:", filtered_markers)
@@ -2036,7 +2509,7 @@ def get_signal_strength(
     timeframe: str = Query("weekly"),
     strategy: str = Query("northstar")
 ):
-    analyser = StockAnalyser(symbol)
+    analyser = get_analyser(symbol)
 
     if strategy == "trendinvestorpro":
         return analyser.get_trendinvestorpro_status_and_strength(timeframe)
@@ -2057,10 +2530,49 @@ def get_signal_strength(
     else:
         return {"error": f"Unknown strategy: {strategy}"}
     
+@app.get("/api/cache_stats")
+def get_cache_stats():
+    """Return hit/miss counters for cached analyser methods."""
+    return cache_stats()
+
+
+@app.get("/api/execution_stats")
+def get_execution_stats():
+    """Return blocking-pool timings per kind of work and event loop lag."""
+    return execution_stats()
+
+
+@app.get("/api/response_cache_stats")
+def get_response_cache_stats():
+    """Return hit, miss and 304 counts of the HTTP response cache."""
+    return response_cache.stats()
+
+
+@app.get("/api/single_flight_stats")
+def get_single_flight_stats():
+    """Return how many calls each coalesced endpoint or loader shared with a running one."""
+    return single_flight_stats()
+
+
+@app.get("/api/live_stats")
+async def get_live_stats():
+    """Return the symbols being polled for live bars and their subscriber count."""
+    return live_hub.stats()
+
+
+@app.post("/api/refresh_prices/{symbol}")
+def refresh_prices(symbol: str):
+    """Re-download a symbol's prices mid-day; derived caches follow the data version."""
+    raw_symbol = symbol.upper().strip()
+    resolved = SYMBOL_ALIASES.get(raw_symbol, raw_symbol)
+    version = StockAnalyser.refresh_price_data(resolved)
+    return {"symbol": resolved, "data_version": version}
+
+
 @app.get("/api/price_rsi_divergence/{symbol}")
 def price_rsi_divergence(symbol: str):
     """Return simple price/RSI divergence on multiple timeframes."""
-    analyser = StockAnalyser(symbol)
+    analyser = get_analyser(symbol)
     return {
         "daily": analyser.simple_divergence_daily(),
         "weekly": analyser.simple_divergence_weekly(),
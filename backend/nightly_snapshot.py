@@ -0,0 +1,210 @@
+"""Nightly batch job that materializes list-level analytics into a snapshot.
+
+Computes the portfolio, watchlist and buylist analytics the heavy pages ask
+for (status tables, quadrant tables, SMA momentum, MACE scores and weekly
+signals) on a process pool and writes them with
+:func:`stock_analysis.snapshot.write_snapshot`.  Endpoints serve from the
+latest snapshot until the next scheduled run time, until a list file
+changes or until the server loads newer prices for a symbol an entry read.
+
+Run from ``backend/``::
+
+    python nightly_snapshot.py [--workers N]
+
+The API server also runs it in-process each day at ``SNAPSHOT_RUN_AT_UTC``
+(see :func:`start_scheduler`); set ``SNAPSHOT_SCHEDULER=0`` to disable.
+"""
+import argparse
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+from stock_analysis.snapshot import (
+    latest_snapshot,
+    next_scheduled_run,
+    price_inputs,
+    set_serving,
+    snapshot_key,
+    source_fingerprint,
+    write_snapshot,
+)
+
+PORTFOLIO_FILE = "portfolio_store.json"
+WATCHLIST_FILE = "watchlist.json"
+BASELINES = ["portfolio", "spx", "dji", "iwm", "nasdaq"]
+SIGNAL_STRATEGIES = [
+    "trendinvestorpro",
+    "northstar",
+    "stclair",
+    "stclairlongterm",
+    "mace_40w",
+    "mansfield",
+    "ndr",
+]
+SIGNAL_CHUNK = 16
+
+_scheduler_thread: threading.Thread | None = None
+_run_lock = threading.Lock()
+
+
+def _init_worker():
+    set_serving(False)
+
+
+def _run_task(name: str, kwargs: dict):
+    """Call a ``main`` endpoint function in a worker.
+
+    Returns its JSON-ready response and the :func:`price_inputs` of every
+    symbol whose prices it read.
+    """
+    import main
+    from fastapi.encoders import jsonable_encoder
+
+    if name == "get_mace_scores":
+        kwargs = {"request": main.MaceScoresRequest(**kwargs)}
+    with main.StockAnalyser.recording_price_reads() as reads:
+        value = jsonable_encoder(getattr(main, name)(**kwargs))
+    return value, price_inputs(reads)
+
+
+def _list_symbols() -> list[str]:
+    import main
+
+    symbols = [item["ticker"] for item in main._get_portfolio_equities()]
+    data = main.load_data()
+    for list_name in ("watchlist", "buylist"):
+        for item in data.get(list_name, []):
+            symbols.append(item.get("ticker") if isinstance(item, dict) else item)
+    return main._sanitize_symbols_list([s for s in symbols if s])
+
+
+def _tasks(symbols: list[str]):
+    """``(key, depends, function name, kwargs)`` for every snapshot entry."""
+    tasks = []
+    for direction in ("below", "above"):
+        params = dict(direction=direction, scope="full", baseline="portfolio")
+        tasks.append((snapshot_key("/portfolio_status", **params), [PORTFOLIO_FILE],
+                      "get_portfolio_status", dict(params, time_budget=None)))
+    for baseline in BASELINES:
+        params = dict(direction="below", scope="momentum", baseline=baseline)
+        tasks.append((snapshot_key("/portfolio_status", **params), [PORTFOLIO_FILE],
+                      "get_portfolio_status", dict(params, time_budget=None)))
+    tasks.append((snapshot_key("/buylist_status"), [WATCHLIST_FILE],
+                  "get_buylist_status", dict(time_budget=None)))
+    for list_type, source in (("portfolio", PORTFOLIO_FILE), ("watchlist", WATCHLIST_FILE)):
+        tasks.append((snapshot_key("/list_tables", list_type=list_type), [source],
+                      "get_list_tables", dict(list_type=list_type)))
+        for timeframe in ("daily", "weekly"):
+            params = dict(list_type=list_type, timeframe=timeframe)
+            tasks.append((snapshot_key("/sma_momentum", **params), [source],
+                          "sma_momentum", params))
+    # Per-symbol results; served for any request whose symbols are all covered.
+    tasks.append((snapshot_key("/mace_scores"), [], "get_mace_scores", dict(symbols=symbols)))
+    for start in range(0, len(symbols), SIGNAL_CHUNK):
+        tasks.append((snapshot_key("/api/batch_signals", timeframe="weekly"), [],
+                      "batch_signals", dict(tickers=symbols[start:start + SIGNAL_CHUNK],
+                                            timeframe="weekly", strategies=SIGNAL_STRATEGIES)))
+    return tasks
+
+
+def _merge_value(key: str, current, value):
+    if key.startswith("/mace_scores"):
+        # Stored per symbol rather than per field, so subsets can be served.
+        value = {
+            symbol: {field: value[field][symbol] for field in value}
+            for symbol in value.get("current", {})
+        }
+    if key.startswith("/api/batch_signals"):
+        value = {symbol: result for symbol, result in value.items() if "error" not in result}
+    if current is None:
+        return value
+    return {**current, **value}
+
+
+def run_snapshot(workers: int | None = None):
+    """Compute every entry on a process pool and write a new snapshot; returns its path."""
+    created_at = datetime.now(timezone.utc)
+    # Taken before computing, so an edit made meanwhile leaves entries stale.
+    sources = {name: source_fingerprint(name) for name in (PORTFOLIO_FILE, WATCHLIST_FILE)}
+    tasks = _tasks(_list_symbols())
+
+    entries: dict[str, dict] = {}
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=workers or min(4, os.cpu_count() or 1),
+        mp_context=context,
+        initializer=_init_worker,
+    ) as executor:
+        futures = [
+            (key, depends, executor.submit(_run_task, name, kwargs))
+            for key, depends, name, kwargs in tasks
+        ]
+        for key, depends, future in futures:
+            try:
+                value, prices = future.result()
+            except Exception as e:
+                print(f"[snapshot] {key} failed: {e}")
+                continue
+            current = entries.get(key, {"value": None, "prices": {}})
+            entries[key] = {
+                "depends": depends,
+                "prices": {**current["prices"], **prices},
+                "value": _merge_value(key, current["value"], value),
+            }
+
+    path = write_snapshot(entries, sources, created_at)
+    print(f"[snapshot] Wrote {len(entries)} entries to {path}")
+    return path
+
+
+def _run_guarded(workers: int | None):
+    if not _run_lock.acquire(blocking=False):
+        return
+    try:
+        run_snapshot(workers)
+    except Exception as e:
+        print(f"[snapshot] Run failed: {e}")
+    finally:
+        _run_lock.release()
+
+
+def _scheduler_loop(stop: threading.Event, workers: int | None):
+    snapshot = latest_snapshot()
+    if snapshot is None or snapshot.is_stale():
+        _run_guarded(workers)
+    while not stop.is_set():
+        delay = (next_scheduled_run() - datetime.now(timezone.utc)).total_seconds()
+        if stop.wait(max(delay, 0)):
+            break
+        _run_guarded(workers)
+
+
+def start_scheduler(workers: int | None = None) -> threading.Event | None:
+    """Run the job daily in a background thread; returns an event that stops it.
+
+    Catches up immediately when there is no fresh snapshot.
+    """
+    global _scheduler_thread
+    if os.getenv("SNAPSHOT_SCHEDULER", "1") == "0":
+        return None
+    if _scheduler_thread is not None and _scheduler_thread.is_alive():
+        return None
+    stop = threading.Event()
+    _scheduler_thread = threading.Thread(
+        target=_scheduler_loop, args=(stop, workers), name="snapshot-scheduler", daemon=True
+    )
+    _scheduler_thread.start()
+    return stop
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=None, help="worker processes")
+    args = parser.parse_args()
+    run_snapshot(args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Memoization of ``StockAnalyser`` results keyed by price-data version.
+
+Decorate an analyser method with :func:`cached_analysis` and its result is
+cached per ``(method, symbol, bound arguments, data version)``.  The data
+version comes from the analyser's price frame and only changes when the
+frame's content does, so entries survive a day rollover or a refresh with no
+new bars and are invalidated as soon as a new or revised bar arrives.
+
+Methods that also read other symbols' prices, such as a benchmark, name them
+with ``depends``; those symbols' data versions become part of the key.
+
+Intraday timeframes are not cached: their bars come from the live minute
+store and change without a new data version.
+
+Results are stored frozen, at every level (lists become tuples, dicts become
+read-only mappings), and shared between callers; dicts, including those
+inside tuples, are handed back as fresh copies.
+Concurrent misses on the same key compute the result once.
+"""
+from __future__ import annotations
+
+from functools import wraps
+import inspect
+from threading import Lock
+from types import MappingProxyType
+
+from .minute_store import INTRADAY_TIMEFRAMES
+from .single_flight import SingleFlight
+
+_MISSING = object()
+
+_cache_lock = Lock()
+_cache: dict[tuple, object] = {}
+_latest_versions: dict[str, object] = {}
+_stats: dict[str, dict[str, int]] = {}
+_misses = SingleFlight("cached_analysis")
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    # Named tuples (markers) are immutable already and keep their type.
+    if isinstance(value, list) or type(value) is tuple:
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _thaw(value):
+    if isinstance(value, MappingProxyType):
+        return {k: _thaw(v) for k, v in value.items()}
+    # Only tuples holding frozen containers need rebuilding.
+    if type(value) is tuple and any(
+        isinstance(v, MappingProxyType) or type(v) is tuple for v in value
+    ):
+        return tuple(_thaw(v) for v in value)
+    return value
+
+
+def _record(name: str, outcome: str) -> None:
+    counters = _stats.setdefault(name, {"hits": 0, "misses": 0})
+    counters[outcome] += 1
+
+
+def _admit(symbol: str, version) -> bool:
+    """Track the newest data version per symbol and evict older entries.
+
+    Returns ``False`` when ``version`` is older than the newest one seen, in
+    which case the result should not be cached.
+    """
+    latest = _latest_versions.get(symbol)
+    if latest is not None and version is not None and version <= latest:
+        return version == latest
+    _latest_versions[symbol] = version
+    stale = [key for key in _cache if key[1] == symbol and key[2] != version]
+    for key in stale:
+        del _cache[key]
+    return True
+
+
+def cached_analysis(method=None, *, depends: tuple[str, ...] = ()):
+    """Cache an analyser method's result until its price data changes.
+
+    ``depends`` lists further symbols whose prices the method reads; a new
+    data version for any of them also invalidates the result.
+    """
+
+    def decorate(method):
+        name = method.__name__
+        signature = inspect.signature(method)
+
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            call_args = tuple(
+                (arg, value) for arg, value in bound.arguments.items() if arg != "self"
+            )
+            if bound.arguments.get("timeframe") in INTRADAY_TIMEFRAMES:
+                return method(self, *args, **kwargs)
+            depend_versions = tuple(self.get_price_data_version(symbol) for symbol in depends)
+            key = (name, self.symbol, self.data_version, call_args, depend_versions)
+
+            with _cache_lock:
+                cached = _cache.get(key, _MISSING)
+                _record(name, "misses" if cached is _MISSING else "hits")
+            if cached is not _MISSING:
+                return _thaw(cached)
+
+            frozen = _misses.do(key, lambda: _freeze(method(self, *args, **kwargs)))
+            with _cache_lock:
+                if _admit(self.symbol, self.data_version):
+                    if depends:
+                        # Results for superseded versions of the dependencies.
+                        for stale in [other for other in _cache if other[:4] == key[:4]]:
+                            del _cache[stale]
+                    _cache[key] = frozen
+            return _thaw(frozen)
+
+        return wrapper
+
+    return decorate(method) if method is not None else decorate
+
+
+def cache_stats() -> dict[str, dict[str, int]]:
+    """Return hit/miss counters per cached method."""
+    with _cache_lock:
+        return {
+            name: {**counters, "entries": sum(1 for key in _cache if key[0] == name)}
+            for name, counters in sorted(_stats.items())
+        }
+
+
+def clear_analysis_cache(symbol: str | None = None) -> None:
+    """Drop cached results for ``symbol`` (or everything when omitted)."""
+    with _cache_lock:
+        if symbol is None:
+            _cache.clear()
+            _latest_versions.clear()
+            return
+        for key in [key for key in _cache if key[1] == symbol]:
+            del _cache[key]
+        _latest_versions.pop(symbol, None)
+
+
+__all__ = ["cached_analysis", "cache_stats", "clear_analysis_cache"]
@@ -0,0 +1,169 @@
+"""Daily, weekly and monthly bars maintained together for one symbol.
+
+A :class:`BarStore` holds the daily price frame and its weekly (``W-FRI``)
+and monthly (``ME``) aggregates.  Stores are immutable: :meth:`BarStore.update`
+and :meth:`BarStore.append` return a new store that shares every completed
+weekly/monthly bar with the old one and only re-aggregates the periods from
+the first changed daily row onward, which for a new or revised daily bar is
+just the open week and month.
+
+Aggregated bars are kept without ``dropna`` so each consumer can drop on the
+columns it actually reads, exactly as the per-request resamples used to.
+
+A store derived from another records the version it came from
+(``base_version``) and, per timeframe, the label of the first bar that was
+re-aggregated (``changed_since``), so incremental consumers such as
+:class:`~.indicator_state.IndicatorSet` know which bars to feed.
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+TIMEFRAME_RULES = {"weekly": "W-FRI", "monthly": "ME"}
+
+_OHLCV_AGG = {
+    "Open": "first",
+    "High": "max",
+    "Low": "min",
+    "Close": "last",
+    "Adj Close": "last",
+    "Volume": "sum",
+}
+
+
+def _ohlcv_spec(columns: pd.Index) -> dict[str, str]:
+    return {col: how for col, how in _OHLCV_AGG.items() if col in columns}
+
+
+def _aggregate(daily: pd.DataFrame, rule: str, spec: dict[str, str] | None) -> pd.DataFrame:
+    if spec is None:
+        return daily.resample(rule).last()
+    return daily.resample(rule).agg(spec)
+
+
+def _first_changed_row(old: pd.DataFrame, new: pd.DataFrame) -> int:
+    """Position of the first row where ``new`` differs from ``old``.
+
+    Returns ``0`` when the frames are not comparable, which forces a rebuild.
+    """
+    if not old.columns.equals(new.columns):
+        return 0
+    n = min(len(old), len(new))
+    if not old.index[:n].equals(new.index[:n]):
+        return 0
+    try:
+        a = old.iloc[:n].to_numpy(dtype=float, na_value=np.nan)
+        b = new.iloc[:n].to_numpy(dtype=float, na_value=np.nan)
+    except (TypeError, ValueError):
+        return 0
+    changed = ~((a == b) | (np.isnan(a) & np.isnan(b))).all(axis=1)
+    positions = np.flatnonzero(changed)
+    if len(positions):
+        return int(positions[0])
+    return n if len(new) >= len(old) else 0
+
+
+class BarStore:
+    def __init__(
+        self,
+        daily: pd.DataFrame,
+        data_version: int | None = None,
+        *,
+        _bars: dict[str, pd.DataFrame] | None = None,
+        base_version: int | None = None,
+        changed_since: dict[str, pd.Timestamp | None] | None = None,
+    ):
+        self.daily = daily
+        self.data_version = data_version
+        if _bars is None:
+            _bars = {name: _aggregate(daily, rule, spec) for name, rule, spec in self._layouts()}
+        self._bars = _bars
+        self.base_version = base_version
+        self.changed_since = changed_since or {}
+        # Derived views are memoized; the store never changes once built.
+        self._views: dict[tuple, pd.DataFrame] = {}
+
+    def _layouts(self):
+        spec = _ohlcv_spec(self.daily.columns)
+        yield "weekly", TIMEFRAME_RULES["weekly"], spec
+        yield "monthly", TIMEFRAME_RULES["monthly"], spec
+        # Month-end snapshot: the last value of every column in the month.
+        yield "month_end", TIMEFRAME_RULES["monthly"], None
+
+    def update(self, daily: pd.DataFrame, data_version: int | None = None) -> "BarStore":
+        """Return a store for ``daily``, re-aggregating only the periods that changed."""
+        return self._rebuilt_from(daily, _first_changed_row(self.daily, daily), data_version)
+
+    def append(self, rows: pd.DataFrame, data_version: int | None = None) -> "BarStore":
+        """Return a store with ``rows`` appended, replacing any daily rows they overlap."""
+        if rows.empty:
+            return self
+        kept = self.daily.loc[self.daily.index < rows.index[0]]
+        daily = pd.concat([kept, rows.reindex(columns=self.daily.columns)])
+        daily.attrs = dict(self.daily.attrs)
+        return self._rebuilt_from(daily, len(kept), data_version)
+
+    def _rebuilt_from(self, daily: pd.DataFrame, position: int, data_version) -> "BarStore":
+        if position >= len(daily) and len(daily) == len(self.daily):
+            return BarStore(
+                daily,
+                data_version,
+                _bars=self._bars,
+                base_version=self.data_version,
+                changed_since={"daily": None, "weekly": None, "monthly": None},
+            )
+        if position <= 0 or daily.empty:
+            return BarStore(daily, data_version)
+
+        first_changed = daily.index[position].normalize()
+        changed_since = {"daily": daily.index[position]}
+        bars: dict[str, pd.DataFrame] = {}
+        for name, rule, spec in self._layouts():
+            old = self._bars[name]
+            # Bars are labelled by period end, so every bar before this one is
+            # complete.  The last bar is always redone so that periods skipped
+            # by a gap come back as empty rows, as a full resample would give.
+            keep = min(int(old.index.searchsorted(first_changed, side="left")), len(old) - 1)
+            if keep == 0:
+                return BarStore(daily, data_version)
+            tail = daily.loc[daily.index > old.index[keep - 1]]
+            bars[name] = pd.concat([old.iloc[:keep], _aggregate(tail, rule, spec)])
+            if name in TIMEFRAME_RULES:
+                changed_since[name] = old.index[keep]
+        return BarStore(
+            daily,
+            data_version,
+            _bars=bars,
+            base_version=self.data_version,
+            changed_since=changed_since,
+        )
+
+    def bars(self, timeframe: str) -> pd.DataFrame:
+        """Aggregated bars for ``weekly``/``monthly``, including empty periods."""
+        if timeframe not in TIMEFRAME_RULES:
+            raise ValueError(f"Unsupported timeframe: {timeframe}")
+        return self._bars[timeframe]
+
+    def ohlcv(self, timeframe: str, *, adjusted: bool = False) -> pd.DataFrame:
+        """OHLCV bars for ``weekly``/``monthly`` with incomplete rows dropped.
+
+        With ``adjusted=True`` the period's last ``Adj Close`` is used as Close.
+        """
+        key = ("ohlcv", timeframe, adjusted)
+        view = self._views.get(key)
+        if view is None:
+            bars = self.bars(timeframe)
+            columns = [col for col in ("Open", "High", "Low", "Close", "Volume") if col in bars.columns]
+            view = bars[columns]
+            if adjusted and "Adj Close" in bars.columns:
+                view = view.assign(Close=bars["Adj Close"])
+            view = self._views[key] = view.dropna()
+        return view
+
+    def month_end(self) -> pd.DataFrame:
+        """Last value of every daily column per month, incomplete months dropped."""
+        view = self._views.get(("month_end",))
+        if view is None:
+            view = self._views[("month_end",)] = self._bars["month_end"].dropna()
+        return view
@@ -0,0 +1,299 @@
+"""Vectorized serialization of chart history.
+
+Bars are rounded a column at a time and written straight to JSON text,
+without a dict per bar.  The output is byte-for-byte what
+``json.dumps(..., separators=(",", ":"))`` gives for the per-bar dicts the
+chart endpoints used to build, so clients see no change.  Two shapes are
+supported:
+
+* ``rows``    - ``{"history": [{"time": ..., "open": ..., ...}, ...]}``
+* ``columns`` - ``{"history": {"time": [...], "open": [...], ...}}``
+
+Non-finite values are written as ``null``.
+
+Clients that send ``Accept: application/vnd.stock-columns`` get the same
+columns packed as little-endian binary buffers instead (:func:`pack_columns`).
+The layout is::
+
+    offset 0   b"SCOL"
+           4   u8   format version (1)
+           5   u8   reserved
+           6   u16  column count
+           8   column directory, one entry per column:
+                   u8   dtype (1 = int32, 2 = float32, 3 = float64)
+                   u8   name length
+                   u16  reserved
+                   u32  element count
+                   u32  byte offset of the column data
+                   name (UTF-8)
+               column data, each buffer starting on an 8-byte boundary
+
+Aligned buffers let the browser wrap each column in a typed array without
+copying.  Times are int32 epoch seconds and values float32, which keeps
+about seven significant digits; a column that does not fit falls back to
+float64.  Line series (``{name: [{"time", "value"}, ...]}``) are packed as
+``name.time`` and ``name.value`` column pairs.
+
+Line series can also be sent compactly (:func:`compact_series`)::
+
+    {"axes": {"weekly": [t0, t1, ...], ...},
+     "series": {"dma_200": {"axis": "weekly", "start": 199, "values": [...]},
+                "rsi_upper_band": {"axis": "weekly", "start": 14, "length": 900, "value": 70}}}
+
+Each series' values line up with ``axes[axis][start:]``, with ``null`` where
+it has no point.  A series holding one value throughout is sent as that
+``value`` and its ``length`` instead.
+
+Requests can narrow the history to a time window (:func:`window_slice`):
+``since``/``until`` bound it inclusively in epoch seconds, ``after`` keeps
+only bars newer than a client's last bar, and ``limit`` keeps the most
+recent bars of what is left, so ``until=<first bar - 1>&limit=N`` pages
+backwards.
+"""
+from __future__ import annotations
+
+import struct
+from typing import Literal
+
+import numpy as np
+import pandas as pd
+
+HistoryShape = Literal["rows", "columns"]
+
+# Output field -> source column.
+OHLCV_FIELDS = {
+    "open": "Open",
+    "high": "High",
+    "low": "Low",
+    "close": "Close",
+    "volume": "Volume",
+}
+
+_NS_PER_SECOND = 10**9
+
+PACKED_MEDIA_TYPE = "application/vnd.stock-columns"
+PACKED_MAGIC = b"SCOL"
+PACKED_VERSION = 1
+_PACKED_DTYPES = {1: np.dtype("<i4"), 2: np.dtype("<f4"), 3: np.dtype("<f8")}
+_INT32 = np.iinfo(np.int32)
+_FLOAT32_MAX = float(np.finfo(np.float32).max)
+
+
+def epoch_seconds(index: pd.DatetimeIndex) -> np.ndarray:
+    """``int(ts.timestamp())`` for every timestamp, as int64."""
+    ns = index.as_unit("ns").asi8
+    seconds = ns // _NS_PER_SECOND
+    # int() truncates toward zero; floor division rounds pre-1970 fractions down.
+    seconds += (ns < 0) & (ns % _NS_PER_SECOND != 0)
+    return seconds
+
+
+def window_slice(
+    times,
+    since: int | None = None,
+    until: int | None = None,
+    after: int | None = None,
+    limit: int | None = None,
+) -> slice:
+    """Positions of ascending epoch-second ``times`` inside the requested window."""
+    times = np.asarray(times)
+    start, stop = 0, len(times)
+    if since is not None:
+        start = max(start, int(np.searchsorted(times, since, side="left")))
+    if after is not None:
+        start = max(start, int(np.searchsorted(times, after, side="right")))
+    if until is not None:
+        stop = min(stop, int(np.searchsorted(times, until, side="right")))
+    if limit is not None:
+        start = max(start, stop - limit)
+    return slice(start, max(start, stop))
+
+
+def window_frame(df: pd.DataFrame, **window) -> pd.DataFrame:
+    """Rows of ``df`` inside the window; see :func:`window_slice`."""
+    if all(value is None for value in window.values()):
+        return df
+    return df.iloc[window_slice(epoch_seconds(df.index), **window)]
+
+
+def window_series(lines: dict[str, list[dict]], **window) -> dict[str, list[dict]]:
+    """Each line series cut to the window on its own time axis."""
+    if all(value is None for value in window.values()):
+        return lines
+    return {
+        name: points[window_slice([point["time"] for point in points], **window)]
+        for name, points in lines.items()
+    }
+
+
+def round_column(values: np.ndarray, ndigits: int = 2) -> np.ndarray:
+    """``round(float(v), ndigits)`` for every element, vectorized.
+
+    ``np.round`` scales by ``10**ndigits`` before rounding, which can land on
+    the other side of a tie than Python's correctly rounded ``round``; the few
+    values that close to a tie are redone with ``round``.
+    """
+    values = np.asarray(values, dtype=float)
+    rounded = np.round(values, ndigits)
+    scaled = np.abs(values * 10.0**ndigits)
+    tolerance = np.maximum(4 * np.spacing(scaled), 1e-9)
+    with np.errstate(invalid="ignore"):
+        near_tie = np.abs(scaled - np.floor(scaled) - 0.5) <= tolerance
+    for i in np.flatnonzero(near_tie):
+        rounded[i] = round(float(values[i]), ndigits)
+    return rounded
+
+
+def json_numbers(values: np.ndarray) -> list[str]:
+    """JSON text per value, as ``json.dumps`` writes floats; non-finite become ``null``."""
+    text = list(map(float.__repr__, values.tolist()))
+    for i in np.flatnonzero(~np.isfinite(values)):
+        text[i] = "null"
+    return text
+
+
+def ohlcv_columns(df: pd.DataFrame, ndigits: int = 2) -> dict[str, np.ndarray]:
+    """Chart columns for ``df``: int64 ``time`` plus rounded OHLCV floats."""
+    columns = {"time": epoch_seconds(df.index)}
+    for field, source in OHLCV_FIELDS.items():
+        columns[field] = round_column(df[source].to_numpy(dtype=float, na_value=np.nan), ndigits)
+    return columns
+
+
+def history_json(df: pd.DataFrame, shape: HistoryShape = "rows") -> str:
+    """``{"history": ...}`` JSON text for the bars in ``df``."""
+    columns = ohlcv_columns(df)
+    text = {"time": list(map(str, columns["time"].tolist()))}
+    for field in OHLCV_FIELDS:
+        text[field] = json_numbers(columns[field])
+
+    if shape == "columns":
+        body = ",".join(f'"{field}":[{",".join(values)}]' for field, values in text.items())
+        return f'{{"history":{{{body}}}}}'
+
+    row = ",".join(f'"{field}":%s' for field in text)
+    rows = ",".join([f"{{{row}}}" % values for values in zip(*text.values())])
+    return f'{{"history":[{rows}]}}'
+
+
+def accepts_packed(accept: str | None) -> bool:
+    """Whether an ``Accept`` header asks for the packed binary format."""
+    if not accept:
+        return False
+    return any(part.split(";")[0].strip() == PACKED_MEDIA_TYPE for part in accept.split(","))
+
+
+def _packed_dtype(values: np.ndarray) -> int:
+    if values.dtype.kind in "iu":
+        if len(values) == 0 or (values.min() >= _INT32.min and values.max() <= _INT32.max):
+            return 1
+        return 3
+    finite = values[np.isfinite(values)]
+    if len(finite) and np.abs(finite).max() > _FLOAT32_MAX:
+        return 3
+    return 2
+
+
+def pack_columns(columns: dict[str, np.ndarray]) -> bytes:
+    """Pack named columns into the ``application/vnd.stock-columns`` layout."""
+    entries = []
+    for name, values in columns.items():
+        values = np.asarray(values)
+        code = _packed_dtype(values)
+        entries.append((name.encode("utf-8"), code, values.astype(_PACKED_DTYPES[code]).tobytes()))
+
+    header_size = 8 + sum(12 + len(name) for name, _, _ in entries)
+    offset = -(-header_size // 8) * 8
+    directory = []
+    for name, code, data in entries:
+        count = len(data) // _PACKED_DTYPES[code].itemsize
+        directory.append(struct.pack("<BBHII", code, len(name), 0, count, offset) + name)
+        offset += -(-len(data) // 8) * 8
+
+    parts = [struct.pack("<4sBBH", PACKED_MAGIC, PACKED_VERSION, 0, len(entries)), *directory]
+    position = header_size
+    for _, _, data in entries:
+        padding = -position % 8
+        parts.append(b"\0" * padding)
+        parts.append(data)
+        position += padding + len(data)
+    return b"".join(parts)
+
+
+def unpack_columns(payload: bytes) -> dict[str, np.ndarray]:
+    """Inverse of :func:`pack_columns`; the arrays are views into ``payload``."""
+    magic, version, _, count = struct.unpack_from("<4sBBH", payload, 0)
+    if magic != PACKED_MAGIC or version != PACKED_VERSION:
+        raise ValueError("Not a packed column payload")
+    columns = {}
+    position = 8
+    for _ in range(count):
+        code, name_length, _, length, offset = struct.unpack_from("<BBHII", payload, position)
+        position += 12
+        name = payload[position:position + name_length].decode("utf-8")
+        position += name_length
+        columns[name] = np.frombuffer(payload, dtype=_PACKED_DTYPES[code], count=length, offset=offset)
+    return columns
+
+
+def packed_history(df: pd.DataFrame) -> bytes:
+    """The bars in ``df`` as packed ``time``/OHLCV columns."""
+    return pack_columns(ohlcv_columns(df))
+
+
+def packed_series(lines: dict[str, list[dict]]) -> bytes:
+    """Line series ``{name: [{"time", "value"}, ...]}`` as packed column pairs."""
+    columns = {}
+    for name, points in lines.items():
+        columns[f"{name}.time"] = np.array([point["time"] for point in points], dtype=np.int64)
+        columns[f"{name}.value"] = np.array(
+            [np.nan if point["value"] is None else point["value"] for point in points],
+            dtype=float,
+        )
+    return pack_columns(columns)
+
+
+def _series_axis(times: np.ndarray, axes: dict[str, np.ndarray]) -> str | None:
+    for name, axis in axes.items():
+        if np.isin(times, axis).all():
+            return name
+    return None
+
+
+def compact_series(lines: dict[str, list[dict]], axes: dict[str, np.ndarray]) -> dict:
+    """Line series on shared time axes; see the module docstring for the shape.
+
+    ``axes`` are candidate axes (epoch seconds), sparsest first.  Each series
+    goes on the first axis holding all of its times, or on an axis of its own;
+    a sent axis is only the times its series use.
+    """
+    assigned = {}
+    for name, points in lines.items():
+        times = np.fromiter((point["time"] for point in points), dtype=np.int64, count=len(points))
+        assigned[name] = (_series_axis(times, axes) or name, times)
+
+    used: dict[str, list[np.ndarray]] = {}
+    for axis_name, times in assigned.values():
+        used.setdefault(axis_name, []).append(times)
+    shared = {name: np.unique(np.concatenate(parts)) for name, parts in used.items()}
+
+    series = {}
+    for name, points in lines.items():
+        axis_name, times = assigned[name]
+        positions = np.searchsorted(shared[axis_name], times)
+        start = int(positions[0]) if len(positions) else 0
+        values = [point["value"] for point in points]
+        first = values[0] if values else None
+        contiguous = len(positions) and positions[-1] - start + 1 == len(positions)
+        if len(values) > 1 and contiguous and first is not None and all(v == first for v in values):
+            series[name] = {"axis": axis_name, "start": start, "length": len(values), "value": first}
+            continue
+        aligned = [None] * (int(positions[-1]) - start + 1 if len(positions) else 0)
+        for position, value in zip((positions - start).tolist(), values):
+            aligned[position] = value
+        series[name] = {"axis": axis_name, "start": start, "values": aligned}
+
+    return {
+        "axes": {name: axis.tolist() for name, axis in shared.items()},
+        "series": series,
+    }
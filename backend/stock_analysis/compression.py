@@ -0,0 +1,164 @@
+"""Response compression for the large JSON and packed chart payloads.
+
+Overlay, chart, ratio and batch responses run to megabytes of JSON.  Numbers
+printed as text compress well, so :class:`CompressionMiddleware` encodes
+responses of at least ``COMPRESSION_MIN_BYTES`` with the best encoding the
+client accepts: ``zstd``, ``br`` or ``gzip``, in that order of preference
+(brotli and zstd need the ``brotli`` and ``zstandard`` packages).  Levels
+favour throughput over ratio; ``benchmarks/compression.py`` measures the
+trade-off.
+
+Large bodies are compressed on the blocking pool so the event loop keeps
+serving sockets.  Responses that already carry a ``Content-Encoding`` pass
+through untouched; the response cache sends its stored, pre-compressed
+variants that way (see :func:`encoded_body`).
+"""
+from __future__ import annotations
+
+import gzip
+import os
+from typing import Callable
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from .chart_payload import PACKED_MEDIA_TYPE
+from .execution import run_blocking
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+# Bodies from this size are compressed off the event loop.
+COMPRESSION_OFFLOAD_BYTES = int(os.getenv("COMPRESSION_OFFLOAD_BYTES", str(64 * 1024)))
+# gzip 1 costs about half the CPU of level 5 for bodies 10-20% larger; brotli
+# 4 and zstd 3 beat both on size at similar or lower cost.
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "1"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+ZSTD_LEVEL = int(os.getenv("ZSTD_LEVEL", "3"))
+
+COMPRESSIBLE_TYPES = ("application/json", PACKED_MEDIA_TYPE, "text/")
+
+
+def _gzip(body: bytes) -> bytes:
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def _brotli(body: bytes) -> bytes:
+    return brotli.compress(body, quality=BROTLI_QUALITY)
+
+
+def _zstd(body: bytes) -> bytes:
+    return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+
+
+# Content-Encoding -> compressor, most preferred first.
+ENCODERS: dict[str, Callable[[bytes], bytes]] = {}
+if zstandard is not None:
+    ENCODERS["zstd"] = _zstd
+if brotli is not None:
+    ENCODERS["br"] = _brotli
+ENCODERS["gzip"] = _gzip
+
+
+def negotiate(accept_encoding: str | None) -> str | None:
+    """The preferred available encoding an ``Accept-Encoding`` header allows, if any."""
+    if not accept_encoding:
+        return None
+    weights: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name.strip().lower()] = weight
+    best, best_weight = None, 0.0
+    for encoding in ENCODERS:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def compressible(content_type: str | None, size: int) -> bool:
+    """Whether a body of ``content_type`` and ``size`` bytes is worth compressing."""
+    if size < COMPRESSION_MIN_BYTES or not content_type:
+        return False
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+async def encoded_body(body: bytes, encoding: str) -> bytes:
+    """``body`` compressed with ``encoding``, off the event loop when large."""
+    if len(body) >= COMPRESSION_OFFLOAD_BYTES:
+        return await run_blocking("compress", ENCODERS[encoding], body)
+    return ENCODERS[encoding](body)
+
+
+def add_vary(headers: MutableHeaders, value: str) -> None:
+    vary = headers.get("vary")
+    if not vary:
+        headers["vary"] = value
+    elif value.lower() not in (part.strip().lower() for part in vary.split(",")):
+        headers["vary"] = f"{vary}, {value}"
+
+
+class CompressionMiddleware:
+    """Compress HTTP responses the client accepts an encoding for."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        state = {"start": None, "body": [], "passthrough": False}
+
+        async def compress(message):
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if "content-encoding" in headers or message["status"] in (204, 304):
+                    state["passthrough"] = True
+                    return await send(message)
+                state["start"] = message
+                return
+            if message["type"] != "http.response.body" or state["passthrough"]:
+                return await send(message)
+
+            state["body"].append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            start, body = state["start"], b"".join(state["body"])
+            headers = MutableHeaders(raw=list(start["headers"]))
+            if compressible(headers.get("content-type"), len(body)):
+                body = await encoded_body(body, encoding)
+                headers["content-encoding"] = encoding
+                headers["content-length"] = str(len(body))
+            add_vary(headers, "Accept-Encoding")
+            await send({**start, "headers": headers.raw})
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, compress)
+
+
+__all__ = [
+    "COMPRESSION_MIN_BYTES",
+    "CompressionMiddleware",
+    "ENCODERS",
+    "compressible",
+    "encoded_body",
+    "negotiate",
+]
@@ -0,0 +1,111 @@
+"""Downsampling of chart bars and line series for zoomed-out views.
+
+Points are picked with Largest-Triangle-Three-Buckets (LTTB) on the chart's
+close prices, once per request.  Every line series drawn on the same time
+axis keeps exactly those timestamps, so overlays still line up with the
+candles.  A downsampled candle covers all bars since the previous kept one
+(first open, highest high, lowest low, summed volume) so extremes survive.
+Series on a different axis, e.g. weekly lines on a daily chart, are
+downsampled on their own.
+"""
+from __future__ import annotations
+
+import math
+
+import numpy as np
+import pandas as pd
+
+from .chart_payload import epoch_seconds
+
+
+def lttb_indices(x, y, n_out: int) -> np.ndarray:
+    """Positions of the ``n_out`` points LTTB keeps from ``(x, y)``.
+
+    The first and last points are always kept.  Any other NaN ``y`` is picked
+    only when its whole bucket is NaN; the geometry treats gaps as carrying
+    the previous value forward.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float).tolist()
+    y = np.asarray(y, dtype=float)
+    missing = np.isnan(y).tolist()
+    y = pd.Series(y).ffill().bfill().fillna(0.0).tolist()
+
+    every = (n - 2) / (n_out - 2)
+    kept = [0]
+    a = 0
+    for i in range(n_out - 2):
+        # Average of the next bucket is the third triangle vertex.
+        next_start = int(math.floor((i + 1) * every)) + 1
+        next_end = min(int(math.floor((i + 2) * every)) + 1, n)
+        span = next_end - next_start
+        avg_x = sum(x[next_start:next_end]) / span
+        avg_y = sum(y[next_start:next_end]) / span
+
+        start = int(math.floor(i * every)) + 1
+        end = int(math.floor((i + 1) * every)) + 1
+        ax, ay = x[a], y[a]
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            if missing[j]:
+                continue
+            area = abs((ax - avg_x) * (y[j] - ay) - (ax - x[j]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        kept.append(best)
+        a = best
+    kept.append(n - 1)
+    return np.asarray(kept, dtype=np.int64)
+
+
+def downsample_bars(df: pd.DataFrame, max_points: int | None) -> pd.DataFrame:
+    """At most ``max_points`` OHLCV bars, each covering the bars since the previous one."""
+    if max_points is None or len(df) <= max_points:
+        return df
+    times = epoch_seconds(df.index)
+    kept = lttb_indices(times, df["Close"].to_numpy(dtype=float, na_value=np.nan), max_points)
+    starts = np.concatenate(([0], kept[:-1] + 1))
+
+    def column(name):
+        return df[name].to_numpy(dtype=float, na_value=np.nan)
+
+    bars = {
+        "Open": column("Open")[starts],
+        "High": np.fmax.reduceat(column("High"), starts),
+        "Low": np.fmin.reduceat(column("Low"), starts),
+        "Close": column("Close")[kept],
+        "Volume": np.add.reduceat(np.nan_to_num(column("Volume")), starts),
+    }
+    return pd.DataFrame(bars, index=df.index[kept])
+
+
+def downsample_lines(
+    lines: dict[str, list[dict]],
+    max_points: int | None,
+    axis_times: np.ndarray | None = None,
+    kept_times: np.ndarray | None = None,
+) -> dict[str, list[dict]]:
+    """Cut each line series to at most ``max_points`` points.
+
+    ``axis_times`` are the full chart's bar times and ``kept_times`` those
+    :func:`downsample_bars` kept; series whose points all sit on the chart
+    axis keep only those times, however few points they have.  Other series,
+    and every series without a chart axis, are downsampled on their own.
+    """
+    if max_points is None:
+        return lines
+    result = {}
+    for name, points in lines.items():
+        times = np.fromiter((point["time"] for point in points), dtype=np.int64, count=len(points))
+        if axis_times is not None and np.isin(times, axis_times).all():
+            keep = np.flatnonzero(np.isin(times, kept_times))
+        elif len(points) <= max_points:
+            result[name] = points
+            continue
+        else:
+            values = [np.nan if point["value"] is None else point["value"] for point in points]
+            keep = lttb_indices(times, values, max_points)
+        result[name] = [points[i] for i in keep.tolist()]
+    return result
@@ -0,0 +1,122 @@
+"""Execution layer for blocking work called from async endpoints.
+
+Price downloads, pandas resampling and ``requests`` calls block.  Called
+directly from an ``async def`` endpoint, they stall the event loop and with
+it every open chart socket.  :func:`run_blocking` runs such work on a
+dedicated thread pool instead.  Each kind of work has a limit on how many
+calls may run at once (``EXECUTION_LIMITS``), so a burst of cold symbols
+cannot take every worker.
+
+:func:`monitor_loop_lag` runs on the event loop and reports when it was
+blocked for longer than ``LOOP_LAG_WARN_MS``.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import os
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Callable, TypeVar
+
+T = TypeVar("T")
+
+BLOCKING_WORKERS = int(os.getenv("BLOCKING_WORKERS", "16"))
+LOOP_LAG_INTERVAL_MS = float(os.getenv("LOOP_LAG_INTERVAL_MS", "100"))
+LOOP_LAG_WARN_MS = float(os.getenv("LOOP_LAG_WARN_MS", "200"))
+
+# Work kind -> most calls running at once.  Kinds not listed are unlimited
+# beyond the pool size.
+EXECUTION_LIMITS = {
+    "chart": int(os.getenv("CHART_CONCURRENCY", "8")),
+    "fundamentals": int(os.getenv("FUNDAMENTALS_CONCURRENCY", "4")),
+    "live": int(os.getenv("LIVE_POLL_CONCURRENCY", "4")),
+}
+
+_executor = ThreadPoolExecutor(max_workers=BLOCKING_WORKERS, thread_name_prefix="blocking")
+# event loop -> kind -> semaphore; asyncio primitives belong to one loop.
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, asyncio.Semaphore]]" = (
+    weakref.WeakKeyDictionary()
+)
+_stats_lock = Lock()
+_stats: dict[str, dict[str, float]] = {}
+_loop_lag = {"checks": 0, "blocked": 0, "max_ms": 0.0, "last_ms": 0.0}
+
+
+def _semaphore(kind: str) -> asyncio.Semaphore | None:
+    limit = EXECUTION_LIMITS.get(kind)
+    if limit is None:
+        return None
+    semaphores = _semaphores.setdefault(asyncio.get_running_loop(), {})
+    semaphore = semaphores.get(kind)
+    if semaphore is None:
+        semaphore = semaphores[kind] = asyncio.Semaphore(limit)
+    return semaphore
+
+
+def _record(kind: str, waited: float, ran: float) -> None:
+    with _stats_lock:
+        stats = _stats.setdefault(kind, {"calls": 0, "wait_s": 0.0, "run_s": 0.0, "max_run_s": 0.0})
+        stats["calls"] += 1
+        stats["wait_s"] += waited
+        stats["run_s"] += ran
+        stats["max_run_s"] = max(stats["max_run_s"], ran)
+
+
+async def run_blocking(kind: str, fn: Callable[..., T], *args, **kwargs) -> T:
+    """Run ``fn(*args, **kwargs)`` on the blocking pool under ``kind``'s limit.
+
+    Like ``asyncio.to_thread``, the call sees the caller's context variables.
+    """
+    call = functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+    loop = asyncio.get_running_loop()
+    queued = time.perf_counter()
+    semaphore = _semaphore(kind)
+    if semaphore is not None:
+        await semaphore.acquire()
+    try:
+        started = time.perf_counter()
+        try:
+            return await loop.run_in_executor(_executor, call)
+        finally:
+            _record(kind, started - queued, time.perf_counter() - started)
+    finally:
+        if semaphore is not None:
+            semaphore.release()
+
+
+async def monitor_loop_lag(
+    interval_ms: float = LOOP_LAG_INTERVAL_MS, warn_ms: float = LOOP_LAG_WARN_MS
+) -> None:
+    """Sleep ``interval_ms`` at a time and report wake-ups later than ``warn_ms``.
+
+    A late wake-up means something held the event loop for that long.
+    """
+    interval = interval_ms / 1000
+    while True:
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        lag_ms = max(0.0, (time.perf_counter() - expected) * 1000)
+        _loop_lag["checks"] += 1
+        _loop_lag["last_ms"] = lag_ms
+        _loop_lag["max_ms"] = max(_loop_lag["max_ms"], lag_ms)
+        if lag_ms > warn_ms:
+            _loop_lag["blocked"] += 1
+            print(f"[loop-lag] Event loop blocked for {lag_ms:.0f} ms")
+
+
+def execution_stats() -> dict:
+    """Per-kind call counts and timings, plus event loop lag."""
+    with _stats_lock:
+        kinds = {
+            kind: {**stats, "limit": EXECUTION_LIMITS.get(kind)}
+            for kind, stats in _stats.items()
+        }
+    return {
+        "workers": BLOCKING_WORKERS,
+        "kinds": kinds,
+        "loop_lag": dict(_loop_lag, warn_ms=LOOP_LAG_WARN_MS),
+    }
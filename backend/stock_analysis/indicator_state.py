@@ -0,0 +1,485 @@
+"""Incremental indicator state for bar-by-bar updates.
+
+Each indicator keeps only its recursive state (EMA value and weights, Wilder
+averages, rolling sums, SuperTrend bands and trend), so feeding it one more
+bar is O(1) instead of recomputing the whole history.  ``append`` consumes a
+new bar and ``replace_last`` re-applies the most recent bar with revised
+values, which is what an intraday refresh of the open bar needs.
+
+The recursions mirror the vectorized implementations in :mod:`.utils`, and
+every indicator keeps a ``recompute`` that runs the full calculation so the
+incremental values can be checked against it (see :meth:`IndicatorSet.verify`).
+
+:class:`IndicatorSet` owns the indicators for one symbol and timeframe and
+keeps them in step with the symbol's :class:`~.bar_store.BarStore`.
+"""
+from __future__ import annotations
+
+import math
+from threading import Lock
+
+import numpy as np
+import pandas as pd
+
+from .utils import (
+    compute_supertrend_lines,
+    compute_wilder_atr,
+    compute_wilder_rsi,
+)
+
+_NAN = float("nan")
+
+
+def _true_range(high: float, low: float, prev_close: float | None) -> float:
+    # Same as concat([h - l, |h - pc|, |l - pc|]).max(axis=1): NaNs are skipped.
+    if prev_close is None:
+        candidates = (high - low,)
+    else:
+        candidates = (high - low, abs(high - prev_close), abs(low - prev_close))
+    values = [v for v in candidates if v == v]
+    return max(values) if values else _NAN
+
+
+class IncrementalIndicator:
+    """Base class: subclasses define ``fields``, ``_apply`` and ``value``."""
+
+    fields: tuple[str, ...] = ("Close",)
+
+    def __init__(self):
+        self.count = 0
+        self._undo = None
+
+    @property
+    def key(self) -> tuple:
+        return (type(self).__name__, *self._params())
+
+    def _params(self) -> tuple:
+        return ()
+
+    def _save(self):
+        return {k: v for k, v in self.__dict__.items() if k != "_undo"}
+
+    def _restore(self, saved) -> None:
+        self.__dict__.update(saved)
+
+    def append(self, *values: float):
+        """Consume a new bar and return the indicator's current value."""
+        self._undo = self._save()
+        self._apply(*values)
+        self.count += 1
+        return self.value
+
+    def replace_last(self, *values: float):
+        """Re-apply the most recent bar with revised values."""
+        if self._undo is None:
+            raise ValueError("replace_last() needs a previously appended bar")
+        undo = self._undo
+        self._restore(undo)
+        self._undo = undo
+        self._apply(*values)
+        self.count += 1
+        return self.value
+
+    def extend(self, frame: pd.DataFrame):
+        """Consume every row of ``frame`` in order."""
+        for row in frame[list(self.fields)].to_numpy(dtype=float, na_value=np.nan):
+            self.append(*row)
+        return self.value
+
+    def reset(self) -> "IncrementalIndicator":
+        """Return a fresh indicator with the same parameters."""
+        return type(self)(*self._params())
+
+    def _apply(self, *values: float) -> None:
+        raise NotImplementedError
+
+    @property
+    def value(self):
+        raise NotImplementedError
+
+    def recompute(self, frame: pd.DataFrame):
+        """Full-history calculation of the current value, for verification."""
+        raise NotImplementedError
+
+
+class EMA(IncrementalIndicator):
+    """Exponentially weighted mean, matching ``Series.ewm(...).mean()``.
+
+    Follows pandas' recursion (``ignore_na=False``) for both ``adjust`` modes,
+    so ``EMA(span=30)`` matches ``ewm(span=30, adjust=False)`` and
+    ``EMA(alpha=1/14, adjust=True, min_periods=14)`` matches Wilder's averages.
+    """
+
+    def __init__(self, span=None, alpha=None, adjust=False, min_periods=0, field="Close"):
+        super().__init__()
+        if alpha is None:
+            if span is None:
+                raise ValueError("EMA needs span or alpha")
+            alpha = 2.0 / (span + 1.0)
+        self.span = span
+        self.alpha = alpha
+        self.adjust = adjust
+        self.min_periods = max(int(min_periods), 1)
+        self.fields = (field,)
+        self._weighted = None
+        self._old_wt = 1.0
+        self._nobs = 0
+
+    def _params(self) -> tuple:
+        return (self.span, self.alpha if self.span is None else None, self.adjust, self.min_periods, self.fields[0])
+
+    def _apply(self, x: float) -> None:
+        is_obs = x == x
+        self._nobs += int(is_obs)
+        if self._weighted is None:
+            self._weighted = x
+            self._old_wt = 1.0
+            return
+        weighted = self._weighted
+        if weighted == weighted:
+            self._old_wt *= 1.0 - self.alpha
+            if is_obs:
+                new_wt = 1.0 if self.adjust else self.alpha
+                if weighted != x:
+                    weighted = (self._old_wt * weighted + new_wt * x) / (self._old_wt + new_wt)
+                self._old_wt = self._old_wt + new_wt if self.adjust else 1.0
+        elif is_obs:
+            weighted = x
+        self._weighted = weighted
+
+    @property
+    def value(self) -> float:
+        if self._weighted is None or self._nobs < self.min_periods:
+            return _NAN
+        return self._weighted
+
+    def recompute(self, frame: pd.DataFrame) -> float:
+        series = frame[self.fields[0]].ewm(
+            span=self.span,
+            alpha=None if self.span is not None else self.alpha,
+            adjust=self.adjust,
+            min_periods=self.min_periods,
+        ).mean()
+        return float(series.iloc[-1]) if len(series) else _NAN
+
+
+class WilderRSI(IncrementalIndicator):
+    """Wilder RSI, matching :func:`~.utils.compute_wilder_rsi`."""
+
+    def __init__(self, period: int = 14, field: str = "Close"):
+        super().__init__()
+        self.period = period
+        self.fields = (field,)
+        self._prev_close = None
+        self._gain = EMA(alpha=1 / period, adjust=True, min_periods=period)
+        self._loss = EMA(alpha=1 / period, adjust=True, min_periods=period)
+
+    def _params(self) -> tuple:
+        return (self.period, self.fields[0])
+
+    def _save(self):
+        saved = super()._save()
+        saved["_gain"] = self._gain._save()
+        saved["_loss"] = self._loss._save()
+        return saved
+
+    def _restore(self, saved) -> None:
+        gain, loss = saved["_gain"], saved["_loss"]
+        self.__dict__.update({k: v for k, v in saved.items() if k not in ("_gain", "_loss")})
+        self._gain._restore(gain)
+        self._loss._restore(loss)
+
+    def _apply(self, close: float) -> None:
+        delta = _NAN if self._prev_close is None else close - self._prev_close
+        # delta.where(delta > 0, 0.0) and -delta.where(delta < 0, 0.0)
+        self._gain._apply(delta if delta > 0 else 0.0)
+        self._loss._apply(-delta if delta < 0 else -0.0)
+        self._prev_close = close
+
+    @property
+    def value(self) -> float:
+        avg_gain, avg_loss = self._gain.value, self._loss.value
+        rs = math.inf if avg_loss == 0 else avg_gain / avg_loss
+        return 100 - (100 / (1 + rs))
+
+    def recompute(self, frame: pd.DataFrame) -> float:
+        rsi = compute_wilder_rsi(frame[self.fields[0]], self.period)
+        return float(rsi.iloc[-1]) if len(rsi) else _NAN
+
+
+class WilderATR(IncrementalIndicator):
+    """Wilder ATR over the true range, matching :func:`~.utils.compute_wilder_atr`."""
+
+    fields = ("High", "Low", "Close")
+
+    def __init__(self, period: int = 14):
+        super().__init__()
+        self.period = period
+        self._prev_close = None
+        self._seed: tuple[float, ...] = ()
+        self._atr = _NAN
+
+    def _params(self) -> tuple:
+        return (self.period,)
+
+    def _apply(self, high: float, low: float, close: float) -> None:
+        tr = _true_range(high, low, self._prev_close)
+        self._prev_close = close
+        if len(self._seed) < self.period:
+            self._seed = self._seed + (tr,)
+            if len(self._seed) == self.period:
+                self._atr = float(pd.Series(self._seed).mean())
+        else:
+            self._atr = (self._atr * (self.period - 1) + tr) / self.period
+
+    @property
+    def value(self) -> float:
+        return self._atr
+
+    def recompute(self, frame: pd.DataFrame) -> float:
+        high, low, close = frame["High"], frame["Low"], frame["Close"]
+        tr = pd.concat(
+            [high - low, (high - close.shift(1)).abs(), (low - close.shift(1)).abs()], axis=1
+        ).max(axis=1)
+        atr = compute_wilder_atr(tr, self.period)
+        return float(atr.iloc[-1]) if len(atr) else _NAN
+
+
+class SuperTrend(IncrementalIndicator):
+    """SuperTrend trend and active band, matching :func:`~.utils.compute_supertrend_lines`.
+
+    ``value`` is ``(trend, line)`` where ``trend`` is ``1`` (Buy) or ``-1``
+    (Sell) and ``line`` is the band for the active trend.
+    """
+
+    fields = ("High", "Low", "Close")
+
+    def __init__(self, period: int = 10, multiplier: float = 3.0):
+        super().__init__()
+        self.period = period
+        self.multiplier = multiplier
+        self._atr = WilderATR(period)
+        self._prev_close = None
+        self._up_band = _NAN
+        self._dn_band = _NAN
+        self._trend = 1
+
+    def _params(self) -> tuple:
+        return (self.period, self.multiplier)
+
+    def _save(self):
+        saved = super()._save()
+        saved["_atr"] = self._atr._save()
+        return saved
+
+    def _restore(self, saved) -> None:
+        atr = saved["_atr"]
+        self.__dict__.update({k: v for k, v in saved.items() if k != "_atr"})
+        self._atr._restore(atr)
+
+    def _apply(self, high: float, low: float, close: float) -> None:
+        self._atr._apply(high, low, close)
+        atr = self._atr.value
+        hl2 = (high + low) / 2
+        up = hl2 - self.multiplier * atr
+        dn = hl2 + self.multiplier * atr
+
+        if self._prev_close is None:
+            self._up_band, self._dn_band = up, dn
+            self._prev_close = close
+            return
+
+        prev_up, prev_dn = self._up_band, self._dn_band
+        # Band stickiness, with the same NaN behaviour as Python's max/min
+        up_band = max(up, prev_up) if self._prev_close > prev_up else up
+        dn_band = min(dn, prev_dn) if self._prev_close < prev_dn else dn
+
+        if self._trend == -1 and close > prev_dn:
+            self._trend = 1
+        elif self._trend == 1 and close < prev_up:
+            self._trend = -1
+
+        self._up_band, self._dn_band = up_band, dn_band
+        self._prev_close = close
+
+    @property
+    def value(self) -> tuple[int, float]:
+        return self._trend, self._up_band if self._trend == 1 else self._dn_band
+
+    def recompute(self, frame: pd.DataFrame) -> tuple[int, float]:
+        df_st = compute_supertrend_lines(frame, self.period, self.multiplier)
+        last = df_st.iloc[-1]
+        trend = int(last["Trend"])
+        return trend, float(last["ST_Line_Up"] if trend == 1 else last["ST_Line_Down"])
+
+
+class RollingMean(IncrementalIndicator):
+    """Simple moving average, matching ``Series.rolling(window).mean()``."""
+
+    def __init__(self, window: int, field: str = "Close"):
+        super().__init__()
+        self.window = window
+        self.fields = (field,)
+        self._buffer = [_NAN] * window
+        self._pos = 0
+        self._sum = 0.0
+        self._comp = 0.0
+        self._nans = window
+
+    def _params(self) -> tuple:
+        return (self.window, self.fields[0])
+
+    def _save(self):
+        # The ring buffer only changes in the slot being overwritten.
+        return (self._pos, self._buffer[self._pos], self._sum, self._comp, self._nans, self.count)
+
+    def _restore(self, saved) -> None:
+        pos, evicted, self._sum, self._comp, self._nans, self.count = saved
+        self._buffer[pos] = evicted
+        self._pos = pos
+
+    def _add(self, x: float) -> None:
+        # Neumaier-compensated running sum, as pandas' rolling kernels use.
+        total = self._sum + x
+        if abs(self._sum) >= abs(x):
+            self._comp += (self._sum - total) + x
+        else:
+            self._comp += (x - total) + self._sum
+        self._sum = total
+
+    def _apply(self, x: float) -> None:
+        evicted = self._buffer[self._pos]
+        if evicted == evicted:
+            self._add(-evicted)
+        else:
+            self._nans -= 1
+        if x == x:
+            self._add(x)
+        else:
+            self._nans += 1
+        self._buffer[self._pos] = x
+        self._pos = (self._pos + 1) % self.window
+
+    @property
+    def value(self) -> float:
+        if self._nans:
+            return _NAN
+        return (self._sum + self._comp) / self.window
+
+    def recompute(self, frame: pd.DataFrame) -> float:
+        series = frame[self.fields[0]].rolling(self.window).mean()
+        return float(series.iloc[-1]) if len(series) else _NAN
+
+
+def _frame_for(store, timeframe: str) -> pd.DataFrame:
+    # The same frames the analyser exposes as df / weekly_df / monthly_df.
+    if timeframe == "daily":
+        return store.daily
+    if timeframe == "weekly":
+        return store.ohlcv("weekly", adjusted=True)
+    if timeframe == "monthly":
+        return store.month_end()
+    raise ValueError(f"Unsupported timeframe: {timeframe}")
+
+
+class IndicatorSet:
+    """Incremental indicators for one symbol and timeframe, kept in step with its bars.
+
+    When the bar store moves to a new data version derived from the one the
+    set last saw, only the bars from the store's first changed period onward
+    are fed: a revised open bar goes through ``replace_last`` and new bars
+    through ``append``.  Anything else (a deep history revision, a skipped
+    version) replays the full history.
+    """
+
+    def __init__(self, timeframe: str):
+        self.timeframe = timeframe
+        self._lock = Lock()
+        self._indicators: dict[tuple, IncrementalIndicator] = {}
+        self._version = None
+        self._consumed = 0
+
+    def latest(self, store, indicator: IncrementalIndicator):
+        """Current value of ``indicator`` (used as a template) on ``store``'s bars."""
+        with self._lock:
+            if self._version is not None and _is_older(store.data_version, self._version):
+                # An analyser holding older data; answer without rewinding the set.
+                return indicator.reset().extend(_frame_for(store, self.timeframe))
+            self._sync(store)
+            current = self._indicators.get(indicator.key)
+            if current is None:
+                current = indicator.reset()
+                current.extend(_frame_for(store, self.timeframe))
+                self._indicators[indicator.key] = current
+            return current.value
+
+    def verify(self, store, rel_tol: float = 1e-9) -> dict[tuple, tuple]:
+        """Compare every incremental value with a full recompute; returns mismatches."""
+        frame = _frame_for(store, self.timeframe)
+        mismatches = {}
+        with self._lock:
+            self._sync(store)
+            for key, indicator in self._indicators.items():
+                expected = indicator.recompute(frame)
+                actual = indicator.value
+                if not _close(actual, expected, rel_tol):
+                    mismatches[key] = (actual, expected)
+        return mismatches
+
+    def _sync(self, store) -> None:
+        if self._version is not None and store.data_version == self._version:
+            return
+        frame = _frame_for(store, self.timeframe)
+        changed = store.changed_since.get(self.timeframe)
+        incremental = (
+            self._consumed > 0
+            and self._version is not None
+            and store.base_version == self._version
+            and len(frame) >= self._consumed
+        )
+        start = len(frame)
+        if incremental and changed is not None:
+            start = int(frame.index.searchsorted(changed, side="left"))
+            incremental = start >= self._consumed - 1
+
+        if not incremental:
+            self._indicators = {
+                key: indicator.reset() for key, indicator in self._indicators.items()
+            }
+            for indicator in self._indicators.values():
+                indicator.extend(frame)
+        elif start < len(frame):
+            for indicator in self._indicators.values():
+                rows = frame[list(indicator.fields)].iloc[start:].to_numpy(dtype=float, na_value=np.nan)
+                first = 0
+                if start == self._consumed - 1:
+                    indicator.replace_last(*rows[0])
+                    first = 1
+                for row in rows[first:]:
+                    indicator.append(*row)
+
+        self._version = store.data_version
+        self._consumed = len(frame)
+
+
+def _is_older(version, other) -> bool:
+    return version is not None and other is not None and version < other
+
+
+def _close(actual, expected, rel_tol: float) -> bool:
+    if isinstance(actual, tuple):
+        return all(_close(a, e, rel_tol) for a, e in zip(actual, expected))
+    if actual != actual and expected != expected:
+        return True
+    return math.isclose(actual, expected, rel_tol=rel_tol, abs_tol=1e-12)
+
+
+__all__ = [
+    "EMA",
+    "IncrementalIndicator",
+    "IndicatorSet",
+    "RollingMean",
+    "SuperTrend",
+    "WilderATR",
+    "WilderRSI",
+]
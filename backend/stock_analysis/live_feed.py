@@ -0,0 +1,383 @@
+"""Live updates of the in-progress bar.
+
+:class:`LiveBarBuilder` keeps each symbol's current session bar in memory,
+built from a stream of :class:`Quote` updates.  The price loader applies it
+to the daily history (see ``StockAnalyser._with_live_session``), so
+analysers and charts see the current bar without downloading intraday data.
+
+Quotes come from a polled provider, chosen with ``LIVE_QUOTE_PROVIDER``:
+``yahoo`` (default) reads Yahoo's session summary, and ``simulated`` random
+walks from the last close for running without a market data feed.
+
+:class:`LiveHub` runs one poller per symbol that has subscribers, however
+many sockets watch it, so upstream calls scale with distinct symbols rather
+than open browser tabs.  Every ``LIVE_POLL_SECONDS`` the poller takes a
+quote, feeds the builder and hands the session bar to each subscriber when
+it changed.  The poller stops when the last subscriber leaves.
+
+A session bar becomes the in-progress bar of any chart timeframe with
+:func:`live_bar`, which merges it with the earlier sessions of the same week
+or month.
+
+Session dates follow each symbol's exchange (:func:`market_for`): a Hong Kong
+quote is dated by the Hong Kong day, crypto by the UTC day, weekends
+included.  Symbols without a known session (futures, FX, metals) get no
+live bars.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+from datetime import time
+from threading import Lock
+from typing import Callable, NamedTuple
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+from .execution import run_blocking
+
+LIVE_POLL_SECONDS = float(os.getenv("LIVE_POLL_SECONDS", "15"))
+LIVE_QUOTE_PROVIDER = os.getenv("LIVE_QUOTE_PROVIDER", "yahoo")
+
+
+class Market(NamedTuple):
+    """Regular trading hours of an exchange, in its local time."""
+    tz: str
+    open: time
+    close: time
+    # Trades every day, around the clock (crypto).
+    continuous: bool = False
+
+
+US_MARKET = Market("America/New_York", time(9, 30), time(16, 0))
+CRYPTO_MARKET = Market("UTC", time(0, 0), time(23, 59, 59, 999999), continuous=True)
+
+# Yahoo ticker suffix -> exchange hours; symbols without a suffix trade in the US.
+MARKETS_BY_SUFFIX = {
+    ".HK": Market("Asia/Hong_Kong", time(9, 30), time(16, 0)),
+    ".SZ": Market("Asia/Shanghai", time(9, 30), time(15, 0)),
+    ".SS": Market("Asia/Shanghai", time(9, 30), time(15, 0)),
+    ".L": Market("Europe/London", time(8, 0), time(16, 30)),
+    ".PA": Market("Europe/Paris", time(9, 0), time(17, 30)),
+    ".AS": Market("Europe/Amsterdam", time(9, 0), time(17, 30)),
+    ".DE": Market("Europe/Berlin", time(9, 0), time(17, 30)),
+    ".ST": Market("Europe/Stockholm", time(9, 0), time(17, 30)),
+    ".TO": Market("America/Toronto", time(9, 30), time(16, 0)),
+    ".NE": Market("America/Toronto", time(9, 30), time(16, 0)),
+    ".AX": Market("Australia/Sydney", time(10, 0), time(16, 0)),
+    ".SA": Market("America/Sao_Paulo", time(10, 0), time(17, 0)),
+}
+MARKETS_BY_INDEX = {
+    "^HSI": MARKETS_BY_SUFFIX[".HK"],
+    "^FTSE": MARKETS_BY_SUFFIX[".L"],
+    "^GDAXI": MARKETS_BY_SUFFIX[".DE"],
+    "^FCHI": MARKETS_BY_SUFFIX[".PA"],
+    "^AXJO": MARKETS_BY_SUFFIX[".AX"],
+    "^GSPTSE": MARKETS_BY_SUFFIX[".TO"],
+    "000001.SS": MARKETS_BY_SUFFIX[".SS"],
+}
+
+# Chart timeframe -> pandas period whose end labels its bars (as in bar_store).
+_PERIODS = {"weekly": "W-FRI", "monthly": "M"}
+
+
+class Quote(NamedTuple):
+    """A price update.
+
+    ``volume`` is the session's cumulative volume when known.  Providers
+    that report the session's open, high and low pass them too, so the bar
+    is right even when polls miss the extremes.
+    """
+    symbol: str
+    time: pd.Timestamp
+    price: float
+    volume: float | None = None
+    open: float | None = None
+    high: float | None = None
+    low: float | None = None
+
+
+class SessionBar(NamedTuple):
+    """OHLCV of one trading session so far, as of the ``updated`` quote time."""
+    date: pd.Timestamp
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+    updated: pd.Timestamp | None = None
+
+    def prices(self) -> tuple:
+        """The bar without its quote time, for telling whether it changed."""
+        return self[:6]
+
+
+def market_for(symbol: str) -> Market | None:
+    """Trading hours of ``symbol``'s exchange, or ``None`` when its session is not known."""
+    symbol = symbol.upper()
+    if symbol in MARKETS_BY_INDEX:
+        return MARKETS_BY_INDEX[symbol]
+    if symbol.endswith("-USD"):
+        return CRYPTO_MARKET
+    if "=" in symbol or symbol.endswith("USD"):
+        # Futures, FX and spot metals trade nearly around the clock on their own calendars.
+        return None
+    if "." in symbol:
+        return MARKETS_BY_SUFFIX.get(symbol[symbol.rindex("."):])
+    return US_MARKET
+
+
+def session_date(when: pd.Timestamp, market: Market = US_MARKET) -> pd.Timestamp:
+    """The (naive, midnight) date of the ``market`` session a quote at ``when`` belongs to.
+
+    Quotes before the open and at weekends belong to the previous weekday's
+    session; continuous markets date quotes by their own day.  Exchange
+    holidays are not known here.
+    """
+    local = when.tz_convert(market.tz) if when.tzinfo else when.tz_localize("UTC").tz_convert(market.tz)
+    day = local.normalize()
+    if market.continuous:
+        return day.tz_localize(None)
+    if local.time() < market.open:
+        day -= pd.Timedelta(days=1)
+    while day.weekday() >= 5:
+        day -= pd.Timedelta(days=1)
+    return day.tz_localize(None)
+
+
+class LiveBarBuilder:
+    """Current session bar per symbol, aggregated from quotes."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._sessions: dict[str, SessionBar] = {}
+
+    def update(self, quote: Quote) -> SessionBar | None:
+        """Fold ``quote`` into its symbol's bar; a quote for a newer session starts a new bar.
+
+        Returns ``None`` for symbols whose session is not known.
+        """
+        market = market_for(quote.symbol)
+        if market is None:
+            return None
+        date = session_date(quote.time, market)
+        with self._lock:
+            current = self._sessions.get(quote.symbol)
+            if current is not None and date < current.date:
+                return current
+            if current is None or date > current.date:
+                current = SessionBar(date, quote.open or quote.price, quote.price, quote.price, quote.price, 0.0)
+            bar = SessionBar(
+                date,
+                current.open,
+                max(current.high, quote.high or quote.price, quote.price),
+                min(current.low, quote.low or quote.price, quote.price),
+                quote.price,
+                quote.volume if quote.volume is not None else current.volume,
+                quote.time,
+            )
+            self._sessions[quote.symbol] = bar
+            return bar
+
+    def session(self, symbol: str) -> SessionBar | None:
+        with self._lock:
+            return self._sessions.get(symbol)
+
+    def discard(self, symbol: str) -> None:
+        """Forget ``symbol``'s bar once nothing keeps it up to date."""
+        with self._lock:
+            self._sessions.pop(symbol, None)
+
+
+live_bars = LiveBarBuilder()
+
+
+def with_session(df: pd.DataFrame, session: SessionBar | None) -> pd.DataFrame:
+    """``df`` with ``session`` as its bar for the session's date.
+
+    Only the newest daily bar is ever replaced, and only by a session quoted
+    after ``df`` was downloaded (``df.attrs["downloaded_at"]``); older
+    history is left alone.  Returns ``df`` itself when there is nothing to
+    apply.
+    """
+    if session is None or df.empty or session.date < df.index[-1]:
+        return df
+    downloaded_at = df.attrs.get("downloaded_at")
+    if downloaded_at is not None and session.updated is not None and session.updated <= downloaded_at:
+        # The download already includes everything this session saw.
+        return df
+    row = pd.DataFrame(
+        {
+            "Open": session.open,
+            "High": session.high,
+            "Low": session.low,
+            "Close": session.close,
+            "Adj Close": session.close,
+            "Volume": session.volume,
+        },
+        index=pd.DatetimeIndex([session.date]).astype(df.index.dtype),
+    )[df.columns]
+    keep = df.iloc[:-1] if session.date == df.index[-1] else df
+    return pd.concat([keep, row])
+
+
+def yahoo_quote(symbol: str) -> Quote | None:
+    """Latest price and session summary from Yahoo; one light request, no intraday bars."""
+    info = yf.Ticker(symbol).fast_info
+    price = info["last_price"]
+    if price is None or not np.isfinite(price):
+        return None
+    return Quote(
+        symbol,
+        pd.Timestamp.now(tz="UTC"),
+        float(price),
+        volume=info["last_volume"],
+        open=info["open"],
+        high=info["day_high"],
+        low=info["day_low"],
+    )
+
+
+class SimulatedQuotes:
+    """Random-walk quotes starting from each symbol's last close."""
+
+    def __init__(self, seed: int = 0, volatility: float = 0.001):
+        self._rng = np.random.default_rng(seed)
+        self._volatility = volatility
+        self._state: dict[str, tuple[float, float]] = {}
+
+    def __call__(self, symbol: str) -> Quote:
+        state = self._state.get(symbol)
+        if state is None:
+            from .stock_analyser import StockAnalyser
+
+            state = (float(StockAnalyser.get_price_data(symbol)["Close"].iloc[-1]), 0.0)
+        price, volume = state
+        price *= float(np.exp(self._rng.normal(0.0, self._volatility)))
+        volume += float(self._rng.integers(100, 10_000))
+        self._state[symbol] = (price, volume)
+        return Quote(symbol, pd.Timestamp.now(tz="UTC"), round(price, 4), volume=volume)
+
+
+def quote_provider(name: str = LIVE_QUOTE_PROVIDER) -> Callable[[str], Quote | None]:
+    if name == "simulated":
+        return SimulatedQuotes()
+    if name == "yahoo":
+        return yahoo_quote
+    raise ValueError(f"Unknown quote provider: {name}")
+
+
+def live_bar(daily: pd.DataFrame, session: SessionBar, timeframe: str) -> dict:
+    """The ``timeframe`` chart bar holding ``session``, as a ``{"live": ...}`` payload.
+
+    Weekly and monthly bars combine the session with the earlier daily bars
+    of their period, labelled like the chart's bars.  ``value`` repeats the
+    close for clients that only draw a price.
+    """
+    label = session.date
+    bar = session._asdict()
+    del bar["date"], bar["updated"]
+    if timeframe in _PERIODS:
+        period = session.date.to_period(_PERIODS[timeframe])
+        label = period.end_time.normalize()
+        start = daily.index.searchsorted(period.start_time, side="left")
+        stop = daily.index.searchsorted(session.date, side="left")
+        prior = daily.iloc[start:stop]
+        if len(prior):
+            bar["open"] = float(prior["Open"].iloc[0])
+            bar["high"] = float(np.nanmax([prior["High"].max(), session.high]))
+            bar["low"] = float(np.nanmin([prior["Low"].min(), session.low]))
+            bar["volume"] = float(prior["Volume"].sum()) + session.volume
+    bar = {field: round(value, 2) for field, value in bar.items()}
+    return {"time": int(label.timestamp()), **bar, "value": bar["close"]}
+
+
+class LiveHub:
+    """Shared per-symbol quote pollers fanning session bars out to subscriber queues."""
+
+    def __init__(
+        self,
+        fetch: Callable[[str], Quote | None] | None = None,
+        interval: float = LIVE_POLL_SECONDS,
+        builder: LiveBarBuilder = live_bars,
+    ):
+        self._fetch = fetch or quote_provider()
+        self._builder = builder
+        self._sinks: list[Callable[[Quote], None]] = []
+        self._interval = interval
+        self._subscribers: dict[str, set[asyncio.Queue]] = {}
+        self._pollers: dict[str, asyncio.Task] = {}
+        self._latest: dict[str, SessionBar] = {}
+        self._polls = 0
+
+    def add_quote_sink(self, sink: Callable[[Quote], None]) -> None:
+        """Also hand every polled quote to ``sink``, before subscribers hear of it."""
+        self._sinks.append(sink)
+
+    def subscribe(self, symbol: str) -> asyncio.Queue:
+        """A queue receiving ``symbol``'s session bar whenever it changes.
+
+        Holds only the newest bar; a slow reader skips intermediate ones.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        self._subscribers.setdefault(symbol, set()).add(queue)
+        if symbol in self._latest:
+            self._offer(queue, self._latest[symbol])
+        if symbol not in self._pollers:
+            self._pollers[symbol] = asyncio.create_task(self._poll(symbol), name=f"live-{symbol}")
+        return queue
+
+    def unsubscribe(self, symbol: str, queue: asyncio.Queue) -> None:
+        """Drop ``queue``; the last one out stops the symbol's poller."""
+        subscribers = self._subscribers.get(symbol)
+        if subscribers is None:
+            return
+        subscribers.discard(queue)
+        if subscribers:
+            return
+        del self._subscribers[symbol]
+        self._latest.pop(symbol, None)
+        # Without a poller the bar goes stale; later downloads must not lose to it.
+        self._builder.discard(symbol)
+        poller = self._pollers.pop(symbol, None)
+        if poller is not None:
+            poller.cancel()
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, bar: SessionBar) -> None:
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(bar)
+
+    async def _poll(self, symbol: str) -> None:
+        while True:
+            try:
+                quote = await run_blocking("live", self._fetch, symbol)
+            except Exception as e:
+                print(f"[live] Poll failed for {symbol}: {e}")
+                quote = None
+            bar = None
+            if quote is not None:
+                bar = self._builder.update(quote)
+                for sink in self._sinks:
+                    sink(quote)
+            self._polls += 1
+            latest = self._latest.get(symbol)
+            if bar is not None and (latest is None or bar.prices() != latest.prices()):
+                self._latest[symbol] = bar
+                for queue in tuple(self._subscribers.get(symbol, ())):
+                    self._offer(queue, bar)
+            await asyncio.sleep(self._interval)
+
+    def stats(self) -> dict:
+        return {
+            "symbols": sorted(self._pollers),
+            "subscribers": sum(len(queues) for queues in self._subscribers.values()),
+            "polls": self._polls,
+            "interval_s": self._interval,
+        }
+
+
+live_hub = LiveHub()
@@ -0,0 +1,308 @@
+"""Rolling 1-minute bars per symbol and the intraday timeframes built from them.
+
+Each symbol keeps its last ``MINUTE_STORE_DAYS`` days of regular-session
+minute bars as parallel numpy arrays.  Sessions follow the symbol's own
+exchange hours (:func:`~stock_analysis.live_feed.market_for`); crypto and
+instruments without known hours keep every minute.  The first intraday
+request for a symbol backfills them with one 1-minute download.  After that,
+the live pollers' quotes (:class:`~stock_analysis.live_feed.Quote`) extend
+them.  A symbol no poller is quoting is topped up instead: once its newest
+minute is more than ``LIVE_POLL_SECONDS`` old, a request downloads the
+minutes since then (at most once per poll interval).  The store keeps the
+``MINUTE_STORE_SYMBOLS`` most recently used symbols.
+
+``hourly`` and ``4h`` bars start at the session open in the exchange's
+timezone (midnight UTC for continuous markets), as on TradingView, and are
+labelled by their first minute in UTC.  They are aggregated incrementally: a
+change to the minute arrays only recomputes the last, still open bar.
+"""
+from __future__ import annotations
+
+import os
+import time
+from collections import OrderedDict
+from threading import Lock
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+from .live_feed import CRYPTO_MARKET, LIVE_POLL_SECONDS, Market, Quote, market_for, session_date
+
+MINUTE_STORE_DAYS = int(os.getenv("MINUTE_STORE_DAYS", "7"))
+MINUTE_STORE_SYMBOLS = int(os.getenv("MINUTE_STORE_SYMBOLS", "200"))
+BACKFILL_RETRY_SECONDS = 300
+
+# Intraday chart timeframe -> bar length in minutes, counted from the session open.
+INTRADAY_TIMEFRAMES = {"hourly": 60, "4h": 240}
+
+_FIELDS = ("open", "high", "low", "close", "volume")
+
+
+def minute_market(symbol: str) -> Market:
+    """Session hours used for ``symbol``'s minute bars; unknown hours count as continuous."""
+    return market_for(symbol) or CRYPTO_MARKET
+
+
+def _minute_of_day(value) -> int:
+    return value.hour * 60 + value.minute
+
+
+def _local_minutes(times: np.ndarray, market: Market) -> pd.DatetimeIndex:
+    return pd.to_datetime(times, unit="s", utc=True).tz_convert(market.tz)
+
+
+def _regular_session(times: np.ndarray, market: Market) -> np.ndarray:
+    """Mask of minute start times inside ``market``'s regular session."""
+    if market.continuous:
+        return np.ones(len(times), dtype=bool)
+    local = _local_minutes(times, market)
+    minutes = local.hour * 60 + local.minute
+    return np.asarray((minutes >= _minute_of_day(market.open)) & (minutes < _minute_of_day(market.close)))
+
+
+def bucket_labels(times: np.ndarray, minutes: int, market: Market) -> np.ndarray:
+    """Start time (epoch seconds) of the ``minutes``-long session bar holding each minute."""
+    local = _local_minutes(times, market)
+    opens = local.normalize() + pd.Timedelta(minutes=_minute_of_day(market.open))
+    span = pd.Timedelta(minutes=minutes)
+    labels = opens + ((local - opens) // span) * span
+    return labels.asi8 // 10**9
+
+
+def _aggregate(times: np.ndarray, columns: dict[str, np.ndarray], minutes: int, market: Market):
+    """``(labels, bars, first-minute positions)`` of the bars covering ``times``."""
+    labels = bucket_labels(times, minutes, market)
+    starts = np.flatnonzero(np.r_[True, labels[1:] != labels[:-1]])
+    ends = np.r_[starts[1:], len(times)] - 1
+    bars = {
+        "open": columns["open"][starts],
+        "high": np.maximum.reduceat(columns["high"], starts),
+        "low": np.minimum.reduceat(columns["low"], starts),
+        "close": columns["close"][ends],
+        "volume": np.add.reduceat(columns["volume"], starts),
+    }
+    return labels[starts], bars, starts
+
+
+class _Aggregate:
+    """Bars of one intraday timeframe and the minute position where the last one starts."""
+
+    def __init__(self, labels: np.ndarray, bars: dict[str, np.ndarray], last_start: int, revision: int):
+        self.labels = labels
+        self.bars = bars
+        self.last_start = last_start
+        self.revision = revision
+        self.frame: pd.DataFrame | None = None
+
+
+class _MinuteSeries:
+    def __init__(self, market: Market):
+        self.market = market
+        self.times = np.empty(0, dtype=np.int64)
+        self.columns = {field: np.empty(0) for field in _FIELDS}
+        self.backfilled_at: float | None = None
+        # Wall-clock time of the last live quote; recent ones mean a poller covers the symbol.
+        self.quoted_at: float | None = None
+        self.session_volume: tuple[pd.Timestamp, float] | None = None
+        self.revision = 0
+        # Cleared whenever minute positions move; quotes only change the last minute.
+        self.aggregates: dict[str, _Aggregate] = {}
+
+
+class MinuteBarStore:
+    """Rolling regular-session 1-minute bars per symbol."""
+
+    def __init__(self, days: int = MINUTE_STORE_DAYS, max_symbols: int = MINUTE_STORE_SYMBOLS,
+                 poll_seconds: float = LIVE_POLL_SECONDS):
+        self.days = days
+        self.max_symbols = max_symbols
+        self.poll_seconds = poll_seconds
+        self._lock = Lock()
+        self._series: OrderedDict[str, _MinuteSeries] = OrderedDict()
+        self._backfill_locks: dict[str, Lock] = {}
+
+    def _get(self, symbol: str) -> _MinuteSeries:
+        series = self._series.get(symbol)
+        if series is None:
+            series = self._series[symbol] = _MinuteSeries(minute_market(symbol))
+            while len(self._series) > self.max_symbols:
+                evicted, _ = self._series.popitem(last=False)
+                self._backfill_locks.pop(evicted, None)
+        else:
+            self._series.move_to_end(symbol)
+        return series
+
+    def _trim(self, series: _MinuteSeries) -> None:
+        if not len(series.times):
+            return
+        cutoff = series.times[-1] - self.days * 86400
+        keep = int(np.searchsorted(series.times, cutoff, side="left"))
+        if keep:
+            series.times = series.times[keep:]
+            series.columns = {field: values[keep:] for field, values in series.columns.items()}
+            # Positions moved; the next read aggregates from scratch.
+            series.aggregates.clear()
+
+    def add_quote(self, quote: Quote) -> None:
+        """Fold a live quote into its minute bar; quotes outside the regular session are ignored."""
+        minute = int(quote.time.timestamp()) // 60 * 60
+        with self._lock:
+            series = self._get(quote.symbol)
+            series.quoted_at = time.time()
+            if not _regular_session(np.array([minute]), series.market)[0]:
+                return
+            session = session_date(quote.time, series.market)
+            volume = 0.0
+            if quote.volume is not None:
+                # Quotes carry the session's cumulative volume; a minute gets the increase.
+                previous = series.session_volume
+                if previous is not None and previous[0] == session:
+                    volume = max(quote.volume - previous[1], 0.0)
+                series.session_volume = (session, quote.volume)
+            times, columns = series.times, series.columns
+            if len(times) and minute < times[-1]:
+                return
+            if len(times) and minute == times[-1]:
+                columns["high"][-1] = max(columns["high"][-1], quote.price)
+                columns["low"][-1] = min(columns["low"][-1], quote.price)
+                columns["close"][-1] = quote.price
+                columns["volume"][-1] += volume
+            else:
+                series.times = np.append(times, minute)
+                row = {"open": quote.price, "high": quote.price, "low": quote.price,
+                       "close": quote.price, "volume": volume}
+                series.columns = {field: np.append(columns[field], row[field]) for field in _FIELDS}
+            series.revision += 1
+            self._trim(series)
+
+    def _download(self, symbol: str, start: int | None = None):
+        """Regular-session minutes of the last ``self.days`` days, or from ``start`` (epoch seconds) on."""
+        if start is None:
+            intraday = yf.Ticker(symbol).history(period=f"{self.days}d", interval="1m", prepost=False)
+        else:
+            intraday = yf.Ticker(symbol).history(
+                start=pd.Timestamp(start, unit="s", tz="UTC"), interval="1m", prepost=False
+            )
+        if intraday.empty:
+            return np.empty(0, dtype=np.int64), {field: np.empty(0) for field in _FIELDS}
+        times = intraday.index.tz_convert("UTC").asi8 // 10**9 // 60 * 60
+        mask = _regular_session(times, minute_market(symbol))
+        columns = {
+            field: intraday[field.capitalize()].to_numpy(dtype=float, na_value=np.nan)[mask]
+            for field in _FIELDS
+        }
+        columns["volume"] = np.nan_to_num(columns["volume"])
+        return times[mask], columns
+
+    def _stale(self, series: _MinuteSeries, now: float) -> bool:
+        """Whether ``series`` has fallen behind with no live poller quoting it."""
+        if series.quoted_at is not None and now - series.quoted_at < 2 * self.poll_seconds:
+            return False
+        # A minute bar is complete a minute after its start.
+        return (now - series.backfilled_at >= self.poll_seconds
+                and now - (series.times[-1] + 60) >= self.poll_seconds)
+
+    def _ensure_backfilled(self, symbol: str) -> None:
+        with self._lock:
+            series = self._get(symbol)
+            lock = self._backfill_locks.setdefault(symbol, Lock())
+        with lock:
+            now = time.time()
+            if series.backfilled_at is not None and len(series.times):
+                if self._stale(series, now):
+                    self._top_up(symbol, series, now)
+                return
+            if series.backfilled_at is not None and now - series.backfilled_at < BACKFILL_RETRY_SECONDS:
+                return
+            try:
+                times, columns = self._download(symbol)
+            except Exception as e:
+                print(f"[minutes] Backfill failed for {symbol}: {e}")
+                times, columns = np.empty(0, dtype=np.int64), {field: np.empty(0) for field in _FIELDS}
+            with self._lock:
+                series.backfilled_at = now
+                if len(series.times):
+                    # Minutes already built from live quotes win over the download.
+                    keep = times < series.times[0]
+                    times = times[keep]
+                    columns = {field: values[keep] for field, values in columns.items()}
+                    columns = {field: np.concatenate([columns[field], series.columns[field]]) for field in _FIELDS}
+                    times = np.concatenate([times, series.times])
+                series.times, series.columns = times, columns
+                series.aggregates.clear()
+                series.revision += 1
+                self._trim(series)
+
+    def _top_up(self, symbol: str, series: _MinuteSeries, now: float) -> None:
+        """Download the minutes from ``series``'s newest one on; the download replaces that minute."""
+        last = int(series.times[-1])
+        try:
+            times, columns = self._download(symbol, start=last)
+        except Exception as e:
+            print(f"[minutes] Top-up failed for {symbol}: {e}")
+            times, columns = np.empty(0, dtype=np.int64), {field: np.empty(0) for field in _FIELDS}
+        with self._lock:
+            series.backfilled_at = now
+            fresh = times >= last
+            if not fresh.any():
+                return
+            times = times[fresh]
+            columns = {field: values[fresh] for field, values in columns.items()}
+            keep = int(np.searchsorted(series.times, times[0], side="left"))
+            series.times = np.concatenate([series.times[:keep], times])
+            series.columns = {field: np.concatenate([series.columns[field][:keep], columns[field]]) for field in _FIELDS}
+            # The download's volume is not a session total; the next quote starts counting afresh.
+            series.session_volume = None
+            series.aggregates.clear()
+            series.revision += 1
+            self._trim(series)
+
+    def _aggregate(self, series: _MinuteSeries, timeframe: str) -> _Aggregate:
+        minutes = INTRADAY_TIMEFRAMES[timeframe]
+        cached = series.aggregates.get(timeframe)
+        if cached is not None and cached.revision == series.revision:
+            return cached
+        if cached is None or not len(cached.labels):
+            start, kept = 0, 0
+        else:
+            # Only the last bar can have changed: redo it and anything after.
+            start, kept = cached.last_start, len(cached.labels) - 1
+        if start < len(series.times):
+            tail = {field: values[start:] for field, values in series.columns.items()}
+            labels, bars, starts = _aggregate(series.times[start:], tail, minutes, series.market)
+            last_start = start + int(starts[-1])
+        else:
+            labels, bars, last_start = np.empty(0, dtype=np.int64), {f: np.empty(0) for f in _FIELDS}, 0
+        if kept:
+            labels = np.concatenate([cached.labels[:kept], labels])
+            bars = {field: np.concatenate([cached.bars[field][:kept], bars[field]]) for field in _FIELDS}
+        aggregate = _Aggregate(labels, bars, last_start, series.revision)
+        series.aggregates[timeframe] = aggregate
+        return aggregate
+
+    def ohlcv(self, symbol: str, timeframe: str) -> pd.DataFrame:
+        """``timeframe`` bars as an OHLCV frame indexed by (naive UTC) bar start."""
+        self._ensure_backfilled(symbol)
+        with self._lock:
+            aggregate = self._aggregate(self._get(symbol), timeframe)
+            if aggregate.frame is None:
+                frame = pd.DataFrame(
+                    {field.capitalize(): values for field, values in aggregate.bars.items()},
+                    index=pd.to_datetime(aggregate.labels, unit="s"),
+                )
+                frame.insert(4, "Adj Close", frame["Close"])
+                aggregate.frame = frame
+            return aggregate.frame
+
+    def latest_bar(self, symbol: str, timeframe: str) -> dict | None:
+        """The open ``timeframe`` bar in the live ``{"time", OHLCV, "value"}`` shape."""
+        frame = self.ohlcv(symbol, timeframe)
+        if frame.empty:
+            return None
+        last = frame.iloc[-1]
+        bar = {field: round(float(last[field.capitalize()]), 2) for field in _FIELDS}
+        return {"time": int(frame.index[-1].timestamp()), **bar, "value": bar["close"]}
+
+
+minute_bars = MinuteBarStore()
@@ -0,0 +1,386 @@
+"""Cross-sectional (dates × symbols) price panels for list-level tables.
+
+A :class:`PricePanel` holds one timeframe of a whole list's prices as aligned
+NumPy matrices, so moving averages, MACE classes, 40-week status, 20DMA flags,
+SMA distances and MACE scores are computed for every symbol at once instead
+of symbol by symbol.
+
+Calendar alignment: the date axis is the union of every symbol's dates, so a
+list mixing exchanges (different holidays) and crypto (weekends) lines up
+without forward-filling.  Indicators are never computed across the union
+calendar directly; :meth:`PricePanel.last_rows` first compacts each column to
+its own bars, right-aligned, so a 20-day MA is still the last 20 sessions of
+that symbol.  Column-wise pandas rolling on the compacted matrix gives the
+same numbers as the per-symbol analyser methods.
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+
+import numpy as np
+import pandas as pd
+
+from aliases import SYMBOL_ALIASES
+from .stock_analyser import StockAnalyser
+from .utils import sigmoid
+
+_IN_PROGRESS = "in progress"
+_MACE_RANKS = ("U1", "U2", "U3", "D1", "D2", "D3")
+_WEEKLY_LOOKBACK_DAYS = 600  # same window as StockAnalyser._last_days in mace()/forty_week_status()
+_MIN_WEEKLY_ROWS = 30
+
+_PANEL_CACHE_SIZE = 8
+_panel_cache_lock = Lock()
+_panel_cache: "OrderedDict[tuple, PricePanel]" = OrderedDict()
+
+
+def _safe(value):
+    """Scalar equivalent of ``utils.safe_value`` for a single matrix cell."""
+    if isinstance(value, str):
+        return value
+    if value is None or value != value:
+        return _IN_PROGRESS
+    return round(float(value), 2)
+
+
+class PricePanel:
+    def __init__(
+        self,
+        dates: pd.DatetimeIndex,
+        symbols: list[str],
+        fields: dict[str, np.ndarray],
+        present: np.ndarray,
+    ):
+        self.dates = dates
+        self.symbols = symbols
+        self.fields = fields
+        self.present = present
+        self._compacted: dict[tuple, tuple[dict[str, np.ndarray], np.ndarray]] = {}
+
+    @classmethod
+    def from_frames(cls, frames: dict[str, pd.DataFrame], fields: tuple[str, ...]) -> "PricePanel":
+        symbols = list(frames)
+        if not symbols:
+            return cls(pd.DatetimeIndex([]), [], {f: np.empty((0, 0)) for f in fields}, np.empty((0, 0), bool))
+
+        dates = pd.DatetimeIndex(np.unique(np.concatenate([f.index.values for f in frames.values()])))
+        present = np.zeros((len(dates), len(symbols)), dtype=bool)
+        matrices = {f: np.full((len(dates), len(symbols)), np.nan) for f in fields}
+        for j, frame in enumerate(frames.values()):
+            rows = dates.get_indexer(frame.index)
+            present[rows, j] = True
+            for field in fields:
+                matrices[field][rows, j] = frame[field].to_numpy(dtype=float, na_value=np.nan)
+        return cls(dates, symbols, matrices, present)
+
+    def last_rows(self, *, since_days: int | None = None) -> tuple[dict[str, np.ndarray], np.ndarray]:
+        """Each column's own bars, right-aligned, with NaN padding above.
+
+        With ``since_days`` only bars within that many days of the column's
+        latest bar are kept, like ``StockAnalyser._last_days``.  Returns the
+        compacted matrices per field and the number of bars per column.
+        """
+        key = (since_days,)
+        cached = self._compacted.get(key)
+        if cached is not None:
+            return cached
+
+        mask = self.present
+        if since_days is not None and mask.size:
+            stamps = self.dates.values.astype("datetime64[ns]").view("i8")
+            last = np.where(mask, stamps[:, None], np.iinfo("i8").min).max(axis=0)
+            cutoff = last - pd.Timedelta(days=since_days).value
+            mask = mask & (stamps[:, None] >= cutoff[None, :])
+
+        counts = mask.sum(axis=0)
+        depth = int(counts.max()) if counts.size else 0
+        # A stable sort on the mask moves each column's bars to the bottom in order.
+        order = np.argsort(mask, axis=0, kind="stable")[len(self.dates) - depth:]
+        compacted = {
+            field: np.take_along_axis(np.where(mask, values, np.nan), order, axis=0)
+            for field, values in self.fields.items()
+        }
+        self._compacted[key] = (compacted, counts)
+        return compacted, counts
+
+
+def _rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    # Column-wise pandas rolling uses the same kernel as Series.rolling.
+    return pd.DataFrame(values).rolling(window).mean().to_numpy()
+
+
+def _shift(values: np.ndarray, periods: int = 1) -> np.ndarray:
+    out = np.full_like(values, np.nan)
+    if periods < len(values):
+        out[periods:] = values[: len(values) - periods]
+    return out
+
+
+def _at(values: np.ndarray, counts: np.ndarray, index: int) -> np.ndarray:
+    """Value ``index`` rows from the end of each column (NaN past its history)."""
+    if len(values) < abs(index):
+        return np.full(values.shape[1], np.nan)
+    row = values[index].astype(float)
+    return np.where(counts >= abs(index), row, np.nan)
+
+
+def _classify_mace(s: np.ndarray, m: np.ndarray, l: np.ndarray) -> np.ndarray:
+    """Vectorized ``utils.classify_mace_signal`` for one row of every column."""
+    valid = ~(np.isnan(s) | np.isnan(m) | np.isnan(l))
+    out = np.full(s.shape, _IN_PROGRESS, dtype=object)
+    out[valid] = "Unclassified"
+    conditions = (
+        (l > s) & (s > m),
+        (s > l) & (l > m),
+        (s > m) & (m > l),
+        (m > s) & (s > l),
+        (m > l) & (l > s),
+        (l > m) & (m > s),
+    )
+    # Later labels win, as in the sequential assignments of the original.
+    for label, cond in zip(_MACE_RANKS, conditions):
+        out[cond & valid] = label
+    return out
+
+
+def _classify_40w(close: np.ndarray, ma_40: np.ndarray, slope: np.ndarray) -> np.ndarray:
+    """Vectorized ``utils.classify_40w_status`` for one row of every column."""
+    valid = ~(np.isnan(close) | np.isnan(ma_40) | np.isnan(slope))
+    out = np.full(close.shape, _IN_PROGRESS, dtype=object)
+    out[(close > ma_40) & (slope > 0) & valid] = "Above Rising MA ++"
+    out[(close > ma_40) & (slope <= 0) & valid] = "Above Falling MA +-"
+    out[(close <= ma_40) & (slope > 0) & valid] = "Below Rising MA -+"
+    out[(close <= ma_40) & (slope <= 0) & valid] = "Below Falling MA --"
+    return out
+
+
+def _wilder_atr(tr: np.ndarray, counts: np.ndarray, period: int) -> np.ndarray:
+    """``utils.compute_wilder_atr`` for every right-aligned column at once."""
+    depth, width = tr.shape
+    atr = np.full(tr.shape, np.nan)
+    starts = depth - counts
+    seeded = counts >= period
+    for j in np.flatnonzero(seeded):
+        start = starts[j]
+        atr[start + period - 1, j] = pd.Series(tr[start:start + period, j]).mean()
+    current = np.full(width, np.nan)
+    for r in range(depth):
+        live = seeded & (r >= starts + period)
+        current = np.where(live, (current * (period - 1) + tr[r]) / period, current)
+        seed_row = seeded & (r == starts + period - 1)
+        current = np.where(seed_row, atr[r], current)
+        atr[r] = np.where(live | seed_row, current, np.nan)
+    return atr
+
+
+def _mace_score_base(close, high, low, counts, atr_len=14, a=0.90, b=0.30, epsilon=1e-9) -> np.ndarray:
+    """``score_base`` of ``utils.compute_mace_spectrum_metrics`` for every column."""
+    s = _rolling_mean(close, 4)
+    m = _rolling_mean(close, 13)
+    l = _rolling_mean(close, 26)
+
+    prev_close = _shift(close)
+    true_range = np.fmax(np.fmax(high - low, np.abs(high - prev_close)), np.abs(low - prev_close))
+    atr = _wilder_atr(true_range, counts, atr_len)
+    atr = np.where(atr != 0, atr, epsilon)
+
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        x_sm = (s - m) / atr
+        x_sl = (s - l) / atr
+        x_ml = (m - l) / atr
+
+        p_sm = sigmoid(x_sm / a)
+        p_sl = sigmoid(x_sl / a)
+        p_ml = sigmoid(x_ml / a)
+
+        g = ((s - _shift(s)) / atr + (m - _shift(m)) / atr + (l - _shift(l)) / atr) / 3
+        strength_slope = sigmoid(g / b)
+
+        w_u3 = p_sm * p_ml * strength_slope
+        w_u2 = p_sl * (1 - p_ml) * strength_slope
+        w_u1 = (1 - p_sl) * p_sm * strength_slope
+        w_d1 = (1 - p_sm) * p_sl * (1 - strength_slope)
+        w_d2 = p_ml * (1 - p_sl) * (1 - strength_slope)
+        w_d3 = (1 - p_ml) * (1 - p_sm) * (1 - strength_slope)
+
+        sum_w = w_u3 + w_u2 + w_u1 + w_d1 + w_d2 + w_d3
+        fallback = sum_w == 0
+
+        def share(w, fill):
+            return np.where(~fallback, w / sum_w, fill)
+
+        return (
+            1.0 * share(w_u3, 0.0)
+            + 0.8 * share(w_u2, 0.0)
+            + 0.6 * share(w_u1, 0.0)
+            + 0.4 * share(w_d1, 0.0)
+            + 0.2 * share(w_d2, 0.0)
+            + 0.0 * share(w_d3, 1.0)
+        )
+
+
+def _resolve(symbol: str) -> str:
+    raw_symbol = symbol.upper().strip()
+    return SYMBOL_ALIASES.get(raw_symbol, raw_symbol)
+
+
+def _load_store(symbol: str):
+    return StockAnalyser.get_bar_store(_resolve(symbol))
+
+
+def _timeframe_frame(store, timeframe: str) -> pd.DataFrame:
+    # The same frames StockAnalyser exposes as df / weekly_df.
+    if timeframe == "daily":
+        return store.daily
+    return store.ohlcv("weekly", adjusted=True)
+
+
+def load_panels(
+    symbols: list[str], timeframes: tuple[str, ...] = ("daily", "weekly")
+) -> tuple[dict[str, PricePanel], dict[str, Exception]]:
+    """Load aligned panels for ``symbols``; returns ``(panels, errors by symbol)``.
+
+    Columns are named by the symbols as given.  Prices come from the shared
+    bar stores, fetched in parallel, and built panels are cached per data
+    version of every member.
+    """
+    stores = {}
+    errors: dict[str, Exception] = {}
+    unique = list(dict.fromkeys(symbols))
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = {symbol: executor.submit(_load_store, symbol) for symbol in unique}
+        for symbol, future in futures.items():
+            try:
+                stores[symbol] = future.result()
+            except Exception as exc:
+                errors[symbol] = exc
+
+    versions = tuple((symbol, store.data_version) for symbol, store in stores.items())
+    panels = {}
+    for timeframe in timeframes:
+        key = (timeframe, versions)
+        with _panel_cache_lock:
+            panel = _panel_cache.get(key)
+            if panel is not None:
+                _panel_cache.move_to_end(key)
+        if panel is None:
+            fields = ("Close",) if timeframe == "daily" else ("High", "Low", "Close")
+            frames = {symbol: _timeframe_frame(store, timeframe) for symbol, store in stores.items()}
+            panel = PricePanel.from_frames(frames, fields)
+            with _panel_cache_lock:
+                _panel_cache[key] = panel
+                while len(_panel_cache) > _PANEL_CACHE_SIZE:
+                    _panel_cache.popitem(last=False)
+        panels[timeframe] = panel
+    return panels, errors
+
+
+def price_vs_20dma(daily: PricePanel) -> dict[str, tuple]:
+    """Latest close and 20DMA per symbol, as ``get_current_price``/``calculate_20dma`` report them."""
+    compacted, counts = daily.last_rows()
+    close = compacted["Close"]
+    ma_20 = _rolling_mean(close, 20)
+    price_now = _at(close, counts, -1)
+    dma20 = _at(ma_20, counts, -1)
+    return {
+        symbol: (_safe(price_now[j]), _safe(dma20[j]))
+        for j, symbol in enumerate(daily.symbols)
+    }
+
+
+def weekly_trend_status(weekly: PricePanel) -> dict[str, dict[str, tuple]]:
+    """MACE class and 40-week status (current, one week ago) per symbol.
+
+    Matches ``StockAnalyser.mace()`` and ``forty_week_status()``.
+    """
+    compacted, counts = weekly.last_rows(since_days=_WEEKLY_LOOKBACK_DAYS)
+    close = compacted["Close"]
+    s = _rolling_mean(close, 4)
+    m = _rolling_mean(close, 13)
+    l = _rolling_mean(close, 26)
+    ma_40 = _rolling_mean(close, 40)
+    slope = ma_40 - _shift(ma_40)
+
+    mace = {}
+    forty = {}
+    for label, index in (("current", -1), ("previous", -2)):
+        mace[label] = _classify_mace(_at(s, counts, index), _at(m, counts, index), _at(l, counts, index))
+        forty[label] = _classify_40w(
+            _at(close, counts, index), _at(ma_40, counts, index), _at(slope, counts, index)
+        )
+
+    result = {}
+    for j, symbol in enumerate(weekly.symbols):
+        if counts[j] < _MIN_WEEKLY_ROWS:
+            result[symbol] = {"mace": (_IN_PROGRESS, _IN_PROGRESS), "forty_week": (_IN_PROGRESS, _IN_PROGRESS)}
+            continue
+        result[symbol] = {
+            "mace": (mace["current"][j], mace["previous"][j]),
+            "forty_week": (forty["current"][j], forty["previous"][j]),
+        }
+    return result
+
+
+def sma_distances(panel: PricePanel, offset: int, windows: tuple[int, ...] = (12, 36)) -> dict[str, dict]:
+    """Latest and ``offset``-bars-ago close and SMA per window, per symbol.
+
+    Values are ``(price, sma)`` pairs with ``None`` where the history is too
+    short or a value is missing, as ``main._distance_at_index`` treats them.
+    """
+    compacted, counts = panel.last_rows()
+    close = compacted["Close"]
+    result = {symbol: {} for symbol in panel.symbols}
+    for window in windows:
+        sma = _rolling_mean(close, window)
+        for label, index in (("now", -1), ("prev", -1 - offset)):
+            price_at = _at(close, counts, index)
+            sma_at = _at(sma, counts, index)
+            for j, symbol in enumerate(panel.symbols):
+                if counts[j] <= abs(index) or np.isnan(price_at[j]) or np.isnan(sma_at[j]):
+                    result[symbol][(window, label)] = None
+                else:
+                    result[symbol][(window, label)] = (float(price_at[j]), float(sma_at[j]))
+    return result
+
+
+def mace_scores(weekly: PricePanel, window: int = 5) -> dict[str, dict]:
+    """``mace_score()`` and ``mace_score_recent_change()`` for every symbol."""
+    compacted, counts = weekly.last_rows(since_days=_WEEKLY_LOOKBACK_DAYS)
+    score = _mace_score_base(compacted["Close"], compacted["High"], compacted["Low"], counts)
+    current = _at(score, counts, -1)
+    three_weeks_ago = _at(score, counts, -4)
+
+    result = {}
+    for j, symbol in enumerate(weekly.symbols):
+        if counts[j] < _MIN_WEEKLY_ROWS:
+            result[symbol] = {
+                "current": _IN_PROGRESS,
+                "twentyone_days_ago": _IN_PROGRESS,
+                "recent_weighted_change": None,
+            }
+            continue
+        column = score[len(score) - counts[j]:, j]
+        recent_values = column[~np.isnan(column)][-window:]
+        recent_change = None
+        if len(recent_values) >= 2:
+            deltas = np.diff(recent_values)
+            weights = np.arange(1, len(deltas) + 1)
+            recent_change = float(np.average(deltas, weights=weights))
+        result[symbol] = {
+            "current": _safe(current[j]),
+            "twentyone_days_ago": _safe(three_weeks_ago[j]),
+            "recent_weighted_change": recent_change,
+        }
+    return result
+
+
+__all__ = [
+    "PricePanel",
+    "load_panels",
+    "mace_scores",
+    "price_vs_20dma",
+    "sma_distances",
+    "weekly_trend_status",
+]
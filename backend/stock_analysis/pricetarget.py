@@ -90,20 +90,19 @@ def calculate_fibonacci_volatility_target(df: pd.DataFrame, fib_ratios: list[flo
         "latest_price": round(latest_price, 2)
     }
 
-    # ATR breakout confirmation
-    df['TR'] = df[['High', 'Low', 'Close']].apply(
+    # ATR breakout confirmation (local series: ``df`` is the shared analyser frame)
+    true_range = df[['High', 'Low', 'Close']].apply(
         lambda row: max(row['High'] - row['Low'],
                         abs(row['High'] - row['Close']),
                         abs(row['Low'] - row['Close'])), axis=1)
-    atr = df['TR'].rolling(window=14).mean().dropna()
+    atr = true_range.rolling(window=14).mean().dropna()
     if len(atr) < 20:
         return {"fib_volatility_target": "in progress"}
     breakout = atr.iloc[-1] > atr[-20:].mean()
     targets['atr_breakout_confirmed'] = bool(breakout)
 
     # RSI trend confirmation
-    df['RSI'] = compute_wilder_rsi(df['Close'], period=14)
-    rsi_trend = df['RSI'].iloc[-1]
+    rsi_trend = compute_wilder_rsi(df['Close'], period=14).iloc[-1]
     rsi_confirm = rsi_trend > 50 if direction == "up" else rsi_trend < 50
     targets['rsi_trend_confirmed'] = bool(rsi_confirm)
 
@@ -0,0 +1,267 @@
+"""HTTP response cache for GET endpoints that are pure functions of their data.
+
+Overlay, signal and chart responses depend only on the route, its
+parameters and the symbol's price data, yet every page load recomputed and
+re-serialized them.  :class:`ResponseCacheMiddleware` keeps the serialized
+bytes of such responses, keyed by route template, path and query parameters,
+the negotiated representation (JSON or packed) and a data version supplied
+by the app.
+
+Every cached response carries an ``ETag`` derived from that key, so a
+request whose ``If-None-Match`` still matches is answered with ``304`` as
+soon as the data version is known, before any analysis runs.  Data versions
+restart with the process, so ETags are salted per process.
+
+Entries also keep each compressed variant once it has been produced, so a
+hit for a client accepting ``gzip``, ``br`` or ``zstd`` sends stored bytes
+instead of compressing the body again.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import secrets
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Hashable, Iterable
+from urllib.parse import parse_qsl
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from .chart_payload import accepts_packed
+from .compression import add_vary, compressible, encoded_body, negotiate
+from .execution import run_blocking
+
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# Clients keep responses but revalidate each use; a 304 costs no analysis.
+RESPONSE_CACHE_CONTROL = os.getenv("RESPONSE_CACHE_CONTROL", "no-cache")
+
+_ETAG_SALT = secrets.token_hex(8)
+# Headers of the original response replayed on cache hits.
+_REPLAYED_HEADERS = ("content-type",)
+
+
+def _route_pattern(template: str) -> re.Pattern:
+    """``/api/signals_{timeframe}/{symbol}`` -> regex with a named group per parameter."""
+    parts = re.split(r"\{(\w+)\}", template)
+    pattern = "".join(
+        re.escape(part) if i % 2 == 0 else f"(?P<{part}>[^/]+)" for i, part in enumerate(parts)
+    )
+    return re.compile(f"^{pattern}$")
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        # Weak comparison, as If-None-Match calls for.
+        if candidate == "*" or candidate.removeprefix("W/") == etag.removeprefix("W/"):
+            return True
+    return False
+
+
+class CachedResponse:
+    """Serialized body, its compressed variants and the replayed headers of a ``200`` response."""
+
+    __slots__ = ("etag", "headers", "body", "encoded")
+
+    def __init__(self, etag: str, headers: list[tuple[bytes, bytes]], body: bytes):
+        self.etag = etag
+        self.headers = headers
+        self.body = body
+        self.encoded: dict[str, bytes] = {}
+
+    @property
+    def content_type(self) -> str | None:
+        return dict(self.headers).get(b"content-type", b"").decode() or None
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(data) for data in self.encoded.values())
+
+
+class ResponseCache:
+    """Byte-bounded LRU of :class:`CachedResponse` entries."""
+
+    def __init__(self, max_bytes: int = RESPONSE_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._lock = Lock()
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._bytes = 0
+        self._counts = {
+            "hits": 0, "misses": 0, "not_modified": 0, "stored": 0, "evicted": 0, "compressed": 0,
+        }
+
+    def count(self, event: str) -> None:
+        with self._lock:
+            self._counts[event] += 1
+
+    def get(self, etag: str) -> CachedResponse | None:
+        with self._lock:
+            entry = self._entries.get(etag)
+            if entry is not None:
+                self._entries.move_to_end(etag)
+            return entry
+
+    def put(self, entry: CachedResponse) -> None:
+        # One response may not crowd out most of the cache.
+        if entry.size > self.max_bytes // 4:
+            return
+        with self._lock:
+            previous = self._entries.pop(entry.etag, None)
+            if previous is not None:
+                self._bytes -= previous.size
+            self._entries[entry.etag] = entry
+            self._bytes += entry.size
+            self._counts["stored"] += 1
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self._counts["evicted"] += 1
+
+    def add_variant(self, entry: CachedResponse, encoding: str, data: bytes) -> None:
+        """Keep ``entry``'s body compressed with ``encoding`` for later hits."""
+        with self._lock:
+            if encoding in entry.encoded:
+                return
+            entry.encoded[encoding] = data
+            if self._entries.get(entry.etag) is entry:
+                self._bytes += len(data)
+            self._counts["compressed"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._counts,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+response_cache = ResponseCache()
+
+
+class ResponseCacheMiddleware:
+    """Serve cached bytes and ``304`` revalidations for the given GET routes.
+
+    ``routes`` are path templates as declared on the app.  ``version`` gets
+    the matched template and the request's path and query parameters, and
+    returns the data version the response depends on, or ``None`` when the
+    response must not be cached.  It runs on the blocking pool, since the
+    first lookup for a symbol may load its prices.  If it raises (say, for an
+    unknown symbol) the request goes to the route uncached, which answers
+    with its own error response.
+    """
+
+    def __init__(
+        self,
+        app,
+        routes: Iterable[str],
+        version: Callable[[str, dict[str, str]], Hashable | None],
+        cache: ResponseCache = response_cache,
+    ):
+        self.app = app
+        self.routes = [(template, _route_pattern(template)) for template in routes]
+        self.version = version
+        self.cache = cache
+
+    def _match(self, path: str) -> tuple[str, dict[str, str]] | None:
+        for template, pattern in self.routes:
+            match = pattern.match(path)
+            if match:
+                return template, match.groupdict()
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            return await self.app(scope, receive, send)
+        matched = self._match(scope["path"])
+        if matched is None:
+            return await self.app(scope, receive, send)
+
+        template, path_params = matched
+        query = sorted(parse_qsl(scope.get("query_string", b"").decode("latin-1"), keep_blank_values=True))
+        try:
+            version = await run_blocking("chart", self.version, template, {**dict(query), **path_params})
+        except Exception:
+            version = None
+        if version is None:
+            return await self.app(scope, receive, send)
+
+        request_headers = Headers(scope=scope)
+        packed = accepts_packed(request_headers.get("accept"))
+        key = repr((_ETAG_SALT, template, sorted(path_params.items()), query, packed, version))
+        # Weak: one validator for every content-encoding of the same body.
+        etag = 'W/"' + hashlib.blake2b(key.encode(), digest_size=12).hexdigest() + '"'
+        cache_headers = [
+            (b"etag", etag.encode()),
+            (b"cache-control", RESPONSE_CACHE_CONTROL.encode()),
+            (b"vary", b"Accept"),
+        ]
+
+        encoding = negotiate(request_headers.get("accept-encoding"))
+
+        if _etag_matches(request_headers.get("if-none-match"), etag):
+            self.cache.count("not_modified")
+            await send({"type": "http.response.start", "status": 304, "headers": cache_headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        entry = self.cache.get(etag)
+        if entry is not None:
+            self.cache.count("hits")
+            await self._send_cached(entry, encoding, cache_headers, send)
+            return
+
+        self.cache.count("misses")
+        await self._run_and_store(scope, receive, send, etag, encoding, cache_headers)
+
+    async def _send_cached(self, entry: CachedResponse, encoding: str | None, cache_headers: list, send) -> None:
+        headers = MutableHeaders(raw=[*entry.headers, *cache_headers])
+        body = entry.body
+        if compressible(entry.content_type, len(body)):
+            add_vary(headers, "Accept-Encoding")
+            if encoding is not None:
+                body = entry.encoded.get(encoding)
+                if body is None:
+                    body = await encoded_body(entry.body, encoding)
+                    self.cache.add_variant(entry, encoding, body)
+                headers["content-encoding"] = encoding
+        headers["content-length"] = str(len(body))
+        await send({"type": "http.response.start", "status": 200, "headers": headers.raw})
+        await send({"type": "http.response.body", "body": body})
+
+    async def _run_and_store(
+        self, scope, receive, send, etag: str, encoding: str | None, cache_headers: list
+    ) -> None:
+        # 200 responses are held until complete, then sent like a hit.
+        state = {"start": None, "body": []}
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                if message["status"] == 200 and "content-encoding" not in Headers(raw=message["headers"]):
+                    state["start"] = message
+                    return
+            elif message["type"] == "http.response.body" and state["start"] is not None:
+                state["body"].append(message.get("body", b""))
+                if message.get("more_body", False):
+                    return
+                headers = [
+                    (name, value)
+                    for name, value in state["start"]["headers"]
+                    if name.decode().lower() in _REPLAYED_HEADERS
+                ]
+                entry = CachedResponse(etag, headers, b"".join(state["body"]))
+                self.cache.put(entry)
+                return await self._send_cached(entry, encoding, cache_headers, send)
+            await send(message)
+
+        await self.app(scope, receive, capture)
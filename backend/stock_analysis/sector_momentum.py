@@ -12,13 +12,15 @@ import numpy as np
 import pandas as pd
 import requests
 
-from .stock_analyser import StockAnalyser
+from .stock_analyser import StockAnalyser, _today_key_tzaware
 
 FMP_API_KEY = os.getenv("FMP_API_KEY")
 _FMP_PEERS_URL = "https://financialmodelingprep.com/api/v4/stock_peers"
 _PEERS_BULK_PATH = Path(__file__).resolve().parent.parent / "peers_bulk.json"
 _PORTFOLIO_STORE_PATH = Path(__file__).resolve().parent.parent / "portfolio_store.json"
 _MAX_PEERS = 15
+# day -> symbols whose price history failed to load that day; retried the next day
+_unavailable_peers: dict[str, set[str]] = {}
 
 
 def _sanitize_symbol(symbol: str) -> str:
@@ -62,20 +64,43 @@ def _peer_returns(peers: list[str] | None, periods: tuple[int, ...]) -> dict[int
         dict.fromkeys([p for p in cleaned_peers if p][:_MAX_PEERS])
     )
 
-    return _peer_returns_cached(unique_peers, tuple(periods))
+    return _peer_returns_cached(unique_peers, _peer_versions(unique_peers), tuple(periods))
+
+
+def _peer_versions(peers: tuple[str, ...]) -> tuple[int | None, ...]:
+    """Current price-data version of each peer (``None`` when it cannot be loaded)."""
+    day = _today_key_tzaware()
+    for earlier in [key for key in _unavailable_peers if key != day]:
+        _unavailable_peers.pop(earlier, None)
+    unavailable = _unavailable_peers.setdefault(day, set())
+    versions = []
+    for peer in peers:
+        if peer in unavailable:
+            versions.append(None)
+            continue
+        try:
+            versions.append(StockAnalyser.get_price_data_version(peer))
+        except Exception:
+            unavailable.add(peer)
+            versions.append(None)
+    return tuple(versions)
 
 
 @lru_cache(maxsize=512)
 def _peer_returns_cached(
-    peers_key: tuple[str, ...], periods: tuple[int, ...]
+    peers_key: tuple[str, ...],
+    versions_key: tuple[int | None, ...],
+    periods: tuple[int, ...],
 ) -> dict[int, list[float]]:
-    """Cached peer return calculation keyed by peer set and requested periods."""
+    """Cached peer return calculation keyed by peer set, peer data versions and periods."""
 
     returns_by_period: dict[int, list[float]] = {period: [] for period in periods}
     if not peers_key:
         return returns_by_period
 
-    for peer in peers_key:
+    for peer, version in zip(peers_key, versions_key):
+        if version is None:
+            continue
         try:
             peer_closes = StockAnalyser.get_price_data(peer)["Close"]
         except Exception:
@@ -0,0 +1,156 @@
+"""Coalescing of identical concurrent calls.
+
+When several analysts open the same ticker, or React fires an effect twice,
+identical requests arrive together and each ran the full computation.
+A :class:`SingleFlight` lets the first caller for a key run the work while
+later callers with the same key wait for it and get the same result (or
+the same exception).  Nothing is kept once the call finishes; caching stays
+the job of the caches.
+
+:func:`single_flight` applies this to a function, analyser method or
+endpoint, keyed by its normalized arguments.  Endpoints keep their
+signature, so FastAPI still sees their parameters.
+"""
+from __future__ import annotations
+
+import asyncio
+import inspect
+from functools import wraps
+from threading import Event, Lock
+from typing import Callable, Hashable
+
+from pydantic import BaseModel
+from starlette.requests import Request
+
+from .chart_payload import accepts_packed
+
+_flights_lock = Lock()
+_flights: dict[str, "SingleFlight"] = {}
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = Event()
+        self.result = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """In-flight calls by key; callers of a key already running share its outcome."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = Lock()
+        self._calls: dict[Hashable, _Call] = {}
+        self._tasks: dict[Hashable, asyncio.Future] = {}
+        self._counts = {"calls": 0, "coalesced": 0}
+        with _flights_lock:
+            _flights[name] = self
+
+    def _count(self, coalesced: bool) -> None:
+        with self._lock:
+            self._counts["calls"] += 1
+            self._counts["coalesced"] += coalesced
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs):
+        """``fn(*args, **kwargs)``, or the result of the same-keyed call already running."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            self._counts["calls"] += 1
+            self._counts["coalesced"] += not leader
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    async def do_async(self, key: Hashable, fn: Callable, *args, **kwargs):
+        """Coroutine counterpart of :meth:`do`, for callers on one event loop."""
+        task = self._tasks.get(key)
+        self._count(coalesced=task is not None)
+        if task is None:
+            task = self._tasks[key] = asyncio.ensure_future(fn(*args, **kwargs))
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        # A caller that goes away must not cancel the work the others wait for.
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._counts, "in_flight": len(self._calls) + len(self._tasks)}
+
+
+def _normalize(value) -> Hashable:
+    """A hashable stand-in for an argument; equal requests give equal keys."""
+    if isinstance(value, Request):
+        # Only content negotiation changes what an endpoint returns.
+        return accepts_packed(value.headers.get("accept"))
+    if isinstance(value, BaseModel):
+        return value.model_dump_json()
+    if isinstance(value, dict):
+        return tuple(sorted((k, _normalize(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = tuple(_normalize(v) for v in value)
+        return tuple(sorted(items, key=repr)) if isinstance(value, (set, frozenset)) else items
+    return value
+
+
+def single_flight(fn: Callable | None = None, *, key: Callable[..., Hashable] | None = None):
+    """Coalesce concurrent calls of ``fn`` with equal arguments.
+
+    ``key`` maps the call's arguments to its key; by default every bound
+    argument counts, with requests reduced to their ``Accept`` variant and
+    models to their JSON.  Works on plain and ``async`` functions.
+    """
+
+    def decorate(fn: Callable) -> Callable:
+        flight = SingleFlight(fn.__qualname__)
+        signature = inspect.signature(fn)
+
+        def make_key(args, kwargs) -> Hashable:
+            if key is not None:
+                return key(*args, **kwargs)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return tuple((name, _normalize(value)) for name, value in bound.arguments.items())
+
+        if inspect.iscoroutinefunction(fn):
+            @wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                return await flight.do_async(make_key(args, kwargs), fn, *args, **kwargs)
+
+            return async_wrapper
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            return flight.do(make_key(args, kwargs), fn, *args, **kwargs)
+
+        return wrapper
+
+    return decorate(fn) if fn is not None else decorate
+
+
+def single_flight_stats() -> dict[str, dict]:
+    """Calls and coalesced calls per single-flight group."""
+    with _flights_lock:
+        flights = sorted(_flights.items())
+    return {name: flight.stats() for name, flight in flights}
+
+
+__all__ = ["SingleFlight", "single_flight", "single_flight_stats"]
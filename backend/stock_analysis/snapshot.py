@@ -0,0 +1,197 @@
+"""Materialized snapshots of list-level analytics.
+
+A snapshot is a JSON document of precomputed endpoint responses, written by
+the nightly batch job (``nightly_snapshot.py``) as
+``SNAPSHOT_DIR/snapshot-<version>.json``.  ``SNAPSHOT_DIR/LATEST`` names the
+current one and is replaced atomically, so readers never see a partial file.
+
+Each entry records the list files it was computed from, and when and with
+what content it read each symbol's prices.  An entry is served only while
+the snapshot is newer than the most recent scheduled run time, those files
+are unchanged and this process holds no newer prices for those symbols (from
+``refresh_prices`` or a live session bar); otherwise the endpoint computes
+live.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+from datetime import datetime, time, timedelta, timezone
+from pathlib import Path
+from typing import Any, Iterable
+
+import pandas as pd
+
+from .stock_analyser import StockAnalyser
+
+SNAPSHOT_FORMAT = 2
+SNAPSHOT_DIR = Path(os.getenv("SNAPSHOT_DIR", "snapshots"))
+SNAPSHOT_KEEP = 7
+# Daily run time in UTC; after the US close in both EST and EDT.
+SNAPSHOT_RUN_AT_UTC = os.getenv("SNAPSHOT_RUN_AT_UTC", "22:30")
+
+_latest_lock = threading.Lock()
+_latest: tuple[tuple | None, "Snapshot | None"] = (None, None)
+# Off in the batch job's workers, which must compute every entry live.
+_serving = True
+
+
+def snapshot_key(endpoint: str, **params) -> str:
+    """Entry key for ``endpoint`` called with ``params``, e.g. ``/sma_momentum?list_type=portfolio&timeframe=daily``."""
+    if not params:
+        return endpoint
+    query = "&".join(f"{name}={params[name]}" for name in sorted(params))
+    return f"{endpoint}?{query}"
+
+
+def source_fingerprint(path: str | Path) -> list | None:
+    """Cheap change marker for a list file: ``[mtime_ns, size]``, or None if missing."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def price_inputs(symbols: Iterable[str]) -> dict[str, list]:
+    """``{symbol: [as_of, content marker]}`` of the loaded prices of ``symbols``, as stored per entry."""
+    inputs = {}
+    for symbol in sorted(symbols):
+        state = StockAnalyser.price_state(symbol)
+        if state is not None:
+            as_of, marker = state
+            inputs[symbol] = [None if as_of is None else as_of.isoformat(), marker]
+    return inputs
+
+
+def _prices_superseded(symbol: str, as_of: str | None, marker: str) -> bool:
+    """Whether this process holds newer, different prices for ``symbol`` than an entry read."""
+    state = StockAnalyser.price_state(symbol)
+    if state is None or state[1] == marker:
+        return False
+    current_as_of = state[0]
+    return current_as_of is None or as_of is None or current_as_of > pd.Timestamp(as_of)
+
+
+def run_time_utc() -> time:
+    hours, minutes = SNAPSHOT_RUN_AT_UTC.split(":")
+    return time(int(hours), int(minutes), tzinfo=timezone.utc)
+
+
+def last_scheduled_run(now: datetime | None = None) -> datetime:
+    """Most recent scheduled run time at or before ``now``."""
+    now = now or datetime.now(timezone.utc)
+    scheduled = datetime.combine(now.date(), run_time_utc())
+    if scheduled > now:
+        scheduled -= timedelta(days=1)
+    return scheduled
+
+
+def next_scheduled_run(now: datetime | None = None) -> datetime:
+    return last_scheduled_run(now) + timedelta(days=1)
+
+
+class Snapshot:
+    def __init__(self, version: str, created_at: datetime, sources: dict, entries: dict):
+        self.version = version
+        self.created_at = created_at
+        self.sources = sources
+        self.entries = entries
+
+    @classmethod
+    def from_json(cls, data: dict) -> "Snapshot":
+        if data.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError(f"Unsupported snapshot format: {data.get('format')}")
+        return cls(
+            data["version"],
+            datetime.fromisoformat(data["created_at"]),
+            data["sources"],
+            data["entries"],
+        )
+
+    def is_stale(self, now: datetime | None = None) -> bool:
+        return self.created_at < last_scheduled_run(now)
+
+    def get(self, key: str) -> Any | None:
+        """The stored response for ``key``, or None if missing or stale."""
+        entry = self.entries.get(key)
+        if entry is None or self.is_stale():
+            return None
+        for source in entry["depends"]:
+            if source_fingerprint(source) != self.sources.get(source):
+                return None
+        # Checked against prices already loaded, so a lookup never downloads.
+        for symbol, (as_of, marker) in entry["prices"].items():
+            if _prices_superseded(symbol, as_of, marker):
+                return None
+        return entry["value"]
+
+
+def write_snapshot(entries: dict[str, dict], sources: dict[str, list | None], created_at: datetime) -> Path:
+    """Write a new snapshot and point ``LATEST`` at it; returns its path.
+
+    ``entries`` maps keys to ``{"depends": [source, ...], "prices": {...},
+    "value": ...}``, with ``prices`` from :func:`price_inputs`;
+    ``sources`` holds the fingerprints of the list files taken before the
+    entries were computed.
+    """
+    version = created_at.strftime("%Y%m%dT%H%M%SZ")
+    SNAPSHOT_DIR.mkdir(parents=True, exist_ok=True)
+    path = SNAPSHOT_DIR / f"snapshot-{version}.json"
+    document = {
+        "format": SNAPSHOT_FORMAT,
+        "version": version,
+        "created_at": created_at.isoformat(),
+        "sources": sources,
+        "entries": entries,
+    }
+    tmp = path.with_suffix(".json.tmp")
+    with open(tmp, "w") as f:
+        json.dump(document, f)
+    os.replace(tmp, path)
+
+    pointer_tmp = SNAPSHOT_DIR / "LATEST.tmp"
+    pointer_tmp.write_text(path.name)
+    os.replace(pointer_tmp, SNAPSHOT_DIR / "LATEST")
+
+    for old in sorted(SNAPSHOT_DIR.glob("snapshot-*.json"))[:-SNAPSHOT_KEEP]:
+        old.unlink(missing_ok=True)
+    return path
+
+
+def latest_snapshot() -> Snapshot | None:
+    """The snapshot ``LATEST`` points to, re-read only when the pointer changes."""
+    global _latest
+    pointer = SNAPSHOT_DIR / "LATEST"
+    marker = source_fingerprint(pointer)
+    if marker is None:
+        return None
+    marker = tuple(marker)
+    with _latest_lock:
+        if _latest[0] == marker:
+            return _latest[1]
+    try:
+        with open(SNAPSHOT_DIR / pointer.read_text().strip(), "r") as f:
+            snapshot = Snapshot.from_json(json.load(f))
+    except (OSError, ValueError, KeyError) as e:
+        print(f"[snapshot] Failed to load latest snapshot: {e}")
+        snapshot = None
+    with _latest_lock:
+        _latest = (marker, snapshot)
+    return snapshot
+
+
+def set_serving(enabled: bool) -> None:
+    global _serving
+    _serving = enabled
+
+
+def snapshot_value(key: str) -> Any | None:
+    """Fresh snapshot value for ``key``, or None when the caller should compute live."""
+    if not _serving:
+        return None
+    snapshot = latest_snapshot()
+    if snapshot is None:
+        return None
+    return snapshot.get(key)
@@ -1,7 +1,8 @@
 from datetime import datetime, timedelta, timezone
-import copy
 import os
 import json
+import hashlib
+from contextlib import contextmanager
 from pathlib import Path
 import requests
 import yfinance as yf
@@ -10,6 +11,7 @@ import numpy as np
 from fastapi import HTTPException
 from functools import lru_cache
 from functools import cached_property
+from typing import NamedTuple
 from .models import TimeSeriesMetric
 from aliases import SYMBOL_ALIASES
 from .utils import (
@@ -31,36 +33,137 @@ from .utils import (
     classify_bbwp_percentile,
     wilder_smooth,
     reindex_indicator,
+    align_asof,
+    asof_positions,
+    session_close_index,
 )
 from .pricetarget import get_price_targets, calculate_mean_reversion_50dma_target
-from threading import Event, Lock
+from .analysis_cache import cached_analysis
+from .bar_store import BarStore
+from .indicator_state import IncrementalIndicator, IndicatorSet
+from .live_feed import live_bars, with_session
+from .minute_store import INTRADAY_TIMEFRAMES, minute_bars
+from .single_flight import SingleFlight
+from collections import OrderedDict
+from itertools import count
+from threading import Lock
 
 _price_data_lock = Lock()
-_signal_cache_lock = Lock()
-_price_data_inflight_lock = Lock()
-_price_data_inflight: dict[tuple[str, str], Event] = {}
+_price_data_generation_lock = Lock()
+# Concurrent loads of one (symbol, day, generation) share a single download.
+_price_data_loads = SingleFlight("price_data")
+_price_data_versions = count(1)
+_price_data_version_lock = Lock()
+# symbol -> (content fingerprint, data version, as-of time) of the most recently loaded frame
+_price_data_fingerprints: dict[str, tuple[tuple, int, pd.Timestamp | None]] = {}
+# Symbols whose prices were read while ``StockAnalyser.recording_price_reads`` is active
+_price_reads: set[str] | None = None
+# symbol -> reload generation, bumped by ``StockAnalyser.refresh_price_data``
+_price_data_generations: dict[str, int] = {}
+
+# Index the Mansfield relative strength is measured against.
+MANSFIELD_BENCHMARK = "^GSPC"
+
+# symbol -> bar store of its most recently loaded price frame, least recently used first.
+# Sized (like the price cache) to hold a whole watchlist/buylist at once.
+_BAR_STORE_SIZE = 512
+_bar_store_lock = Lock()
+_bar_stores: "OrderedDict[str, BarStore]" = OrderedDict()
+# (symbol, timeframe) -> incremental indicators fed from that symbol's bar store
+_indicator_sets: dict[tuple[str, str], IndicatorSet] = {}
+
+# symbol -> (downloaded frame's data version, live session, frame with that session applied)
+_live_frames_lock = Lock()
+_live_frames: dict[str, tuple] = {}
+
+# (symbol, data version) -> shared analyser, least recently used first
+_ANALYSER_REGISTRY_SIZE = 256
+_analyser_registry_lock = Lock()
+_analyser_registry: "OrderedDict[tuple[str, int | None], StockAnalyser]" = OrderedDict()
 
 MIN_HISTORY_POINTS = 5
 
-_signal_cache: dict[tuple[str, str, str, str], list[dict]] = {}
-_status_cache: dict[tuple[str, str, str, str], dict] = {}
-
-
-def _signal_cache_key(strategy: str, symbol: str, timeframe: str | None) -> tuple[str, str, str, str]:
-    return (strategy, symbol.upper(), timeframe or "default", _today_key_tzaware())
-
-
-def _get_cached_value(cache: dict, key: tuple[str, str, str, str]):
-    with _signal_cache_lock:
-        value = cache.get(key)
-    if value is None:
-        return None
-    return copy.deepcopy(value)
 
+class SignalMarker(NamedTuple):
+    """A single buy/sell marker produced by a strategy."""
+    time: int
+    price: float
+    side: str
+    label: str
+
+
+# Strategies return an immutable tuple of markers so cached results can be
+# shared between callers without copying.
+Markers = tuple[SignalMarker, ...]
+
+
+def serialize_markers(markers: Markers) -> list[dict]:
+    """Return markers in the ``{time, price, side, label}`` JSON shape."""
+    return [marker._asdict() for marker in markers]
+
+
+class OverlayGroup(NamedTuple):
+    """Overlay series computed together by one ``StockAnalyser`` method."""
+    method: str
+    series: tuple[str, ...]
+    pane: str
+    uses_timeframe: bool = False
+
+
+# Groups in ``get_overlay_lines`` output order.  Asking for any series of a
+# group computes the whole group, which is how dependencies such as the RSI
+# bands needing the RSI are resolved.
+OVERLAY_GROUPS: dict[str, OverlayGroup] = {
+    "price_line": OverlayGroup("get_price_line", ("price_line",), "price"),
+    "bollinger": OverlayGroup(
+        "get_bollinger_band", ("bb_upper", "bb_middle", "bb_lower"), "price", uses_timeframe=True
+    ),
+    "three_year_ma": OverlayGroup("get_3year_ma_series", ("three_year_ma",), "chart_1"),
+    "dma_200": OverlayGroup("get_200dma_series", ("dma_200",), "chart_2"),
+    "ichimoku": OverlayGroup(
+        "get_ichimoku_lines",
+        ("ichimoku_tenkan", "ichimoku_kijun", "ichimoku_span_a", "ichimoku_span_b"),
+        "chart_2",
+    ),
+    "supertrend": OverlayGroup("get_supertrend_lines", ("supertrend_up", "supertrend_down"), "chart_2"),
+    "mace": OverlayGroup("get_mace_series", ("mace_4w", "mace_13w", "mace_26w"), "chart_3"),
+    "forty_week_ma": OverlayGroup("get_40_week_ma_series", ("forty_week_ma",), "chart_3"),
+    "dma_50": OverlayGroup("get_50dma_series", ("dma_50",), "chart_4"),
+    "dma_150": OverlayGroup("get_150dma_series", ("dma_150",), "chart_4"),
+    "dma_90": OverlayGroup("get_90dma_series", ("dma_90",), "chart_4"),
+    "momentum_90": OverlayGroup("get_momentum_90_series", ("momentum_90",), "chart_4"),
+    "mansfield_rs": OverlayGroup("get_mansfield_rs_series", ("mansfield_rs",), "mansfield"),
+    "rsi": OverlayGroup(
+        "get_rsi_lines",
+        ("rsi", "rsi_ma_14", "rsi_upper_band", "rsi_middle_band", "rsi_lower_band"),
+        "rsi",
+        uses_timeframe=True,
+    ),
+    "volatility": OverlayGroup(
+        "get_volatility_bbwp", ("volatility", "volatility_ma_5"), "volatility", uses_timeframe=True
+    ),
+    "mean_reversion": OverlayGroup("get_mean_reversion_deviation_lines", ("mean_rev_50dma",), "mean_reversion"),
+}
+
+# series name -> group name
+OVERLAY_SERIES: dict[str, str] = {
+    name: group for group, spec in OVERLAY_GROUPS.items() for name in spec.series
+}
+
+
+def overlay_registry() -> list[dict]:
+    """Every overlay series with its group and pane, for clients to discover."""
+    return [
+        {
+            "name": name,
+            "group": group,
+            "pane": spec.pane,
+            "uses_timeframe": spec.uses_timeframe,
+        }
+        for group, spec in OVERLAY_GROUPS.items()
+        for name in spec.series
+    ]
 
-def _store_cached_value(cache: dict, key: tuple[str, str, str, str], value):
-    with _signal_cache_lock:
-        cache[key] = copy.deepcopy(value)
 
 def _download_from_fmp(symbol: str) -> pd.DataFrame:
     """Fetch historical price data from Financial Modeling Prep, matching yfinance format."""
@@ -158,7 +261,9 @@ class StockAnalyser:
     def __init__(self, symbol: str):
         raw_symbol = symbol.upper().strip()
         self.symbol = SYMBOL_ALIASES.get(raw_symbol, raw_symbol)
-        self.df = StockAnalyser.get_price_data(self.symbol)
+        self.bars = StockAnalyser.get_bar_store(self.symbol)
+        self.df = self.bars.daily.copy()
+        self.data_version = self.bars.data_version
     
     @staticmethod
     def _last_days(df: pd.DataFrame, days: int) -> pd.DataFrame:
@@ -177,10 +282,48 @@ class StockAnalyser:
             raise HTTPException(status_code=400, detail="Stock symbol not found or data unavailable.")
         return df
 
+    @staticmethod
+    def _frame_fingerprint(df: pd.DataFrame) -> tuple:
+        """Cheap content identity for a price frame: length, span and last bar."""
+        if df.empty:
+            return (0,)
+        last_bar = df.iloc[-1].to_numpy(dtype=float, na_value=np.nan).tobytes()
+        return (len(df), df.index[0], df.index[-1], last_bar)
+
+    @staticmethod
+    def _assign_data_version(symbol: str, df: pd.DataFrame, as_of: pd.Timestamp | None = None) -> int:
+        """Stamp ``df`` with a data version that only changes with its content.
+
+        Reloading identical data (a new calendar day before the next bar, or a
+        mid-day refresh with no new prints) keeps the previous version, so
+        signal, status and response caches stay warm.  Any change to the last
+        bar or the history length gets a fresh, strictly larger version.
+        ``as_of`` is when the content was current: the download time, or the
+        live bar's last quote.
+        """
+        fingerprint = StockAnalyser._frame_fingerprint(df)
+        with _price_data_version_lock:
+            known = _price_data_fingerprints.get(symbol)
+            if known is not None and known[0] == fingerprint:
+                version = known[1]
+            else:
+                version = next(_price_data_versions)
+            _price_data_fingerprints[symbol] = (fingerprint, version, as_of)
+        df.attrs["data_version"] = version
+        return version
+
+    @staticmethod
+    @lru_cache(maxsize=_BAR_STORE_SIZE)
+    def _get_price_data_cached_inner(symbol: str, asof_day: str, generation: int = 0) -> pd.DataFrame:
+        df = StockAnalyser._download_price_history(symbol)
+        df.attrs["downloaded_at"] = pd.Timestamp.now(tz="UTC")
+        StockAnalyser._assign_data_version(symbol, df, df.attrs["downloaded_at"])
+        StockAnalyser._store_bars(symbol, df)
+        return df
+
     # >>> REPLACE THE ENTIRE _get_price_data_cached WITH THIS
     @staticmethod
-    @lru_cache(maxsize=100)
-    def _get_price_data_cached_inner(symbol: str, asof_day: str) -> pd.DataFrame:
+    def _download_price_history(symbol: str) -> pd.DataFrame:
         with _price_data_lock:
             # 1) Base history (no repair)
             base = yf.download(symbol, period="12y", interval="1d", auto_adjust=False, threads=True)
@@ -219,34 +362,8 @@ class StockAnalyser:
             else:
                 df = base
 
-            # 3.5) Fallback: patch the last few sessions from INTRADAY if daily feed lags
-            try:
-                t = yf.Ticker(symbol)
-                intraday = t.history(period="7d", interval="1m", prepost=False, repair=True)
-                if not intraday.empty:
-                    # Align day boundaries to US/Eastern incl. DST
-                    intraday = intraday.tz_convert("America/New_York").between_time("09:30", "16:00")
-                    intraday_daily = intraday.resample("1D").agg({
-                        "Open":  "first",
-                        "High":  "max",
-                        "Low":   "min",
-                        "Close": "last",
-                        "Volume":"sum"
-                    }).dropna(subset=["Close"])
-                    # make the index date-like (no tz, no time)
-                    intraday_daily.index = intraday_daily.index.tz_localize(None)
-
-                    # Only keep very recent days to avoid overwriting older history
-                    # (e.g., last 7 calendar days)
-                    cutoff = pd.Timestamp.today().normalize() - pd.Timedelta(days=7)
-                    intraday_daily = intraday_daily[intraday_daily.index >= cutoff]
-
-                    # Merge: fill missing rows (e.g., 2025-09-16) or empty columns
-                    df = df.combine_first(intraday_daily).sort_index()
-            except Exception:
-                # Non-fatal: if intraday fetch fails, just return df as-is
-                pass
-
+            # 3.5) The session in progress comes from the live bar builder, applied
+            #      on read (``_with_live_session``), not from intraday downloads.
 
             # 4) Final tidy (don’t over-eagerly drop rows just on 'Close')
             df = df.sort_index()
@@ -271,53 +388,195 @@ class StockAnalyser:
 
     @staticmethod
     def _get_price_data_cached(symbol: str, asof_day: str) -> pd.DataFrame:
-        key = (symbol, asof_day)
-        with _price_data_inflight_lock:
-            event = _price_data_inflight.get(key)
-            if event is None:
-                event = Event()
-                _price_data_inflight[key] = event
-                is_owner = True
-            else:
-                is_owner = False
+        df = StockAnalyser._get_downloaded_price_data(symbol, asof_day)
+        return StockAnalyser._with_live_session(symbol, df)
 
-        if not is_owner:
-            event.wait()
-            return StockAnalyser._get_price_data_cached_inner(symbol, asof_day)
+    @staticmethod
+    def _get_downloaded_price_data(symbol: str, asof_day: str) -> pd.DataFrame:
+        if _price_reads is not None:
+            _price_reads.add(symbol)
+        generation = _price_data_generations.get(symbol, 0)
+        return _price_data_loads.do(
+            (symbol, asof_day, generation),
+            StockAnalyser._get_price_data_cached_inner,
+            symbol,
+            asof_day,
+            generation,
+        )
 
-        try:
-            return StockAnalyser._get_price_data_cached_inner(symbol, asof_day)
-        finally:
-            event.set()
-            with _price_data_inflight_lock:
-                _price_data_inflight.pop(key, None)
 
+    @staticmethod
+    def _with_live_session(symbol: str, df: pd.DataFrame) -> pd.DataFrame:
+        """``df`` with the symbol's live session bar as its newest bar, if there is one.
+
+        The patched frame is kept until the download or the session's prices
+        change, and gets its own data version, so analysers follow the live
+        bar.  Sessions quoted before the download are ignored.
+        """
+        session = live_bars.session(symbol)
+        if session is None:
+            return df
+        with _live_frames_lock:
+            known = _live_frames.get(symbol)
+        if known is not None and known[0] is df and known[1] == session.prices():
+            return known[2]
+        patched = with_session(df, session)
+        if patched is df:
+            return df
+        StockAnalyser._assign_data_version(symbol, patched, session.updated)
+        with _live_frames_lock:
+            _live_frames[symbol] = (df, session.prices(), patched)
+        return patched
 
     @staticmethod
     def get_price_data(symbol: str) -> pd.DataFrame:
         """Return a copy of cached price data for the given symbol, refreshed daily."""
         return StockAnalyser._get_price_data_cached(symbol, _today_key_tzaware()).copy()
+
+    @staticmethod
+    def get_price_data_version(symbol: str) -> int | None:
+        """Return the data version of the cached frame for ``symbol``, loading it if needed."""
+        df = StockAnalyser._get_price_data_cached(symbol, _today_key_tzaware())
+        return df.attrs.get("data_version")
+
+    @staticmethod
+    def price_state(symbol: str) -> tuple[pd.Timestamp | None, str] | None:
+        """``(as_of, content marker)`` of the prices last loaded for ``symbol``, without loading.
+
+        The marker is a digest of the frame fingerprint, so equal content
+        gives equal markers in every process; snapshots compare it to tell
+        whether the prices they were computed from have been superseded.
+        None when this process has not loaded the symbol.
+        """
+        with _price_data_version_lock:
+            known = _price_data_fingerprints.get(symbol)
+        if known is None:
+            return None
+        fingerprint, _, as_of = known
+        return as_of, hashlib.blake2b(repr(fingerprint).encode(), digest_size=8).hexdigest()
+
+    @staticmethod
+    @contextmanager
+    def recording_price_reads():
+        """Collect the symbols whose prices are read inside the block, from any thread.
+
+        Process-wide, so only for one task at a time, as in the snapshot job's
+        workers.
+        """
+        global _price_reads
+        _price_reads = reads = set()
+        try:
+            yield reads
+        finally:
+            _price_reads = None
+
+    @staticmethod
+    def get_history_version(symbol: str) -> int | None:
+        """Data version of the downloaded history, ignoring the live session bar."""
+        df = StockAnalyser._get_downloaded_price_data(symbol, _today_key_tzaware())
+        return df.attrs.get("data_version")
+
+    @staticmethod
+    def _store_bars(symbol: str, df: pd.DataFrame) -> BarStore:
+        """Install the bar store for a freshly loaded frame, updating the previous one."""
+        version = df.attrs.get("data_version")
+        with _bar_store_lock:
+            previous = _bar_stores.get(symbol)
+        if previous is not None and previous.data_version == version:
+            store = previous
+        elif previous is not None:
+            store = previous.update(df, version)
+        else:
+            store = BarStore(df, version)
+
+        with _bar_store_lock:
+            current = _bar_stores.get(symbol)
+            if current is not None and (current.data_version or 0) > (version or 0):
+                store = current
+            _bar_stores[symbol] = store
+            _bar_stores.move_to_end(symbol)
+            while len(_bar_stores) > _BAR_STORE_SIZE:
+                evicted, _ = _bar_stores.popitem(last=False)
+                for timeframe in ("daily", "weekly", "monthly"):
+                    _indicator_sets.pop((evicted, timeframe), None)
+        return store
+
+    @staticmethod
+    def get_bar_store(symbol: str) -> BarStore:
+        """Return the daily/weekly/monthly bars for the symbol's current price data."""
+        df = StockAnalyser._get_price_data_cached(symbol, _today_key_tzaware())
+        with _bar_store_lock:
+            store = _bar_stores.get(symbol)
+        if store is not None and store.data_version == df.attrs.get("data_version"):
+            return store
+        return StockAnalyser._store_bars(symbol, df)
+
+    @staticmethod
+    def get_indicator_set(symbol: str, timeframe: str = "daily") -> IndicatorSet:
+        """Return the incremental indicator set kept alongside the symbol's bars."""
+        with _bar_store_lock:
+            indicators = _indicator_sets.get((symbol, timeframe))
+            if indicators is None:
+                indicators = _indicator_sets[(symbol, timeframe)] = IndicatorSet(timeframe)
+        return indicators
+
+    @staticmethod
+    def refresh_price_data(symbol: str) -> int | None:
+        """Re-download ``symbol`` now instead of waiting for the next day.
+
+        Returns the resulting data version, which is unchanged when the
+        provider had nothing new.
+        """
+        with _price_data_generation_lock:
+            _price_data_generations[symbol] = _price_data_generations.get(symbol, 0) + 1
+        return StockAnalyser.get_price_data_version(symbol)
     
     
+    def latest_indicator(self, indicator: IncrementalIndicator, timeframe: str = "daily"):
+        """Current value of an incremental indicator (e.g. ``WilderRSI(14)``) on this symbol's bars.
+
+        Indicator state persists with the price store, so after a price
+        refresh only the new or revised bars are fed instead of the full history.
+        """
+        indicators = StockAnalyser.get_indicator_set(self.symbol, timeframe)
+        return indicators.latest(self.bars, indicator)
+
     @cached_property
     def weekly_df(self) -> pd.DataFrame:
-        df = self.df.copy()
-        # Use "Adj Close" for resampling if it exists
-        if "Adj Close" in df.columns:
-            df["Close"] = df["Adj Close"]
-        return df.resample("W-FRI").agg({
-            "Open": "first",
-            "High": "max",
-            "Low": "min",
-            "Close": "last",
-            "Volume": "sum" if "Volume" in df.columns else "first"
-        }).dropna()
+        # Weekly bars use "Adj Close" as Close when it exists
+        return self.bars.ohlcv("weekly", adjusted=True)
 
 
     @cached_property
     def monthly_df(self) -> pd.DataFrame:
-        return self.df.resample("ME").last().dropna()
-    
+        return self.bars.month_end()
+
+    def intraday_df(self, timeframe: str) -> pd.DataFrame:
+        """``hourly`` or ``4h`` bars built from the rolling 1-minute store."""
+        return minute_bars.ohlcv(self.symbol, timeframe)
+
+    def _timeframe_df(self, timeframe: str) -> pd.DataFrame:
+        """OHLC bars for ``timeframe``: daily, weekly, monthly or intraday."""
+        if timeframe == "daily":
+            return self.df
+        if timeframe == "weekly":
+            return self.weekly_df
+        if timeframe == "monthly":
+            return self.monthly_df
+        if timeframe in INTRADAY_TIMEFRAMES:
+            return self.intraday_df(timeframe)
+        raise ValueError(f"Invalid timeframe: {timeframe}")
+
+    def _daily_df_for(self, timeframe: str) -> pd.DataFrame:
+        """Daily bars to align with ``timeframe`` bars as-of.
+
+        For intraday timeframes each daily row is relabelled to its session's
+        close, so a bar never sees the moving averages of its own day.
+        """
+        if timeframe in INTRADAY_TIMEFRAMES:
+            return self.df.set_axis(session_close_index(self.df.index))
+        return self.df
+
     # New method to detect engulfing patterns
     def detect_engulfing(self) -> dict[str, str]:
         """Detect bullish or bearish engulfing patterns for multiple timeframes."""
@@ -354,15 +613,8 @@ class StockAnalyser:
         # Weekly uses resampled weekly dataframe
         weekly_pattern = _pattern(self.weekly_df)
 
-        # Monthly requires proper OHLC resampling
-        monthly_ohlc = self.df.resample("M").agg({
-            "Open": "first",
-            "High": "max",
-            "Low": "min",
-            "Close": "last",
-            "Volume": "sum" if "Volume" in self.df.columns else "first",
-        }).dropna()
-        monthly_pattern = _pattern(monthly_ohlc)
+        # Monthly requires proper OHLC bars
+        monthly_pattern = _pattern(self.bars.ohlcv("monthly"))
 
         return {
             "daily": daily_pattern,
@@ -409,14 +661,7 @@ class StockAnalyser:
 
         daily_pattern = _pattern(self.df)
         weekly_pattern = _pattern(self.weekly_df)
-        monthly_ohlc = self.df.resample("M").agg({
-            "Open": "first",
-            "High": "max",
-            "Low": "min",
-            "Close": "last",
-            "Volume": "sum" if "Volume" in self.df.columns else "first",
-        }).dropna()
-        monthly_pattern = _pattern(monthly_ohlc)
+        monthly_pattern = _pattern(self.bars.ohlcv("monthly"))
 
         return {
             "daily": daily_pattern,
@@ -1310,14 +1555,10 @@ class StockAnalyser:
     
     def get_mansfield_rs_series(self, ma_length: int = 52, *, as_list: bool = True):
         """Mansfield Relative Strength versus the S&P 500 index."""
-        benchmark_df = StockAnalyser.get_price_data("^GSPC")
+        benchmark_bars = StockAnalyser.get_bar_store(MANSFIELD_BENCHMARK)
 
-        benchmark_weekly_close = (
-                benchmark_df["Close"].resample("W-FRI").last().dropna()
-            )
-        stock_weekly_close = (
-            self.df["Close"].resample("W-FRI").last().dropna()
-        )
+        benchmark_weekly_close = benchmark_bars.bars("weekly")["Close"].dropna()
+        stock_weekly_close = self.bars.bars("weekly")["Close"].dropna()
 
         mansfield = compute_mansfield_rs(
             stock_weekly_close, benchmark_weekly_close, ma_length
@@ -1374,6 +1615,7 @@ class StockAnalyser:
         rsi_ma = rsi.rolling(window=period).mean()
         return to_series(reindex_indicator(close, rsi_ma))
     
+    @cached_analysis
     def stage_analysis(self) -> tuple[int | None, int]:
         """
         Updated Stage Analysis Logic with Tolerance:
@@ -1517,14 +1759,7 @@ class StockAnalyser:
         return to_series(reindex_indicator(close, rsi))
     
     def get_rsi_lines(self, period: int = 14, timeframe: str = "weekly") -> dict:
-        if timeframe == "daily":
-            df = self.df
-        elif timeframe == "weekly":
-            df = self.weekly_df
-        elif timeframe == "monthly":
-            df = self.monthly_df
-        else:
-            raise ValueError(f"Invalid timeframe: {timeframe}")
+        df = self._timeframe_df(timeframe)
 
         close = df["Close"]
         rsi = compute_wilder_rsi(close, period)
@@ -1549,14 +1784,7 @@ class StockAnalyser:
 
     
     def get_volatility_bbwp(self, timeframe: str = "weekly"):
-        if timeframe == "daily":
-            close = self.df["Close"]
-        elif timeframe == "weekly":
-            close = self.weekly_df["Close"]
-        elif timeframe == "monthly":
-            close = self.monthly_df["Close"]
-        else:
-            raise ValueError(f"Invalid timeframe: {timeframe}")
+        close = self._timeframe_df(timeframe)["Close"]
 
         # You may want to adjust the defaults for each timeframe for BBWP calculation
         length = 13
@@ -1619,13 +1847,7 @@ class StockAnalyser:
 
 
     def get_bollinger_band(self, timeframe: str = "weekly", window: int = 20, mult: float = 2.0):
-        df = self.df.copy()
-
-        if timeframe == "weekly":
-            df = self.weekly_df
-        elif timeframe == "monthly":
-            df = self.monthly_df
-        close = df["Close"]
+        close = self._timeframe_df(timeframe)["Close"]
         
         sma = close.rolling(window=window).mean()
         std = close.rolling(window=window).std()
@@ -1640,50 +1862,34 @@ class StockAnalyser:
         }
     
     def get_ma_series(self, period: int, timeframe: str = "weekly"):
-        if timeframe == "daily":
-            df = self.df
-        elif timeframe == "weekly":
-            df = self.weekly_df
-        elif timeframe == "monthly":
-            df = self.monthly_df
-        else:
-            raise ValueError(f"Invalid timeframe: {timeframe}")
+        df = self._timeframe_df(timeframe)
         close = df["Close"]
         ma = close.rolling(window=period).mean()
         return to_series(reindex_indicator(close, ma))
 
 
 
-    def get_overlay_lines(self, timeframe: str = "daily") -> dict:
-        return {
-            "price_line": self.get_price_line(),
-            **self.get_bollinger_band(timeframe),
-            
-            # First Chart
-            "three_year_ma": self.get_3year_ma_series(),
-
-            # Second Chart
-            "dma_200": self.get_200dma_series(),
-            **self.get_ichimoku_lines(),
-            **self.get_supertrend_lines(),
-
-            # Third Chart
-            **self.get_mace_series(),
-            "forty_week_ma": self.get_40_week_ma_series(),
-
-            # Fourth Chart
-            "dma_50": self.get_50dma_series(),
-            "dma_150": self.get_150dma_series(),
-            "dma_90": self.get_90dma_series(),
-            "momentum_90": self.get_momentum_90_series(),
-
-            # Others
-            "mansfield_rs": self.get_mansfield_rs_series(),
-            **self.get_rsi_lines(timeframe=timeframe), #3rd chart from price
-            **self.get_volatility_bbwp(timeframe=timeframe),  #1st chart from price
-            **self.get_mean_reversion_deviation_lines(), #2nd chart from price
-        }
-    
+    def get_overlay_lines(self, timeframe: str = "daily", series=None) -> dict:
+        """Overlay series by name; ``series`` limits it to those names.
+
+        Only the groups in ``OVERLAY_GROUPS`` holding a requested series are
+        computed.  Unknown names are ignored.
+        """
+        wanted = None if series is None else set(series)
+        overlays = {}
+        for spec in OVERLAY_GROUPS.values():
+            if wanted is not None and wanted.isdisjoint(spec.series):
+                continue
+            method = getattr(self, spec.method)
+            lines = method(timeframe=timeframe) if spec.uses_timeframe else method()
+            if isinstance(lines, dict):
+                overlays.update(lines)
+            else:
+                overlays[spec.series[0]] = lines
+        if wanted is not None:
+            overlays = {name: lines for name, lines in overlays.items() if name in wanted}
+        return overlays
+
     def get_signal_lines(self, timeframe: str = "daily") -> dict:
         """
         Returns the correct overlays for each strategy, aligning all moving averages
@@ -1707,12 +1913,12 @@ class StockAnalyser:
 
         elif timeframe == "weekly":
             index = self.weekly_df.index
-            # -- Daily MAs (e.g. 20DMA, 200DMA, 5DMA) need to be computed on daily closes then resampled to weekly --
-            ma_20_daily = self.df["Close"].rolling(20).mean().resample("W-FRI").last().reindex(index)
-            ma_200_daily = self.df["Close"].rolling(200).mean().resample("W-FRI").last().reindex(index)
-            ma_5_daily = self.df["Close"].rolling(5).mean().resample("W-FRI").last().reindex(index)
-            ma_21_daily = self.df["Close"].rolling(21).mean().resample("W-FRI").last().reindex(index)
-            ma_252_daily = self.df["Close"].rolling(252).mean().resample("W-FRI").last().reindex(index)
+            # -- Daily MAs (e.g. 20DMA, 200DMA, 5DMA) need to be computed on daily closes then aligned as-of each weekly bar --
+            ma_20_daily = align_asof(self.df["Close"].rolling(20).mean(), index)
+            ma_200_daily = align_asof(self.df["Close"].rolling(200).mean(), index)
+            ma_5_daily = align_asof(self.df["Close"].rolling(5).mean(), index)
+            ma_21_daily = align_asof(self.df["Close"].rolling(21).mean(), index)
+            ma_252_daily = align_asof(self.df["Close"].rolling(252).mean(), index)
             # Northstar: uses *weekly* MA12, MA36
             overlays["ma_12"] = self.get_ma_series(12, timeframe="weekly")
             overlays["ma_36"] = self.get_ma_series(36, timeframe="weekly")
@@ -1733,12 +1939,12 @@ class StockAnalyser:
             overlays["ma_30w"] = self.get_ma_series(30, timeframe="weekly")    # 30-week MA
         elif timeframe == "monthly":
             index = self.monthly_df.index
-            # -- Daily MAs resampled to monthly --
-            ma_20_daily = self.df["Close"].rolling(20).mean().resample("M").last().reindex(index)
-            ma_200_daily = self.df["Close"].rolling(200).mean().resample("M").last().reindex(index)
-            ma_5_daily = self.df["Close"].rolling(5).mean().resample("M").last().reindex(index)
-            ma_21_daily = self.df["Close"].rolling(21).mean().resample("M").last().reindex(index)
-            ma_252_daily = self.df["Close"].rolling(252).mean().resample("M").last().reindex(index)
+            # -- Daily MAs aligned as-of each monthly bar --
+            ma_20_daily = align_asof(self.df["Close"].rolling(20).mean(), index)
+            ma_200_daily = align_asof(self.df["Close"].rolling(200).mean(), index)
+            ma_5_daily = align_asof(self.df["Close"].rolling(5).mean(), index)
+            ma_21_daily = align_asof(self.df["Close"].rolling(21).mean(), index)
+            ma_252_daily = align_asof(self.df["Close"].rolling(252).mean(), index)
             # Northstar: uses *monthly* MA12, MA36
             overlays["ma_12"] = self.get_ma_series(12, timeframe="monthly")
             overlays["ma_36"] = self.get_ma_series(36, timeframe="monthly")
@@ -1748,6 +1954,24 @@ class StockAnalyser:
             overlays["ma_5d"] = to_series(ma_5_daily)
             overlays["ma_21"] = to_series(ma_21_daily)
             overlays["ma_252"] = to_series(ma_252_daily)
+        elif timeframe in INTRADAY_TIMEFRAMES:
+            index = self.intraday_df(timeframe).index
+            # -- Daily MAs of the sessions closed before each intraday bar --
+            daily_close = self._daily_df_for(timeframe)["Close"]
+            ma_20_daily = align_asof(daily_close.rolling(20).mean(), index)
+            ma_200_daily = align_asof(daily_close.rolling(200).mean(), index)
+            ma_5_daily = align_asof(daily_close.rolling(5).mean(), index)
+            ma_21_daily = align_asof(daily_close.rolling(21).mean(), index)
+            ma_252_daily = align_asof(daily_close.rolling(252).mean(), index)
+            # Northstar: MA12, MA36 on the intraday bars
+            overlays["ma_12"] = self.get_ma_series(12, timeframe=timeframe)
+            overlays["ma_36"] = self.get_ma_series(36, timeframe=timeframe)
+            # StClair/TrendInvestorPro: resampled daily MAs
+            overlays["ma_20d"] = to_series(ma_20_daily)
+            overlays["dma_200"] = to_series(ma_200_daily)
+            overlays["ma_5d"] = to_series(ma_5_daily)
+            overlays["ma_21"] = to_series(ma_21_daily)
+            overlays["ma_252"] = to_series(ma_252_daily)
         else:
             raise ValueError(f"Unsupported timeframe: {timeframe}")
 
@@ -1921,7 +2145,7 @@ class StockAnalyser:
         symbol1 = self.symbol
         raw_symbol2 = other_symbol.upper().strip()
         symbol2 = SYMBOL_ALIASES.get(raw_symbol2, raw_symbol2)
-        other = StockAnalyser(symbol2)
+        other = get_analyser(symbol2)
 
         if timeframe == "daily":
             df1 = self.df.copy()
@@ -1997,29 +2221,18 @@ class StockAnalyser:
     '''
     Buy / Sell Indicators 
     '''
-    def get_trendinvestorpro_signals(self, timeframe: str = "daily") -> list[dict]:
+    @cached_analysis
+    def get_trendinvestorpro_signals(self, timeframe: str = "daily") -> Markers:
         """
         Implements the TrendInvestorPro strategy logic.
         Returns a list of marker dicts: {time, price, side, label}
         """
-        cache_key = _signal_cache_key("trendinvestorpro", self.symbol, timeframe)
-        cached = _get_cached_value(_signal_cache, cache_key)
-        if cached is not None:
-            return cached
-        
         # 1. Choose correct OHLC dataframe
-        if timeframe == "daily":
-            df = self.df
-        elif timeframe == "weekly":
-            df = self.weekly_df
-        elif timeframe == "monthly":
-            df = self.monthly_df
-        else:
-            raise ValueError(f"Invalid timeframe: {timeframe}")
+        df = self._timeframe_df(timeframe)
 
         df = df.copy().dropna()
         if len(df) < 210:
-            return []
+            return ()
 
         # 2. Calculate all indicators
         close = df["Close"]
@@ -2074,12 +2287,12 @@ class StockAnalyser:
 
             # Place entry marker
             if entry_signal or reentry_signal:
-                markers.append({
-                    "time": int(pd.Timestamp(t).timestamp()),
-                    "price": price,
-                    "side": "buy",
-                    "label": "ENTRY" if entry_signal else "RE-ENTRY",
-                })
+                markers.append(SignalMarker(
+                    time=int(pd.Timestamp(t).timestamp()),
+                    price=float(price),
+                    side="buy",
+                    label="ENTRY" if entry_signal else "RE-ENTRY",
+                ))
                 in_position = True
                 enableMAReentry = False
                 enableKCReentry = False
@@ -2087,24 +2300,24 @@ class StockAnalyser:
 
             # Exits
             if in_position and ex_ma:
-                markers.append({
-                    "time": int(pd.Timestamp(t).timestamp()),
-                    "price": price,
-                    "side": "sell",
-                    "label": "EXIT MA"
-                })
+                markers.append(SignalMarker(
+                    time=int(pd.Timestamp(t).timestamp()),
+                    price=float(price),
+                    side="sell",
+                    label="EXIT MA",
+                ))
                 in_position = False
                 enableMAReentry = True
                 enableKCReentry = False
                 sawDownCross = False
 
             if in_position and ex_kc:
-                markers.append({
-                    "time": int(pd.Timestamp(t).timestamp()),
-                    "price": price,
-                    "side": "sell",
-                    "label": "EXIT KC"
-                })
+                markers.append(SignalMarker(
+                    time=int(pd.Timestamp(t).timestamp()),
+                    price=float(price),
+                    side="sell",
+                    label="EXIT KC",
+                ))
                 in_position = False
                 enableMAReentry = False
                 enableKCReentry = True
@@ -2114,27 +2327,15 @@ class StockAnalyser:
             if (enableMAReentry or enableKCReentry) and s_pct <= -1.0:
                 sawDownCross = True
 
-        _store_cached_value(_signal_cache, cache_key, markers)
-        return copy.deepcopy(markers)
+        return markers
     
+    @cached_analysis
     def get_trendinvestorpro_status_and_strength(self, timeframe: str = "daily") -> dict:
         """
         Returns the most recent TrendInvestorPro signal (BUY/SELL) and whether the signal is
         strengthening, weakening, or crossed.
         """
-        cache_key = _signal_cache_key("trendinvestorpro_status", self.symbol, timeframe)
-        cached = _get_cached_value(_status_cache, cache_key)
-        if cached is not None:
-            return cached
-        
-        if timeframe == "daily":
-            df = self.df
-        elif timeframe == "weekly":
-            df = self.weekly_df
-        elif timeframe == "monthly":
-            df = self.monthly_df
-        else:
-            raise ValueError(f"Invalid timeframe: {timeframe}")
+        df = self._timeframe_df(timeframe)
 
         df = df.copy().dropna()
         if len(df) < 210:
@@ -2196,34 +2397,22 @@ class StockAnalyser:
             delta = "strengthening" if c_now > c_prev else "weakening"
         result = {"status": status, "delta": delta}
 
-        _store_cached_value(_status_cache, cache_key, result)
-        return copy.deepcopy(result)
+        return result
 
 
     
-    def get_stclair_signals(self, timeframe: str = "weekly") -> list[dict]:
+    @cached_analysis
+    def get_stclair_signals(self, timeframe: str = "weekly") -> Markers:
         """
         Implements the multi-timeframe trend-following strategy described in PineScript.
         Returns list of {time, price, side, label}.
         - timeframe: "weekly", "monthly", or "daily"
         """
-        cache_key = _signal_cache_key("stclair", self.symbol, timeframe)
-        cached = _get_cached_value(_signal_cache, cache_key)
-        if cached is not None:
-            return cached
-        
         # Choose base OHLC dataframe for the given timeframe
-        if timeframe == "daily":
-            df = self.df
-        elif timeframe == "weekly":
-            df = self.weekly_df
-        elif timeframe == "monthly":
-            df = self.monthly_df
-        else:
-            raise ValueError(f"Invalid timeframe: {timeframe}")
+        df = self._timeframe_df(timeframe)
 
         # Must use daily data for moving averages, and resampled for RSI signals
-        daily_df = self.df
+        daily_df = self._daily_df_for(timeframe)
         # For price comparison, always use daily close aligned with higher timeframe
         # We'll use the last close *before or at* each bar for SMA check
 
@@ -2242,26 +2431,29 @@ class StockAnalyser:
         rsi_ma = rsi.rolling(window=14).mean()
 
         # Align daily MA to higher timeframe index (take most recent available)
-        daily_close = daily_df['Close']
+        daily_counts = asof_positions(daily_df.index, df.index)
+        sma20_aligned = align_asof(sma20, df.index).to_numpy()
+        sma200_aligned = align_asof(sma200, df.index).to_numpy()
+        close_values = close.to_numpy()
+        rsi_values = rsi.to_numpy()
+        rsi_ma_values = rsi_ma.to_numpy()
 
         in_position = False
         entry_price = None
 
         # For each bar in the selected timeframe, determine signals
         for idx in range(len(df)):
-            t = df.index[idx]
-            bar_close = close.iloc[idx]
-            # Get most recent SMA values up to this bar
-            recent_daily = daily_df.loc[:t]
-            if len(recent_daily) < 200:
+            if daily_counts[idx] < 200:
                 continue  # skip if not enough data
 
-            latest_sma20 = sma20.loc[:t].iloc[-1]
-            latest_sma200 = sma200.loc[:t].iloc[-1]
+            t = df.index[idx]
+            bar_close = close_values[idx]
+            latest_sma20 = sma20_aligned[idx]
+            latest_sma200 = sma200_aligned[idx]
 
             # Entry/exit conditions
-            weekly_rsi = rsi.iloc[idx]
-            weekly_rsi_ma = rsi_ma.iloc[idx]
+            weekly_rsi = rsi_values[idx]
+            weekly_rsi_ma = rsi_ma_values[idx]
 
             enter_cond = (
                 (bar_close > latest_sma200)
@@ -2272,54 +2464,41 @@ class StockAnalyser:
 
             if enter_cond and not in_position:
                 # Enter long
-                markers.append({
-                    "time": int(pd.Timestamp(t).timestamp()),
-                    "price": bar_close,
-                    "side": "buy",
-                    "label": "ENTRY",
-                })
+                markers.append(SignalMarker(
+                    time=int(pd.Timestamp(t).timestamp()),
+                    price=float(bar_close),
+                    side="buy",
+                    label="ENTRY",
+                ))
                 in_position = True
                 entry_price = bar_close
 
             elif exit_cond and in_position:
                 # Exit long
-                markers.append({
-                    "time": int(pd.Timestamp(t).timestamp()),
-                    "price": bar_close,
-                    "side": "sell",
-                    "label": "EXIT",
-                })
+                markers.append(SignalMarker(
+                    time=int(pd.Timestamp(t).timestamp()),
+                    price=float(bar_close),
+                    side="sell",
+                    label="EXIT",
+                ))
                 in_position = False
                 entry_price = None
 
-        _store_cached_value(_signal_cache, cache_key, markers)
-        return copy.deepcopy(markers)
+        return markers
     
+    @cached_analysis
     def get_stclair_status_and_strength(self, timeframe: str = "weekly") -> dict:
         """
         Returns the latest signal ('BUY' or 'SELL') and its trend delta
         ('crossed', 'strengthening', 'weakening', 'neutral'), enhanced with Supertrend.
         """
-        cache_key = _signal_cache_key("stclair_status", self.symbol, timeframe)
-        cached = _get_cached_value(_status_cache, cache_key)
-        if cached is not None:
-            return cached
-        
         # Load correct timeframe
-        if timeframe == "daily":
-            df = self.df
-        elif timeframe == "weekly":
-            df = self.weekly_df
-        elif timeframe == "monthly":
-            df = self.monthly_df
-        else:
-            raise ValueError(f"Invalid timeframe: {timeframe}")
+        df = self._timeframe_df(timeframe)
 
-        daily_df = self.df
+        daily_df = self._daily_df_for(timeframe)
         if len(daily_df) < 200 or len(df) < 3:
             result = {"status": None, "delta": None}
-            _store_cached_value(_status_cache, cache_key, result)
-            return copy.deepcopy(result)
+            return result
 
         # --- Daily SMAs for price context
         sma20 = daily_df['Close'].rolling(20).mean()
@@ -2330,34 +2509,32 @@ class StockAnalyser:
         rsi = compute_wilder_rsi(close, 14)
         rsi_ma = rsi.rolling(14).mean()
 
+        # Daily SMAs as of each bar, aligned once instead of sliced per bar
+        daily_counts = asof_positions(daily_df.index, df.index)
+        sma20_aligned = align_asof(sma20, df.index).to_numpy()
+        sma200_aligned = align_asof(sma200, df.index).to_numpy()
+        close_values = close.to_numpy()
+        rsi_values = rsi.to_numpy()
+        rsi_ma_values = rsi_ma.to_numpy()
+
         # Helper: extract key values
         def get_latest_values(index):
-            t = df.index[index]
-            bar_close = close.iloc[index]
-
-            recent_daily = daily_df.loc[:t]
-            if len(recent_daily) < 200:
+            if daily_counts[index] < 200:
                 return None
 
-            sma20_val = sma20.loc[:t].iloc[-1]
-            sma200_val = sma200.loc[:t].iloc[-1]
-            rsi_val = rsi.iloc[index]
-            rsi_ma_val = rsi_ma.iloc[index]
-
             return {
-                "bar_close": bar_close,
-                "sma20": sma20_val,
-                "sma200": sma200_val,
-                "rsi": rsi_val,
-                "rsi_ma": rsi_ma_val,
+                "bar_close": close_values[index],
+                "sma20": sma20_aligned[index],
+                "sma200": sma200_aligned[index],
+                "rsi": rsi_values[index],
+                "rsi_ma": rsi_ma_values[index],
             }
 
         latest = get_latest_values(-1)
         prev = get_latest_values(-2)
         if not latest or not prev:
             result = {"status": None, "delta": None}
-            _store_cached_value(_status_cache, cache_key, result)
-            return copy.deepcopy(result)
+            return result
 
         # ----- Build persistent BUY/SELL signals over the series -----
         in_position = False
@@ -2388,8 +2565,7 @@ class StockAnalyser:
         valid_signals = [s for s in signals if s is not None]
         if len(valid_signals) < 2:
             result = {"status": None, "delta": None}
-            _store_cached_value(_status_cache, cache_key, result)
-            return copy.deepcopy(result)
+            return result
 
         curr_signal = valid_signals[-1]
         prev_signal = valid_signals[-2]
@@ -2407,16 +2583,15 @@ class StockAnalyser:
             delta = "strengthening" if curr_gap > prev_gap else "weakening"
         else:
             result = {"status": curr_signal, "delta": None}
-            _store_cached_value(_status_cache, cache_key, result)
-            return copy.deepcopy(result)
+            return result
 
        
 
         result = {"status": curr_signal, "delta": delta}
-        _store_cached_value(_status_cache, cache_key, result)
-        return copy.deepcopy(result)
+        return result
 
-    def get_northstar_signals(self, timeframe: str = "daily") -> list[dict]:
+    @cached_analysis
+    def get_northstar_signals(self, timeframe: str = "daily") -> Markers:
         """
         Implements the NorthStar trend-following strategy:
         Entry: Price > 12MA and Price > 36MA
@@ -2424,25 +2599,13 @@ class StockAnalyser:
         No entry if Price < 36MA.
         Returns markers: {time, price, side, label}
         """
-        cache_key = _signal_cache_key("northstar", self.symbol, timeframe)
-        cached = _get_cached_value(_signal_cache, cache_key)
-        if cached is not None:
-            return cached
-        
         # Select OHLC dataframe for requested timeframe
-        if timeframe == "daily":
-            df = self.df
-        elif timeframe == "weekly":
-            df = self.weekly_df
-        elif timeframe == "monthly":
-            df = self.monthly_df
-        else:
-            raise ValueError(f"Invalid timeframe: {timeframe}")
+        df = self._timeframe_df(timeframe)
 
         df = df.copy().dropna()
         
         if len(df) < 40:
-            return []  # not enough data
+            return ()  # not enough data
 
         close = df['Close']
         ma12 = close.rolling(window=12).mean()
@@ -2473,46 +2636,36 @@ class StockAnalyser:
             )
 
             if enter_cond and not do_not_enter:
-                markers.append({
-                    "time": int(pd.Timestamp(t).timestamp()),
-                    "price": price,
-                    "side": "buy",
-                    "label": "ENTRY",
-                })
+                markers.append(SignalMarker(
+                    time=int(pd.Timestamp(t).timestamp()),
+                    price=float(price),
+                    side="buy",
+                    label="ENTRY",
+                ))
                 in_position = True
 
             elif exit_cond:
-                markers.append({
-                    "time": int(pd.Timestamp(t).timestamp()),
-                    "price": price,
-                    "side": "sell",
-                    "label": "EXIT",
-                })
+                markers.append(SignalMarker(
+                    time=int(pd.Timestamp(t).timestamp()),
+                    price=float(price),
+                    side="sell",
+                    label="EXIT",
+                ))
                 in_position = False
 
-        _store_cached_value(_signal_cache, cache_key, markers)
-        return copy.deepcopy(markers)
+        return markers
     
+    @cached_analysis
     def get_northstar_status_and_strength(self, timeframe: str = "weekly") -> dict:
         """
         Returns the latest status ('BUY' or 'SELL') and trend delta
         ('strengthening' / 'weakening' / 'crossed'), adjusted with Supertrend trend.
         """
-        cache_key = _signal_cache_key("northstar_status", self.symbol, timeframe)
-        cached = _get_cached_value(_status_cache, cache_key)
-        if cached is not None:
-            return cached
-        
-        df = {
-            "daily": self.df,
-            "weekly": self.weekly_df,
-            "monthly": self.monthly_df
-        }[timeframe].copy()
+        df = self._timeframe_df(timeframe).copy()
 
         if len(df) < 37:
             result = {"status": None, "delta": None}
-            _store_cached_value(_status_cache, cache_key, result)
-            return copy.deepcopy(result)
+            return result
 
         close = df["Close"]
         ma12 = close.rolling(12).mean()
@@ -2548,12 +2701,12 @@ class StockAnalyser:
             delta = "neutral"
 
         result = {"status": curr_sig, "delta": delta}
-        _store_cached_value(_status_cache, cache_key, result)
-        return copy.deepcopy(result)
+        return result
 
 
 
-    def get_stclairlongterm_signals(self, timeframe: str = "weekly") -> list[dict]:
+    @cached_analysis
+    def get_stclairlongterm_signals(self, timeframe: str = "weekly") -> Markers:
         """
         Implements the StClairLongTerm strategy.
 
@@ -2569,18 +2722,12 @@ class StockAnalyser:
 
         Returns markers in the form {time, price, side, label}
         """
-        cache_key = _signal_cache_key("stclairlongterm", self.symbol, timeframe)
-        cached = _get_cached_value(_signal_cache, cache_key)
-        if cached is not None:
-            return cached
-        
         if timeframe != "weekly":
             raise HTTPException(status_code=400, detail="stclairlongterm is only available for weekly timeframe.")
         df_weekly = self.weekly_df
         if len(df_weekly) < 40:
-            result: list[dict] = []
-            _store_cached_value(_signal_cache, cache_key, result)
-            return copy.deepcopy(result)
+            result: Markers = ()
+            return result
 
         close = df_weekly["Close"]
 
@@ -2604,8 +2751,8 @@ class StockAnalyser:
         monthly_rsi_ma = monthly_rsi.rolling(window=14).mean()
 
        # Reindex both to weekly
-        monthly_rsi_for_week = monthly_rsi.reindex(df_weekly.index, method="ffill")
-        monthly_rsi_ma_for_week = monthly_rsi_ma.reindex(df_weekly.index, method="ffill")
+        monthly_rsi_for_week = align_asof(monthly_rsi, df_weekly.index)
+        monthly_rsi_ma_for_week = align_asof(monthly_rsi_ma, df_weekly.index)
 
         # --- Iterate and detect signals ---
         markers = []
@@ -2641,26 +2788,26 @@ class StockAnalyser:
 
             # --- Entry: require at least two confirming signals ---
             if not in_position and signals_entry >= 2:
-                markers.append({
-                    "time": int(pd.Timestamp(t).timestamp()),
-                    "price": price,
-                    "side": "buy",
-                    "label": "ENTRY"
-                })
+                markers.append(SignalMarker(
+                    time=int(pd.Timestamp(t).timestamp()),
+                    price=float(price),
+                    side="buy",
+                    label="ENTRY",
+                ))
                 in_position = True
            # --- Exit: require at least two confirming signals ---
             elif in_position and signals_exit >= 2:
-                markers.append({
-                    "time": int(pd.Timestamp(t).timestamp()),
-                    "price": price,
-                    "side": "sell",
-                    "label": "EXIT"
-                })
+                markers.append(SignalMarker(
+                    time=int(pd.Timestamp(t).timestamp()),
+                    price=float(price),
+                    side="sell",
+                    label="EXIT",
+                ))
                 in_position = False
 
-        _store_cached_value(_signal_cache, cache_key, markers)
-        return copy.deepcopy(markers)
+        return markers
     
+    @cached_analysis
     def get_stclairlongterm_status_and_strength(self) -> dict:
         """
         Returns the most recent StClairLongTerm signal and whether it is
@@ -2689,8 +2836,8 @@ class StockAnalyser:
         # --- Monthly RSI and MA ---
         monthly_rsi = compute_wilder_rsi(self.monthly_df["Close"], 14)
         monthly_rsi_ma = monthly_rsi.rolling(14).mean()
-        monthly_rsi_for_week = monthly_rsi.reindex(df_weekly.index, method="ffill")
-        monthly_rsi_ma_for_week = monthly_rsi_ma.reindex(df_weekly.index, method="ffill")
+        monthly_rsi_for_week = align_asof(monthly_rsi, df_weekly.index)
+        monthly_rsi_ma_for_week = align_asof(monthly_rsi_ma, df_weekly.index)
 
         # --- Helper to calculate signal scores for a given index ---
         def get_scores(idx):
@@ -2755,9 +2902,9 @@ class StockAnalyser:
         return {"status": curr, "delta": delta}
 
 
-    def backtest_signal_markers(self, markers: list[dict]) -> dict:
+    def backtest_signal_markers(self, markers: Markers) -> dict:
         """
-        Given a list of {time, price, side, label}, pairs ENTRY/EXIT and computes stats.
+        Given a sequence of SignalMarker(time, price, side, label), pairs ENTRY/EXIT and computes stats.
         Returns:
             - trades: list of {entry_time, entry_price, exit_time, exit_price, profit, profit_pct}
             - stats: number of trades, profitable trades, total profit, total loss, net profit
@@ -2766,16 +2913,16 @@ class StockAnalyser:
         entry = None
 
         for m in markers:
-            if m['side'] == 'buy':
+            if m.side == 'buy':
                 entry = m
-            elif m['side'] == 'sell' and entry is not None:
-                profit = m['price'] - entry['price']
-                profit_pct = (profit / entry['price']) * 100 if entry['price'] != 0 else 0
+            elif m.side == 'sell' and entry is not None:
+                profit = m.price - entry.price
+                profit_pct = (profit / entry.price) * 100 if entry.price != 0 else 0
                 trades.append({
-                    "entry_time": entry['time'],
-                    "entry_price": entry['price'],
-                    "exit_time": m['time'],
-                    "exit_price": m['price'],
+                    "entry_time": entry.time,
+                    "entry_price": entry.price,
+                    "exit_time": m.time,
+                    "exit_price": m.price,
                     "profit": profit,
                     "profit_pct": profit_pct,
                 })
@@ -2797,11 +2944,12 @@ class StockAnalyser:
         }
 
     
-    def get_mace_40w_signals(self) -> list[dict]:
+    @cached_analysis
+    def get_mace_40w_signals(self) -> Markers:
         df_weekly = self.weekly_df
         if len(df_weekly) < 60:
             print("Not enough data (less than 60 bars).")
-            return []
+            return ()
 
         close = df_weekly['Close']
         s = close.rolling(4).mean()
@@ -2851,27 +2999,28 @@ class StockAnalyser:
 
             if entry_cond and not in_position:
                 print(f"--> Entry triggered on {date.date()} at price {price:.2f}")
-                markers.append({
-                    "time": int(pd.Timestamp(date).timestamp()),
-                    "price": price,
-                    "side": "buy",
-                    "label": "ENTRY"
-                })
+                markers.append(SignalMarker(
+                    time=int(pd.Timestamp(date).timestamp()),
+                    price=float(price),
+                    side="buy",
+                    label="ENTRY",
+                ))
                 in_position = True
 
             elif exit_cond and in_position:
                 print(f"--> Exit triggered on {date.date()} at price {price:.2f}")
-                markers.append({
-                    "time": int(pd.Timestamp(date).timestamp()),
-                    "price": price,
-                    "side": "sell",
-                    "label": "EXIT"
-                })
+                markers.append(SignalMarker(
+                    time=int(pd.Timestamp(date).timestamp()),
+                    price=float(price),
+                    side="sell",
+                    label="EXIT",
+                ))
                 in_position = False
 
         print("Final markers:", markers)
-        return markers
+        return tuple(markers)
     
+    @cached_analysis
     def get_mace_40w_status_and_strength(self) -> dict:
         """
         Returns the latest MACE+40W signal and whether it's strengthening or weakening 
@@ -2955,23 +3104,17 @@ class StockAnalyser:
 
     
     
-    def get_demarker_signals(self, timeframe: str = "weekly", period: int = 14) -> list[dict]:
+    @cached_analysis
+    def get_demarker_signals(self, timeframe: str = "weekly", period: int = 14) -> Markers:
         """
         Generate buy/sell signals based on the DeMarker indicator.
         Entry: DeMarker crosses above 0.3 (oversold to rising = Buy)
         Exit:  DeMarker crosses below 0.7 (overbought to falling = Sell)
         """
         # 1. Get data
-        if timeframe == "daily":
-            df = self.df
-        elif timeframe == "weekly":
-            df = self.weekly_df
-        elif timeframe == "monthly":
-            df = self.monthly_df
-        else:
-            raise ValueError(f"Invalid timeframe: {timeframe}")
+        df = self._timeframe_df(timeframe)
         if len(df) < period + 5:
-            return []
+            return ()
 
         high = df["High"]
         low = df["Low"]
@@ -2995,38 +3138,32 @@ class StockAnalyser:
             exit_cond = (dem_prev > 0.7) and (dem_now <= 0.7)
 
             if entry_cond and not in_position:
-                markers.append({
-                    "time": int(pd.Timestamp(t).timestamp()),
-                    "price": price,
-                    "side": "buy",
-                    "label": "ENTRY"
-                })
+                markers.append(SignalMarker(
+                    time=int(pd.Timestamp(t).timestamp()),
+                    price=float(price),
+                    side="buy",
+                    label="ENTRY",
+                ))
                 in_position = True
 
             elif exit_cond and in_position:
-                markers.append({
-                    "time": int(pd.Timestamp(t).timestamp()),
-                    "price": price,
-                    "side": "sell",
-                    "label": "EXIT"
-                })
+                markers.append(SignalMarker(
+                    time=int(pd.Timestamp(t).timestamp()),
+                    price=float(price),
+                    side="sell",
+                    label="EXIT",
+                ))
                 in_position = False
 
-        return markers
+        return tuple(markers)
     
+    @cached_analysis
     def get_demarker_status_and_strength(self, timeframe: str = "weekly", period: int = 14) -> dict:
         """
         Returns the most recent DeMarker signal (BUY/SELL/HOLD) and whether the signal is strengthening,
         weakening, or has just crossed.
         """
-        if timeframe == "daily":
-            df = self.df
-        elif timeframe == "weekly":
-            df = self.weekly_df
-        elif timeframe == "monthly":
-            df = self.monthly_df
-        else:
-            raise ValueError(f"Invalid timeframe: {timeframe}")
+        df = self._timeframe_df(timeframe)
 
         if len(df) < period + 5:
             return {"status": None, "delta": None}
@@ -3083,11 +3220,12 @@ class StockAnalyser:
         statuses = [classify(p, m, ma) for p, m, ma in zip(close, mansfield, ma30)]
         return pd.Series(statuses, index=close.index)
 
-    def get_mansfield_signals(self) -> list[dict]:
+    @cached_analysis(depends=(MANSFIELD_BENCHMARK,))
+    def get_mansfield_signals(self) -> Markers:
         """Return NEW BUY and SELL markers based on Mansfield signal."""
         status_series = self._mansfield_status_series()
         if status_series.empty:
-            return []
+            return ()
 
         close = self.weekly_df["Close"].reindex(status_series.index)
         markers = []
@@ -3098,25 +3236,26 @@ class StockAnalyser:
 
             # NEW BUY signal
             if curr == "BUY" and prev in ["SELL", "NEUTRAL"]:
-                markers.append({
-                    "time": int(pd.Timestamp(status_series.index[idx]).timestamp()),
-                    "price": close.iloc[idx],
-                    "side": "buy",
-                    "label": "ENTRY",
-                })
+                markers.append(SignalMarker(
+                    time=int(pd.Timestamp(status_series.index[idx]).timestamp()),
+                    price=float(close.iloc[idx]),
+                    side="buy",
+                    label="ENTRY",
+                ))
 
             # NEW SELL signal
             elif curr == "SELL" and prev in ["BUY", "NEUTRAL"]:
-                markers.append({
-                    "time": int(pd.Timestamp(status_series.index[idx]).timestamp()),
-                    "price": close.iloc[idx],
-                    "side": "sell",
-                    "label": "EXIT",
-                })
+                markers.append(SignalMarker(
+                    time=int(pd.Timestamp(status_series.index[idx]).timestamp()),
+                    price=float(close.iloc[idx]),
+                    side="sell",
+                    label="EXIT",
+                ))
 
-        return markers
+        return tuple(markers)
 
 
+    @cached_analysis(depends=(MANSFIELD_BENCHMARK,))
     def get_mansfield_status(self) -> dict:
         """Return latest Mansfield signal status and new buy flag."""
         status_series = self._mansfield_status_series()
@@ -3130,26 +3269,20 @@ class StockAnalyser:
         return {"status": curr, "new_buy": new_buy}
     
 
-    def get_ndr_signal(self, timeframe: str = "daily") -> list[dict]:
+    @cached_analysis
+    def get_ndr_signal(self, timeframe: str = "daily") -> Markers:
         """Return markers when the 21-period SMA crosses the 252-period SMA."""
-        if timeframe == "daily":
-            df = self.df
-        elif timeframe == "weekly":
-            df = self.weekly_df
-        elif timeframe == "monthly":
-            df = self.monthly_df
-        else:
-            raise ValueError(f"Invalid timeframe: {timeframe}")
+        df = self._timeframe_df(timeframe)
 
         df = df.copy().dropna()
         if len(df) < 252:
-            return []
+            return ()
 
         close = df["Close"]
         ma21 = close.rolling(window=21).mean()
         ma252 = close.rolling(window=252).mean()
 
-        markers: list[dict] = []
+        markers: list[SignalMarker] = []
         prev_above = ma21.iloc[251] > ma252.iloc[251]
 
         for i in range(252, len(df)):
@@ -3157,28 +3290,25 @@ class StockAnalyser:
             price = close.iloc[i]
             above = ma21.iloc[i] > ma252.iloc[i]
             if above and not prev_above:
-                markers.append(
-                    {
-                        "time": int(pd.Timestamp(t).timestamp()),
-                        "price": price,
-                        "side": "buy",
-                        "label": "BUY",
-                    }
-                )
+                markers.append(SignalMarker(
+                    time=int(pd.Timestamp(t).timestamp()),
+                    price=float(price),
+                    side="buy",
+                    label="BUY",
+                ))
             elif not above and prev_above:
-                markers.append(
-                    {
-                        "time": int(pd.Timestamp(t).timestamp()),
-                        "price": price,
-                        "side": "sell",
-                        "label": "SELL",
-                    }
-                )
+                markers.append(SignalMarker(
+                    time=int(pd.Timestamp(t).timestamp()),
+                    price=float(price),
+                    side="sell",
+                    label="SELL",
+                ))
             prev_above = above
 
-        return markers
+        return tuple(markers)
 
 
+    @cached_analysis
     def get_generic_strength_status(self, timeframe: str = "weekly") -> dict:
         """
         Generic trend strength classification system:
@@ -3186,14 +3316,7 @@ class StockAnalyser:
         - Long-term strengthening: 50/150 DMA (always from daily data)
         - Detects "crossed" when status flips from previous period
         """
-        if timeframe == "daily":
-            df = self.df
-        elif timeframe == "weekly":
-            df = self.weekly_df
-        elif timeframe == "monthly":
-            df = self.monthly_df
-        else:
-            raise ValueError(f"Invalid timeframe: {timeframe}")
+        df = self._timeframe_df(timeframe)
 
         if len(df) < 36:
             return {"status": None, "strength": None}
@@ -3305,3 +3428,44 @@ class StockAnalyser:
                 "grad150": grad150,
             }
         }
+
+
+def _is_newer_version(version, other) -> bool:
+    return version is not None and other is not None and version > other
+
+
+def get_analyser(symbol: str) -> StockAnalyser:
+    """Return a shared ``StockAnalyser`` for the symbol's current price data.
+
+    Analysers are kept per ``(symbol, data version)`` in a bounded LRU
+    registry, so their resampled frames and memoized results survive across
+    requests. An analyser is replaced once its symbol's data version moves
+    on. Analysers are treated as read-only, which is what makes sharing them
+    between threads safe.
+    """
+    raw_symbol = symbol.upper().strip()
+    resolved = SYMBOL_ALIASES.get(raw_symbol, raw_symbol)
+    key = (resolved, StockAnalyser.get_price_data_version(resolved))
+
+    with _analyser_registry_lock:
+        analyser = _analyser_registry.get(key)
+        if analyser is not None:
+            _analyser_registry.move_to_end(key)
+            return analyser
+
+    analyser = StockAnalyser(resolved)
+    key = (resolved, analyser.data_version)
+    with _analyser_registry_lock:
+        existing = _analyser_registry.get(key)
+        if existing is not None:
+            _analyser_registry.move_to_end(key)
+            return existing
+        same_symbol = [k for k in _analyser_registry if k[0] == resolved]
+        if any(_is_newer_version(k[1], analyser.data_version) for k in same_symbol):
+            return analyser
+        for stale in same_symbol:
+            del _analyser_registry[stale]
+        _analyser_registry[key] = analyser
+        while len(_analyser_registry) > _ANALYSER_REGISTRY_SIZE:
+            _analyser_registry.popitem(last=False)
+    return analyser
@@ -632,6 +632,44 @@ def reindex_indicator(base: pd.Series, indicator: pd.Series) -> pd.Series:
     return full
 
 
+def asof_positions(source_index: pd.Index, target_index: pd.Index) -> np.ndarray:
+    """Number of ``source_index`` rows at or before each ``target_index`` label.
+
+    Equivalent to ``len(source.loc[:t])`` for every ``t`` in ``target_index``
+    but computed with a single ``searchsorted`` pass instead of one slice per
+    bar.  ``positions - 1`` is the integer location of the as-of row (``-1``
+    when no source row precedes the target).
+    """
+    return np.asarray(source_index).searchsorted(np.asarray(target_index), side="right")
+
+
+def align_asof(source: pd.Series, target_index: pd.Index) -> pd.Series:
+    """Project ``source`` onto ``target_index`` using the last value at or before each label.
+
+    Used to line up daily indicators (e.g. 20/200 DMA) with weekly or monthly
+    bars: ``align_asof(sma200, weekly.index).iloc[i]`` equals
+    ``sma200.loc[:weekly.index[i]].iloc[-1]``.  Targets that precede the first
+    source row are NaN.
+    """
+    positions = asof_positions(source.index, target_index) - 1
+    values = source.to_numpy(dtype=float, na_value=np.nan)
+    aligned = np.full(len(positions), np.nan)
+    has_prior = positions >= 0
+    aligned[has_prior] = values[positions[has_prior]]
+    return pd.Series(aligned, index=target_index)
+
+
+def session_close_index(daily_index: pd.Index) -> pd.DatetimeIndex:
+    """Daily labels moved to the end of their day, when the session's values are final.
+
+    Intraday bars fall inside the day their daily row is dated, so aligning a
+    daily indicator on the plain daily index hands each bar a value that
+    already includes its own session's close.  Aligned on these labels, a bar
+    only sees sessions that closed before its day.
+    """
+    return pd.DatetimeIndex(daily_index) + pd.Timedelta(days=1)
+
+
 def compute_demarker(close: pd.Series, high: pd.Series, low: pd.Series, period: int = 14) -> pd.Series:
     """Compute the DeMarker (DeM) indicator."""
     # DeMax
@@ -0,0 +1,37 @@
+"""LTTB skips gaps, and line series on the chart axis follow the kept candles."""
+import numpy as np
+
+from stock_analysis.downsample import downsample_lines, lttb_indices
+
+
+def test_lttb_does_not_pick_nan_points():
+    rng = np.random.default_rng(0)
+    x = np.arange(200)
+    y = np.cumsum(rng.normal(size=200))
+    y[1:-1][rng.random(198) < 0.5] = np.nan
+    kept = lttb_indices(x, y, 30)
+    assert len(kept) == 30
+    assert not np.isnan(y[kept]).any()
+
+
+def test_lttb_picks_nan_only_for_an_all_nan_bucket():
+    x = np.arange(10)
+    y = np.array([1.0, np.nan, np.nan, np.nan, np.nan, 2.0, 3.0, 4.0, 5.0, 6.0])
+    kept = lttb_indices(x, y, 4)
+    assert kept[0] == 0 and kept[-1] == 9
+    assert np.isnan(y[kept[1]])
+    assert not np.isnan(y[kept[2]])
+
+
+def test_short_series_on_the_chart_axis_keep_only_kept_times():
+    axis = np.arange(0, 1000, 10)
+    kept = axis[::10]
+    lines = {
+        "long": [{"time": int(t), "value": 1.0} for t in axis],
+        "short": [{"time": int(t), "value": 1.0} for t in axis[-12:-4]],
+        "other_axis": [{"time": int(t) + 5, "value": 1.0} for t in axis[-8:]],
+    }
+    result = downsample_lines(lines, 10, axis, kept)
+    assert [point["time"] for point in result["long"]] == kept.tolist()
+    assert [point["time"] for point in result["short"]] == [900]
+    assert result["other_axis"] == lines["other_axis"]
@@ -0,0 +1,63 @@
+"""Minute bars catch up without a live poller, and the store stays bounded."""
+import numpy as np
+import pandas as pd
+
+from stock_analysis.live_feed import Quote
+from stock_analysis.minute_store import _FIELDS, MinuteBarStore
+
+# Three crypto minutes from 2026-10-19 00:00 UTC; crypto keeps every minute.
+START = int(pd.Timestamp("2026-10-19", tz="UTC").timestamp())
+
+
+def _minutes(first: int, count: int, price: float):
+    times = np.arange(first, first + 60 * count, 60, dtype=np.int64)
+    return times, {field: np.full(count, 1.0 if field == "volume" else price) for field in _FIELDS}
+
+
+class _FakeDownloads(MinuteBarStore):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.calls = []
+
+    def _download(self, symbol, start=None):
+        self.calls.append((symbol, start))
+        if start is None:
+            return _minutes(START, 3, 100.0)
+        return _minutes(start, 3, 101.0)
+
+
+def test_idle_symbol_is_topped_up_from_its_last_minute():
+    store = _FakeDownloads(poll_seconds=15)
+    assert len(store.ohlcv("BTC-USD", "hourly")) == 1
+    series = store._series["BTC-USD"]
+    series.backfilled_at -= 60
+
+    frame = store.ohlcv("BTC-USD", "hourly")
+    assert store.calls == [("BTC-USD", None), ("BTC-USD", START + 120)]
+    # Two backfilled minutes, then the re-downloaded last one and two new ones.
+    assert series.times.tolist() == [START + 60 * i for i in range(5)]
+    assert series.columns["close"].tolist() == [100.0, 100.0, 101.0, 101.0, 101.0]
+    assert frame["Volume"].iloc[-1] == 5.0
+
+    # Within the poll interval of the top-up nothing is downloaded again.
+    store.ohlcv("BTC-USD", "hourly")
+    assert len(store.calls) == 2
+
+
+def test_polled_symbol_is_not_topped_up():
+    store = _FakeDownloads(poll_seconds=15)
+    store.ohlcv("BTC-USD", "hourly")
+    store._series["BTC-USD"].backfilled_at -= 60
+    store.add_quote(Quote("BTC-USD", pd.Timestamp(START + 150, unit="s", tz="UTC"), 102.0))
+    store.ohlcv("BTC-USD", "hourly")
+    assert store.calls == [("BTC-USD", None)]
+
+
+def test_least_recently_used_symbols_are_evicted():
+    store = _FakeDownloads(max_symbols=2)
+    store.ohlcv("BTC-USD", "hourly")
+    store.ohlcv("ETH-USD", "hourly")
+    store.ohlcv("BTC-USD", "hourly")
+    store.ohlcv("SOL-USD", "hourly")
+    assert list(store._series) == ["BTC-USD", "SOL-USD"]
+    assert "ETH-USD" not in store._backfill_locks
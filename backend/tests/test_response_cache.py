@@ -0,0 +1,39 @@
+"""Cached routes keep their own error responses for symbols that cannot be loaded.
+
+Run from ``backend/``::
+
+    python -m pytest tests
+"""
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+import main
+from stock_analysis.stock_analyser import StockAnalyser
+
+
+def _unknown_symbol(symbol: str):
+    raise HTTPException(status_code=400, detail="Stock symbol not found or data unavailable.")
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(StockAnalyser, "_download_price_history", staticmethod(_unknown_symbol))
+    return TestClient(main.app, raise_server_exceptions=False)
+
+
+@pytest.mark.parametrize(
+    "url, status_code",
+    [
+        ("/api/signals_daily/BADX", 400),
+        ("/api/chart_data_daily/BADX", 400),
+        ("/signal_lines/BADX?timeframe=daily", 500),
+        ("/overlay_data/BADX?timeframe=daily", 500),
+    ],
+)
+def test_unknown_symbol_is_not_cached(client, url, status_code):
+    response = client.get(url)
+    assert response.status_code == status_code
+    assert response.headers["content-type"].startswith("application/json")
+    assert "etag" not in response.headers
+    assert set(response.json()) & {"detail", "error"}
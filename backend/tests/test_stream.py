@@ -0,0 +1,46 @@
+"""``/ws/stream`` answers bad subscriptions with error updates."""
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from stock_analysis.stock_analyser import StockAnalyser
+
+
+def _history(symbol: str) -> pd.DataFrame:
+    index = pd.bdate_range(end="2026-10-16", periods=600)
+    close = 100 + np.cumsum(np.random.default_rng(0).normal(0, 1, len(index)))
+    return pd.DataFrame(
+        {"Open": close, "High": close + 1, "Low": close - 1, "Close": close, "Adj Close": close,
+         "Volume": np.full(len(index), 1e6)},
+        index=index,
+    )
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(StockAnalyser, "_download_price_history", staticmethod(_history))
+    return TestClient(main.app)
+
+
+def _first_update(client, message: dict) -> dict:
+    with client.websocket_connect("/ws/stream") as websocket:
+        websocket.send_json({"op": "subscribe", **message})
+        return websocket.receive_json()["updates"][0]
+
+
+def test_unknown_strategy_is_an_error_update(client):
+    update = _first_update(
+        client, {"symbol": "STRM", "timeframe": "daily", "channel": "signals", "strategies": ["nope"]}
+    )
+    assert update["kind"] == "error"
+    assert update["data"] == "Unknown strategy: nope"
+
+
+def test_signals_snapshot_matches_http(client):
+    update = _first_update(
+        client, {"symbol": "STRM", "timeframe": "daily", "channel": "signals", "strategies": ["stclair"]}
+    )
+    assert update["kind"] == "snapshot"
+    assert update["data"] == {"stclair": client.get("/api/signals_daily/STRM?strategy=stclair").json()}
@@ -27,6 +27,7 @@ import {
   GraphingChartProps,
 } from "./types";
 import SignalSummaryComponent from "../SignalSummary";
+import { fetchPacked, seriesFromPayload } from "./chartPayload";
 import "./graphing-chart.css"; // <-- Add your custom styles here
 
 const GraphingChart = ({ stockSymbol, onClose }: GraphingChartProps) => {
@@ -634,10 +635,10 @@ const GraphingChart = ({ stockSymbol, onClose }: GraphingChartProps) => {
     // Fetch signal lines from backend
     async function fetchSignalLines() {
       try {
-        const res = await fetch(
-          `http://localhost:8000/signal_lines/${stockSymbol}?timeframe=${timeframe}`
+        const payload = await fetchPacked(
+          `http://localhost:8000/signal_lines/${stockSymbol}?timeframe=${timeframe}&shape=columns`
         );
-        const data = await res.json();
+        const data: any = seriesFromPayload(payload);
         setSignalMAData(data);
 
         if (!chartInstanceRef.current) return;
@@ -62,6 +62,9 @@ const chartConfigs = [
   },
 ];
 
+// Every overlay series the grid draws.
+export const OVERLAY_GRID_SERIES = chartConfigs.flatMap((config) => config.keys);
+
 export default function OverlayGrid({ overlayData }: OverlayGridProps) {
   const chartRefs = useRef<(HTMLDivElement | null)[]>([]);
   const chartInstances = useRef<(IChartApi | null)[]>([]);
@@ -0,0 +1,158 @@
+import { UTCTimestamp } from "lightweight-charts";
+
+/** Media type of the backend's packed column format (see chart_payload.py). */
+export const PACKED_MEDIA_TYPE = "application/vnd.stock-columns";
+
+export type PackedColumn = Int32Array | Float32Array | Float64Array;
+
+/** Chart history in the backend's `shape=columns` or packed layout. */
+export interface HistoryColumns {
+  time: ArrayLike<number>;
+  open: ArrayLike<number>;
+  high: ArrayLike<number>;
+  low: ArrayLike<number>;
+  close: ArrayLike<number>;
+  volume: ArrayLike<number>;
+}
+
+export type LinePoint = { time: UTCTimestamp; value: number };
+
+const PACKED_ARRAYS: Record<
+  number,
+  Int32ArrayConstructor | Float32ArrayConstructor | Float64ArrayConstructor
+> = {
+  1: Int32Array,
+  2: Float32Array,
+  3: Float64Array,
+};
+
+/** Typed-array views over each column of a packed payload; no data is copied. */
+export function unpackColumns(buffer: ArrayBuffer): Record<string, PackedColumn> {
+  const view = new DataView(buffer);
+  const magic = String.fromCharCode(
+    view.getUint8(0),
+    view.getUint8(1),
+    view.getUint8(2),
+    view.getUint8(3)
+  );
+  if (magic !== "SCOL" || view.getUint8(4) !== 1) {
+    throw new Error("Not a packed column payload");
+  }
+  const count = view.getUint16(6, true);
+  const decoder = new TextDecoder();
+  const columns: Record<string, PackedColumn> = {};
+  let position = 8;
+  for (let i = 0; i < count; ++i) {
+    const dtype = view.getUint8(position);
+    const nameLength = view.getUint8(position + 1);
+    const length = view.getUint32(position + 4, true);
+    const offset = view.getUint32(position + 8, true);
+    position += 12;
+    const name = decoder.decode(new Uint8Array(buffer, position, nameLength));
+    position += nameLength;
+    columns[name] = new PACKED_ARRAYS[dtype](buffer, offset, length);
+  }
+  return columns;
+}
+
+/**
+ * GET `url` asking for the packed format. Returns the unpacked columns, or
+ * the parsed JSON body when the server answers with JSON (e.g. errors).
+ */
+export async function fetchPacked(
+  url: string
+): Promise<{ columns: Record<string, PackedColumn> } | { json: any }> {
+  const res = await fetch(url, { headers: { Accept: PACKED_MEDIA_TYPE } });
+  if (res.headers.get("content-type")?.startsWith(PACKED_MEDIA_TYPE)) {
+    return { columns: unpackColumns(await res.arrayBuffer()) };
+  }
+  return { json: await res.json() };
+}
+
+/** Line series `{name: [{time, value}]}` from packed `name.time`/`name.value` pairs. */
+export function seriesFromColumns(
+  columns: Record<string, PackedColumn>
+): Record<string, LinePoint[]> {
+  const series: Record<string, LinePoint[]> = {};
+  for (const key of Object.keys(columns)) {
+    if (!key.endsWith(".time")) continue;
+    const name = key.slice(0, -".time".length);
+    const time = columns[key];
+    const value = columns[`${name}.value`];
+    const points = new Array<LinePoint>(time.length);
+    for (let i = 0; i < time.length; ++i) {
+      points[i] = { time: time[i] as UTCTimestamp, value: value[i] };
+    }
+    series[name] = points;
+  }
+  return series;
+}
+
+/** Line series on shared time axes, as sent for `shape=columns`. */
+export interface CompactSeries {
+  axes: Record<string, number[]>;
+  series: Record<
+    string,
+    | { axis: string; start: number; values: (number | null)[] }
+    | { axis: string; start: number; length: number; value: number }
+  >;
+}
+
+/** Line series `{name: [{time, value}]}` from the compact `shape=columns` JSON. */
+export function seriesFromCompact(
+  compact: CompactSeries
+): Record<string, LinePoint[]> {
+  const series: Record<string, LinePoint[]> = {};
+  for (const [name, entry] of Object.entries(compact.series)) {
+    const axis = compact.axes[entry.axis];
+    const points: LinePoint[] = [];
+    if ("value" in entry) {
+      for (let i = 0; i < entry.length; ++i) {
+        points.push({ time: axis[entry.start + i] as UTCTimestamp, value: entry.value });
+      }
+    } else {
+      entry.values.forEach((value, i) => {
+        if (value !== null) {
+          points.push({ time: axis[entry.start + i] as UTCTimestamp, value });
+        }
+      });
+    }
+    series[name] = points;
+  }
+  return series;
+}
+
+/**
+ * Line series from a `fetchPacked` response for a `shape=columns` request;
+ * non-series JSON (e.g. errors) is returned as is.
+ */
+export function seriesFromPayload(
+  payload: { columns: Record<string, PackedColumn> } | { json: any }
+): any {
+  if ("columns" in payload) return seriesFromColumns(payload.columns);
+  return payload.json && "series" in payload.json
+    ? seriesFromCompact(payload.json)
+    : payload.json;
+}
+
+/** Candles for lightweight-charts from columnar history. */
+export function candlesFromColumns(history: HistoryColumns) {
+  const { time, open, high, low, close } = history;
+  const candles = new Array(time.length);
+  for (let i = 0; i < time.length; ++i) {
+    candles[i] = {
+      time: time[i] as UTCTimestamp,
+      open: open[i],
+      high: high[i],
+      low: low[i],
+      close: close[i],
+    };
+  }
+  return candles as {
+    time: UTCTimestamp;
+    open: number;
+    high: number;
+    low: number;
+    close: number;
+  }[];
+}
@@ -16,17 +16,74 @@ import {
 } from "lightweight-charts";
 import { JSX, useEffect, useRef, useState } from "react";
 import { Ruler, Minus, RotateCcw, ArrowUpDown } from "lucide-react";
-import { StockChartProps, Point, CopyTrendlineBuffer } from "./types";
+import { StockChartProps, Point, CopyTrendlineBuffer, ChartTimeframe } from "./types";
 import { useWebSocketData } from "./useWebSocketData";
 import { useMainChartData } from "./useMainChartData";
 import { useDrawingManager } from "./DrawingManager";
 import { usePreviewManager } from "./PreviewManager";
 import { useDrawingRenderer } from "./DrawingRenderer";
 import { useClickHandler } from "./ClickHandler";
-import OverlayGrid from "./OverlayGrid";
+import OverlayGrid, { OVERLAY_GRID_SERIES } from "./OverlayGrid";
 import SecondaryChart from "./SecondaryChart";
 import S3Gallery from "../S3Gallery";
 import GraphingChart from "./GraphingChart";
+import { fetchPacked, seriesFromPayload } from "./chartPayload";
+
+// Overlay series drawn in the panes that are always shown; fetched with the chart.
+const CHART_OVERLAY_SERIES = [
+  "price_line",
+  "momentum_90",
+  "mansfield_rs",
+  "rsi",
+  "rsi_ma_14",
+  "rsi_upper_band",
+  "rsi_middle_band",
+  "rsi_lower_band",
+  "volatility",
+  "volatility_ma_5",
+  "mean_rev_50dma",
+  ...OVERLAY_GRID_SERIES,
+];
+
+// Fetched only while the Bollinger Band checkbox is ticked.
+const BOLLINGER_SERIES = ["bb_upper", "bb_middle", "bb_lower"];
+
+let overlayNames: Promise<Set<string>> | null = null;
+
+// Series names the backend can compute, fetched once per page load.
+function fetchOverlayNames(): Promise<Set<string>> {
+  if (!overlayNames) {
+    overlayNames = fetch("http://localhost:8000/overlay_registry")
+      .then((res) => {
+        if (!res.ok) throw new Error(`HTTP ${res.status}`);
+        return res.json();
+      })
+      .then(
+        (data: { series: { name: string }[] }) =>
+          new Set(data.series.map((entry) => entry.name))
+      )
+      .catch((err) => {
+        overlayNames = null;
+        throw err;
+      });
+  }
+  return overlayNames;
+}
+
+// The named overlay series the backend knows, for one symbol and timeframe.
+async function fetchOverlaySeries(
+  symbol: string,
+  timeframe: string,
+  names: string[]
+): Promise<any> {
+  const available = await fetchOverlayNames();
+  const series = Array.from(new Set(names.filter((name) => available.has(name))));
+  const payload = await fetchPacked(
+    `http://localhost:8000/overlay_data/${symbol}?timeframe=${timeframe}` +
+      `&shape=columns&series=${encodeURIComponent(series.join(","))}`
+  );
+  return seriesFromPayload(payload);
+}
 
 const StockChart = ({ stockSymbol, peersOverride }: StockChartProps) => {
   const chartContainerRef = useRef<HTMLDivElement>(null);
@@ -38,7 +95,7 @@ const StockChart = ({ stockSymbol, peersOverride }: StockChartProps) => {
   );
   const sixPointDotPreviewRef = useRef<ISeriesApi<"Line"> | null>(null);
   const sixPointHoverLineRef = useRef<ISeriesApi<"Line"> | null>(null);
-  const [timeframe, setTimeframe] = useState<"daily" | "weekly" | "monthly">(
+  const [timeframe, setTimeframe] = useState<ChartTimeframe>(
     "weekly"
   );
 
@@ -144,9 +201,6 @@ const StockChart = ({ stockSymbol, peersOverride }: StockChartProps) => {
     rsi_lower_band?: { time: number; value: number }[];
     volatility?: { time: number; value: number }[];
     volatility_ma_5?: { time: number; value: number }[];
-    bb_middle?: { time: number; value: number }[];
-    bb_upper?: { time: number; value: number }[];
-    bb_lower?: { time: number; value: number }[];
     price_line?: { time: number; value: number }[];
     momentum_90?: { time: number; value: number }[];
     mansfield_rs?: { time: number; value: number }[];
@@ -161,6 +215,11 @@ const StockChart = ({ stockSymbol, peersOverride }: StockChartProps) => {
 
   // Checkboxes to add for overlay
   const [showBollingerBand, setShowBollingerBand] = useState(false);
+  const [bollingerData, setBollingerData] = useState<{
+    bb_middle?: { time: number; value: number }[];
+    bb_upper?: { time: number; value: number }[];
+    bb_lower?: { time: number; value: number }[];
+  }>({});
 
   // Natural_Gas_stocks
   const NATURAL_GAS_STOCKS = [
@@ -1110,11 +1169,9 @@ const StockChart = ({ stockSymbol, peersOverride }: StockChartProps) => {
   useEffect(() => {
     const fetchOverlayData = async () => {
       try {
-        const res = await fetch(
-          `http://localhost:8000/overlay_data/${stockSymbol}?timeframe=${timeframe}`
+        setOverlayData(
+          await fetchOverlaySeries(stockSymbol, timeframe, CHART_OVERLAY_SERIES)
         );
-        const data = await res.json();
-        setOverlayData(data);
       } catch (err) {
         console.error("Failed to fetch overlay data", err);
       }
@@ -1123,6 +1180,22 @@ const StockChart = ({ stockSymbol, peersOverride }: StockChartProps) => {
     fetchOverlayData();
   }, [stockSymbol, timeframe]);
 
+  // Bollinger Bands are requested only while they are shown.
+  useEffect(() => {
+    setBollingerData({});
+    if (!showBollingerBand) return;
+
+    let cancelled = false;
+    fetchOverlaySeries(stockSymbol, timeframe, BOLLINGER_SERIES)
+      .then((data) => {
+        if (!cancelled) setBollingerData(data);
+      })
+      .catch((err) => console.error("Failed to fetch Bollinger Bands", err));
+    return () => {
+      cancelled = true;
+    };
+  }, [stockSymbol, timeframe, showBollingerBand]);
+
   /*
     FETCH PEERS FOR COMPARISON CHARTS
   */
@@ -1181,7 +1254,7 @@ const StockChart = ({ stockSymbol, peersOverride }: StockChartProps) => {
     const refs: Record<string, ISeriesApi<"Line">> = {};
 
     (["bb_middle", "bb_upper", "bb_lower"] as const).forEach((key) => {
-      const data = overlayData[key];
+      const data = bollingerData[key];
       if (!data) return;
 
       const series = chart.addSeries(LineSeries, {
@@ -1215,9 +1288,9 @@ const StockChart = ({ stockSymbol, peersOverride }: StockChartProps) => {
     };
   }, [
     showBollingerBand,
-    overlayData.bb_middle,
-    overlayData.bb_upper,
-    overlayData.bb_lower,
+    bollingerData.bb_middle,
+    bollingerData.bb_upper,
+    bollingerData.bb_lower,
   ]);
 
   /*
@@ -1662,10 +1735,10 @@ const StockChart = ({ stockSymbol, peersOverride }: StockChartProps) => {
 
         {/* Right side: timeframe toggle */}
         <div className="btn-group">
-          {["daily", "weekly", "monthly"].map((tf) => (
+          {["hourly", "4h", "daily", "weekly", "monthly"].map((tf) => (
             <button
               key={tf}
-              onClick={() => setTimeframe(tf as "daily" | "weekly" | "monthly")}
+              onClick={() => setTimeframe(tf as ChartTimeframe)}
               className={`btn btn-sm ${
                 timeframe === tf ? "btn-primary" : "btn-outline-secondary"
               }`}
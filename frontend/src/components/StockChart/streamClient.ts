@@ -0,0 +1,108 @@
+/**
+ * Shared connection to the backend's multiplexed `/ws/stream` socket.
+ *
+ * Every chart subscribes through this one socket instead of opening its own.
+ * Identical subscriptions from several components share one server-side
+ * subscription; the socket reconnects and resubscribes if it drops.
+ */
+
+export type StreamChannel = "candles" | "overlays" | "signals";
+
+export interface StreamSubscription {
+  symbol: string;
+  timeframe: string;
+  channel: StreamChannel;
+  series?: string[];
+  strategies?: string[];
+  limit?: number;
+  max_points?: number;
+}
+
+export interface StreamUpdate {
+  symbol: string;
+  timeframe: string;
+  channel: StreamChannel;
+  kind: "snapshot" | "live" | "error";
+  data: any;
+}
+
+type Listener = (update: StreamUpdate) => void;
+
+const STREAM_URL = "ws://localhost:8000/ws/stream";
+const RECONNECT_MS = 2000;
+
+const listeners = new Map<string, Set<Listener>>();
+const subscriptions = new Map<string, StreamSubscription>();
+// Last snapshot and live update per subscription, replayed to late joiners.
+const latest = new Map<string, Partial<Record<StreamUpdate["kind"], StreamUpdate>>>();
+let socket: WebSocket | null = null;
+
+function keyOf(sub: { symbol: string; timeframe: string; channel: string }) {
+  return `${sub.symbol}|${sub.timeframe}|${sub.channel}`;
+}
+
+function send(message: object) {
+  if (socket?.readyState === WebSocket.OPEN) {
+    socket.send(JSON.stringify(message));
+  }
+}
+
+function connect() {
+  socket = new WebSocket(STREAM_URL);
+  socket.onopen = () => {
+    subscriptions.forEach((sub) => send({ op: "subscribe", ...sub }));
+  };
+  socket.onmessage = (event) => {
+    const frame = JSON.parse(event.data) as { updates: StreamUpdate[] };
+    for (const update of frame.updates) {
+      const key = keyOf(update);
+      if (!listeners.has(key)) continue;
+      const seen = latest.get(key) ?? {};
+      if (update.kind === "snapshot") delete seen.live;
+      seen[update.kind] = update;
+      latest.set(key, seen);
+      listeners.get(key)?.forEach((listener) => listener(update));
+    }
+  };
+  socket.onclose = () => {
+    socket = null;
+    if (subscriptions.size > 0) setTimeout(ensureSocket, RECONNECT_MS);
+  };
+}
+
+function ensureSocket() {
+  if (!socket && subscriptions.size > 0) connect();
+}
+
+/** Subscribe to one (symbol, timeframe, channel); returns the unsubscribe function. */
+export function subscribeStream(
+  sub: StreamSubscription,
+  listener: Listener
+): () => void {
+  const normalized = { ...sub, symbol: sub.symbol.toUpperCase() };
+  const key = keyOf(normalized);
+  let group = listeners.get(key);
+  if (!group) {
+    group = new Set();
+    listeners.set(key, group);
+    subscriptions.set(key, normalized);
+    ensureSocket();
+    send({ op: "subscribe", ...normalized });
+  }
+  group.add(listener);
+  const seen = latest.get(key);
+  if (seen?.snapshot) listener(seen.snapshot);
+  if (seen?.live) listener(seen.live);
+
+  return () => {
+    const current = listeners.get(key);
+    if (!current) return;
+    current.delete(listener);
+    if (current.size > 0) return;
+    listeners.delete(key);
+    subscriptions.delete(key);
+    latest.delete(key);
+    send({ op: "unsubscribe", ...normalized });
+    if (subscriptions.size === 0) socket?.close();
+  };
+}
@@ -40,6 +40,8 @@ export type CopyTrendlineBuffer = {
 };
 
 export type Timeframe = "daily" | "weekly" | "monthly";
+// Chart timeframes, including intraday bars built from the minute store.
+export type ChartTimeframe = Timeframe | "hourly" | "4h";
 export type SignalSide = "BUY" | "SELL" | ""; // "" for no signal
 
 export type SignalSummary = {
@@ -1,11 +1,12 @@
 import { useEffect } from "react";
 import { IChartApi, ISeriesApi, UTCTimestamp } from "lightweight-charts";
-import { Candle } from "./types";
+import { Candle, ChartTimeframe } from "./types";
+import { candlesFromColumns, fetchPacked, HistoryColumns } from "./chartPayload";
 
 export function useMainChartData(
   stockSymbol: string,
   candleSeriesRef: React.MutableRefObject<ISeriesApi<"Candlestick"> | null>,
-  timeframe: "daily" | "weekly" | "monthly",
+  timeframe: ChartTimeframe,
   chartRef?: React.MutableRefObject<IChartApi | null>,
   onData?: (candles: Candle[]) => void,
   includeFutureBars: boolean = false
@@ -15,21 +16,16 @@ export function useMainChartData(
 
     async function fetchData() {
       try {
-        const res = await fetch(
+        const payload = await fetchPacked(
           `http://localhost:8000/api/chart_data_${timeframe}/${stockSymbol.toUpperCase()}`
         );
-        const data = await res.json();
         const candleSeries = candleSeriesRef.current;
         if (!candleSeries) return;
 
-        if (data.history) {
-          let formattedData = (data.history as Candle[]).map((c) => ({
-            time: c.time as UTCTimestamp,
-            open: c.open,
-            high: c.high,
-            low: c.low,
-            close: c.close,
-          }));
+        if ("columns" in payload) {
+          let formattedData = candlesFromColumns(
+            payload.columns as unknown as HistoryColumns
+          );
 
           // ====== ADD WHITESPACE BARS FOR FUTURE ======
           if (includeFutureBars && formattedData.length > 0) {
@@ -39,7 +35,9 @@ export function useMainChartData(
 
             // Calculate interval based on your timeframe
             let interval = 0;
-            if (timeframe === "daily") interval = 24 * 60 * 60;
+            if (timeframe === "hourly") interval = 60 * 60;
+            else if (timeframe === "4h") interval = 4 * 60 * 60;
+            else if (timeframe === "daily") interval = 24 * 60 * 60;
             else if (timeframe === "weekly") interval = 7 * 24 * 60 * 60;
             else if (timeframe === "monthly") interval = 31 * 24 * 60 * 60; // crude approx
 
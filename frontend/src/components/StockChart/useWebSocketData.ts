@@ -1,51 +1,45 @@
 import { useEffect } from "react";
 import { ISeriesApi, UTCTimestamp } from "lightweight-charts";
-import { Candle } from "./types";
+import { candlesFromColumns, HistoryColumns } from "./chartPayload";
+import { subscribeStream } from "./streamClient";
+import { ChartTimeframe } from "./types";
 
 export function useWebSocketData(
   stockSymbol: string,
   candleSeriesRef: React.MutableRefObject<ISeriesApi<"Candlestick"> | null>,
-  timeframe: "daily" | "weekly" | "monthly",
+  timeframe: ChartTimeframe,
 ) {
   useEffect(() => {
     if (!stockSymbol || !candleSeriesRef.current) return;
 
-    const ws = new WebSocket(
-      `ws://localhost:8000/ws/chart_data_${timeframe}/${stockSymbol.toUpperCase()}`
-    );
-
-
-    ws.onmessage = (event) => {
-      const data = JSON.parse(event.data);
-      const candleSeries = candleSeriesRef.current;
-      if (!candleSeries) return;
-
-      if (data.history) {
-        const formattedData = (data.history as Candle[]).map((c) => ({
-          time: c.time as UTCTimestamp,
-          open: c.open,
-          high: c.high,
-          low: c.low,
-          close: c.close,
-        }));
-        candleSeries.setData(formattedData);
+    // Candles over the shared multiplexed socket rather than one socket per chart.
+    return subscribeStream(
+      { symbol: stockSymbol, timeframe, channel: "candles" },
+      (update) => {
+        const candleSeries = candleSeriesRef.current;
+        if (!candleSeries) return;
+
+        if (update.kind === "snapshot") {
+          candleSeries.setData(
+            candlesFromColumns(update.data.history as HistoryColumns)
+          );
+        }
+
+        if (update.kind === "live") {
+          const { time, open, high, low, close } = update.data;
+          candleSeries.update({
+            time: time as UTCTimestamp,
+            open,
+            high,
+            low,
+            close,
+          });
+        }
+
+        if (update.kind === "error") {
+          console.error(`Stream error for ${stockSymbol}:`, update.data);
+        }
       }
-
-      if (data.live) {
-        candleSeries.update({
-          time: data.live.time as UTCTimestamp,
-          open: data.live.value,
-          high: data.live.value,
-          low: data.live.value,
-          close: data.live.value,
-        });
-      }
-    };
-
-    ws.onclose = () => console.log("WebSocket closed");
-
-    return () => {
-      ws.close();
-    };
+    );
   }, [stockSymbol, candleSeriesRef, timeframe]);
 }
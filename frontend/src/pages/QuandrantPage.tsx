@@ -31,35 +31,22 @@ export default function QuadrantPage() {
 
   useEffect(() => {
     setLoading(true);
-    fetch(`http://localhost:8000/quadrant_data?list_type=${listType}`)
-      .then((res) => res.json())
-      .then((d) => {
-        setData(d);
-        setLoading(false);
-      })
-      .catch(() => setLoading(false));
-  }, [listType]);
-
-  useEffect(() => {
     setStageLoading(true);
-    fetch(`http://localhost:8000/stage_table?list_type=${listType}`)
-      .then((res) => res.json())
-      .then((d) => {
-        setStageData(d);
-        setStageLoading(false);
-      })
-      .catch(() => setStageLoading(false));
-  }, [listType]);
-
-  useEffect(() => {
     setMansfieldLoading(true);
-    fetch(`http://localhost:8000/mansfield_table?list_type=${listType}`)
-      .then((res) => res.json())
+    fetch(`http://localhost:8000/list_tables?list_type=${listType}`)
+      .then((res) => (res.ok ? res.json() : Promise.reject(res.status)))
       .then((d) => {
-        setMansfieldData(d);
-        setMansfieldLoading(false);
+        if (!d?.quadrant || !d?.stage || !d?.mansfield) return;
+        setData(d.quadrant);
+        setStageData(d.stage);
+        setMansfieldData(d.mansfield);
       })
-      .catch(() => setMansfieldLoading(false));
+      .catch(() => {})
+      .finally(() => {
+        setLoading(false);
+        setStageLoading(false);
+        setMansfieldLoading(false);
+      });
   }, [listType]);
 
   return (